@@ -1,14 +1,25 @@
 from datetime import datetime
 from pathlib import Path
 
+import click
 from dotenv import load_dotenv
 from flask import Flask
 
-from alexandria.blueprints import auth, books, main
+from alexandria.blueprints import auth, books, jobs, main
 from alexandria.bootstrap import refresh_library_metadata, run_startup_bootstrap
 from alexandria.config import configure_app
 from alexandria.extensions import csrf, db, limiter, login_manager, migrate
 from alexandria.filters import register_template_filters
+from alexandria.integrations.google_books import (
+    configure_memory_cache,
+    configure_persistent_cache,
+    persistent_cache_stats,
+)
+from alexandria.services.books import backfill_book_facets
+from alexandria.services.covers import backfill_cover_urls, init_cover_store, validate_library_covers
+from alexandria.services.jobs import enqueue_job, init_job_runner, run_pending_jobs
+from alexandria.services.reading_stats import rebuild_reading_stats
+from alexandria.services.search import rebuild_search_index, search_index_available
 
 
 def create_app() -> Flask:
@@ -20,6 +31,12 @@ def create_app() -> Flask:
         static_folder=str(root / 'static'),
     )
     configure_app(app, root)
+    configure_memory_cache(
+        app.config['GOOGLE_BOOKS_CACHE_MAX_ENTRIES'],
+        app.config['GOOGLE_BOOKS_CACHE_MAX_BYTES'],
+    )
+    configure_persistent_cache(app.config['GOOGLE_BOOKS_CACHE_DB'])
+    init_cover_store(app)
     db.init_app(app)
     login_manager.init_app(app)
     login_manager.login_view = 'auth.login'
@@ -36,6 +53,7 @@ def create_app() -> Flask:
     app.register_blueprint(main.bp)
     app.register_blueprint(auth.bp)
     app.register_blueprint(books.bp)
+    app.register_blueprint(jobs.bp)
 
     @app.errorhandler(404)
     def not_found(e):
@@ -48,11 +66,90 @@ def create_app() -> Flask:
         return render_template('500.html'), 500
 
     @app.cli.command('refresh-metadata')
-    def refresh_metadata_cmd():
-        """Refresh library book metadata from the Google Books API."""
-        refresh_library_metadata()
+    @click.option('--force', is_flag=True, help='Refresh every book, even recently refreshed ones.')
+    @click.option('--max-age-hours', type=float, default=None,
+                  help='Only refresh books older than this (default METADATA_REFRESH_MAX_AGE_HOURS).')
+    @click.option('--inline', is_flag=True, help='Run now in this process instead of queueing a background job.')
+    def refresh_metadata_cmd(force, max_age_hours, inline):
+        """Refresh stale library book metadata from the Google Books API.
+
+        By default this queues a job for the running app's background worker.
+        """
+        if inline:
+            refresh_library_metadata(force=force, max_age_hours=max_age_hours)
+            return
+        job = enqueue_job('refresh_metadata', {'force': force, 'max_age_hours': max_age_hours})
+        click.echo(f'Queued metadata refresh as job {job.id} (status: {job.status}).')
+
+    @app.cli.command('validate-covers')
+    @click.option('--force', is_flag=True, help='Re-check books whose cover was already validated.')
+    @click.option('--inline', is_flag=True, help='Run now in this process instead of queueing a background job.')
+    def validate_covers_cmd(force, inline):
+        """Probe every book's primary and fallback cover and store the one that works.
+
+        By default this queues a job for the running app's background worker.
+        """
+        if inline:
+            report = validate_library_covers(force=force)
+            click.echo(
+                f'Checked {report.total} book(s): {report.primary} primary, {report.fallback} fallback, '
+                f'{report.missing} without a cover, {report.failed} failed.'
+            )
+            return
+        job = enqueue_job('validate_covers', {'force': force})
+        click.echo(f'Queued cover validation as job {job.id} (status: {job.status}).')
+
+    @app.cli.command('backfill-cover-urls')
+    def backfill_cover_urls_cmd():
+        """Store resolved primary/fallback cover URLs on books that predate those columns."""
+        click.echo(f'Updated cover URLs of {backfill_cover_urls()} book(s).')
+
+    @app.cli.command('backfill-facets')
+    def backfill_facets_cmd():
+        """Link books that predate the author/category tables to their authors and categories."""
+        click.echo(f'Linked {backfill_book_facets()} book(s).')
+
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index_cmd():
+        """Re-index every book in the SQLite FTS5 search table."""
+        if not search_index_available():
+            click.echo('SQLite FTS5 is not available; search uses LIKE matching.')
+            return
+        click.echo(f'Indexed {rebuild_search_index()} book(s).')
+
+    @app.cli.command('rebuild-stats')
+    def rebuild_stats_cmd():
+        """Recompute the reading stats aggregates from every finished book."""
+        click.echo(f'Wrote {rebuild_reading_stats()} stats row(s).')
+
+    @app.cli.command('run-jobs')
+    def run_jobs_cmd():
+        """Run every queued background job now, in this process."""
+        click.echo(f'Ran {run_pending_jobs()} job(s).')
+
+    @app.cli.command('google-books-cache-stats')
+    def google_books_cache_stats_cmd():
+        """Show hit/miss counters of the shared Google Books cache."""
+        stats = persistent_cache_stats()
+        if not stats:
+            click.echo('Shared Google Books cache is empty or disabled.')
+        for namespace, counters in sorted(stats.items()):
+            lookups = counters['hits'] + counters['misses']
+            ratio = counters['hits'] / lookups * 100 if lookups else 0
+            click.echo(
+                f"{namespace}: {counters['entries']} entries, {counters['hits']} hits, "
+                f"{counters['misses']} misses ({ratio:.1f}% hit ratio), {counters['writes']} writes"
+            )
 
     with app.app_context():
         run_startup_bootstrap(root)
 
+    runner = init_job_runner(app)
+    if runner is not None:
+        # CLI commands load the app too; only servers should run background jobs.
+        # Under `flask run` the runner starts with the first request instead.
+        if click.get_current_context(silent=True) is None:
+            runner.start()
+        app.before_request(runner.start)
+
     return app
@@ -1,9 +1,17 @@
-from flask import Blueprint, flash, redirect, render_template, request, url_for
+from flask import Blueprint, flash, jsonify, redirect, render_template, request, url_for
 from flask_login import login_required
 
 from alexandria.constants import BookStatus
-from alexandria.integrations.google_books import SearchOutcome, get_book_details, search_books
+from alexandria.integrations.google_books import (
+    SearchOutcome,
+    get_book_details,
+    memory_cache_stats,
+    persistent_cache_stats,
+    search_books,
+)
+from alexandria.integrations.http import circuit_breaker_stats
 from alexandria.services import books as book_service
+from alexandria.services.generation import context_cache_stats
 
 bp = Blueprint('books', __name__)
 
@@ -22,6 +30,18 @@ def search():
     )
 
 
+@bp.route('/cache-stats')
+@login_required
+def cache_stats():
+    """Monitoring figures: this worker's Google Books caches, circuit breaker and page contexts, and the shared file."""
+    return jsonify(
+        memory=memory_cache_stats(),
+        persistent=persistent_cache_stats(),
+        circuit=circuit_breaker_stats(),
+        contexts=context_cache_stats(),
+    )
+
+
 @bp.route('/add/<google_books_id>', methods=['POST'])
 @login_required
 def add_book(google_books_id):
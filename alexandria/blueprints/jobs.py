@@ -0,0 +1,22 @@
+from flask import Blueprint, abort, jsonify
+from flask_login import login_required
+
+from alexandria.services import jobs as job_service
+
+bp = Blueprint('jobs', __name__)
+
+
+@bp.route('/jobs')
+@login_required
+def list_jobs():
+    """Most recent background jobs with their status and progress."""
+    return jsonify(jobs=[job.to_dict() for job in job_service.recent_jobs()])
+
+
+@bp.route('/jobs/<int:job_id>')
+@login_required
+def job_status(job_id):
+    job = job_service.get_job(job_id)
+    if job is None:
+        abort(404)
+    return jsonify(job.to_dict())
@@ -2,7 +2,7 @@ import csv
 import io
 import json
 
-from flask import Blueprint, Response, redirect, render_template, request, url_for
+from flask import Blueprint, Response, abort, jsonify, redirect, render_template, request, send_file, url_for
 
 from alexandria.models import Book
 from alexandria.services.books import (
@@ -12,38 +12,56 @@ from alexandria.services.books import (
     get_reading_and_finished_lists,
 )
 from alexandria.services.calendar import build_calendar_context, get_active_months
-from alexandria.services.stats import build_stats_context
+from alexandria.services.covers import COVER_WIDTHS, get_book_cover, get_cover_store
+from alexandria.services.generation import cached_context
+from alexandria.services.search import search_snippets
+from alexandria.services.stats import StatsRange, build_stats_context, stats_range_from_args, stats_years
 
 bp = Blueprint('main', __name__)
 
+COVER_MAX_AGE_SECONDS = 365 * 24 * 3600
+# Fallback covers are revalidated (by ETag) rather than kept for good.
+FALLBACK_COVER_MAX_AGE_SECONDS = 3600
+
 
 @bp.route('/')
 def index():
     q = request.args.get('q', '').strip()
     status_filter = request.args.get('status', '').strip()
-    sort = request.args.get('sort', 'date_added_desc')
-    page = request.args.get('page', 1, type=int)
+    author_filter = request.args.get('author', '').strip()
+    category_filter = request.args.get('category', '').strip()
+    # A text search ranks by relevance unless the reader picked another order.
+    sort = request.args.get('sort') or ('relevance' if q else 'date_added_desc')
+    cursor = request.args.get('cursor') or None
+    # Keyset pagination by default; an explicit ?page= keeps the page-number fallback.
+    page = request.args.get('page', type=int)
     per_page = 24
 
-    if q or status_filter:
+    if q or status_filter or author_filter or category_filter:
         pagination = filter_books(
             q=q or None,
             status=status_filter or None,
+            author=author_filter or None,
+            category=category_filter or None,
             sort=sort,
             page=page,
             per_page=per_page,
+            cursor=cursor,
         )
         return render_template(
             'index.html',
             filtered=True,
             books=pagination.items,
             pagination=pagination,
+            snippets=search_snippets([book.id for book in pagination.items], q) if q else {},
             q=q,
             status_filter=status_filter,
+            author_filter=author_filter,
+            category_filter=category_filter,
             sort=sort,
         )
 
-    groups = get_collection_lists(page=page, per_page=per_page)
+    groups = get_collection_lists(page=page, per_page=per_page, cursor=cursor)
     return render_template(
         'index.html',
         filtered=False,
@@ -52,11 +70,13 @@ def index():
         tbr=groups['tbr'],
         paused=groups['paused'],
         dnf=groups['dnf'],
+        shelf_counts=groups['_counts'],
         finished_total=groups['_finished_total'],
-        finished_pages=groups['_finished_pages'],
-        current_page=page,
+        finished_pagination=groups['_finished_page'],
         q='',
         status_filter='',
+        author_filter='',
+        category_filter='',
         sort=sort,
     )
 
@@ -67,15 +87,68 @@ def book_detail(book_id):
     return render_template('book_detail.html', book=book)
 
 
+@bp.route('/covers/<int:book_id>')
+@bp.route('/covers/<int:book_id>/<size>')
+def cover(book_id, size=None):
+    """Serve a book's cover from the local cache, downloading it on first request.
+
+    ``size`` names one of ``COVER_WIDTHS``; without it the original is served.
+    """
+    if size is not None and size not in COVER_WIDTHS:
+        abort(404)
+    book = get_book_or_404(book_id)
+    stored = get_book_cover(book)
+    if stored is None:
+        abort(404)
+    # URLs carry a version of the primary source, so its body never changes under
+    # them; a fallback body is replaced once the primary is retried and works.
+    primary = book.cover_url is not None and stored == get_cover_store().lookup(book.cover_url)
+    if size is not None:
+        stored = get_cover_store().resized(stored, COVER_WIDTHS[size])
+    response = send_file(
+        stored.path,
+        mimetype=stored.content_type,
+        etag=stored.digest,
+        conditional=True,
+        max_age=COVER_MAX_AGE_SECONDS if primary else FALLBACK_COVER_MAX_AGE_SECONDS,
+    )
+    response.cache_control.public = True
+    response.cache_control.immutable = primary
+    return response
+
+
+def _stats_context(stats_range: StatsRange):
+    return cached_context(f'stats:{stats_range.key}', lambda: build_stats_context(stats_range))
+
+
 @bp.route('/stats')
 def stats():
-    ctx = build_stats_context()
-    return render_template('stats.html', **ctx.template_kwargs())
+    try:
+        stats_range = stats_range_from_args(request.args)
+    except ValueError:
+        return redirect(url_for('main.stats'))
+    ctx = _stats_context(stats_range)
+    return render_template(
+        'stats.html',
+        stats_range=stats_range,
+        stats_years=cached_context('stats:years', stats_years),
+        **ctx.template_kwargs(),
+    )
+
+
+@bp.route('/stats.json')
+def stats_json():
+    """Chart series for ``/stats``, fetched by the page after it renders."""
+    try:
+        stats_range = stats_range_from_args(request.args)
+    except ValueError:
+        abort(400)
+    return jsonify(range=stats_range.label, **_stats_context(stats_range).chart_data())
 
 
 @bp.route('/calendar')
 def calendar():
-    active = get_active_months()
+    active = cached_context('calendar:months', get_active_months)
     if not active:
         return render_template('calendar.html', active_months=[], current_label=None, weeks=None)
 
@@ -89,7 +162,7 @@ def calendar():
     if (year, month) not in set(active):
         return redirect(url_for('main.calendar'))
 
-    ctx = build_calendar_context(year, month)
+    ctx = cached_context(f'calendar:{year}-{month:02d}', lambda: build_calendar_context(year, month))
     return render_template('calendar.html', **ctx)
 
 
@@ -1,11 +1,21 @@
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime, timedelta
 from pathlib import Path
 
 from loguru import logger
 
+from alexandria.config import env_float
 from alexandria.extensions import db
-from alexandria.integrations.google_books import get_book_details
+from alexandria.integrations.google_books import VolumeFetch, fetch_volume
 from alexandria.models import Book, User
+from alexandria.services.books import set_book_facets
+from alexandria.services.jobs import ProgressCallback, enqueue_job, register_job
+from alexandria.services.reading_stats import ensure_reading_stats
+from alexandria.services.search import ensure_search_index
+from alexandria.utils.rate_limit import TokenBucket
 
 
 def ensure_instance_folder(root: Path) -> None:
@@ -15,6 +25,9 @@ def ensure_instance_folder(root: Path) -> None:
 
 def init_database() -> None:
     db.create_all()
+    ensure_search_index()
+    if ensure_reading_stats():
+        logger.info('Built the reading stats aggregates from the library')
 
 
 def ensure_librarian_user() -> None:
@@ -30,33 +43,150 @@ def ensure_librarian_user() -> None:
     db.session.commit()
 
 
-def refresh_library_metadata() -> None:
+@dataclass
+class RefreshReport:
+    """Outcome of a library metadata refresh."""
+
+    total: int = 0
+    refreshed: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    skipped: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def books_per_second(self) -> float:
+        return self.total / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+
+def _apply_details(book: Book, details: dict) -> None:
+    if (book.thumbnail, book.isbn) != (details['thumbnail'], details.get('isbn')):
+        # Candidates changed: let cover validation re-check them and recompute the placeholder.
+        book.cover_checked_at = None
+        book.cover_color = book.cover_preview = None
+    book.title = details['title']
+    book.authors = details['authors']
+    book.isbn = details.get('isbn')
+    book.thumbnail = details['thumbnail']
+    book.description = details['description']
+    book.page_count = details['page_count']
+    book.categories = details['categories']
+    set_book_facets(book, details)
+    book.published_year = details['published_year']
+    book.language = details['language']
+    book.average_rating = details['average_rating']
+
+
+def _fetch_volume(bucket: TokenBucket, google_books_id: str, etag: str | None) -> VolumeFetch:
+    bucket.acquire()
+    return fetch_volume(google_books_id, etag=etag)
+
+
+def stale_books_query(max_age_hours: float, force: bool = False):
+    """Books with a volume id whose metadata is older than ``max_age_hours`` (all with ``force``).
+
+    Never-refreshed books come first, then the oldest, so a run that was
+    interrupted picks up exactly where its last committed batch stopped.
+    """
+    query = Book.query.filter(Book.google_books_id.isnot(None))
+    if not force:
+        cutoff = datetime.now(UTC) - timedelta(hours=max_age_hours)
+        query = query.filter(
+            db.or_(Book.metadata_refreshed_at.is_(None), Book.metadata_refreshed_at < cutoff)
+        )
+    return query.order_by(Book.metadata_refreshed_at.asc().nulls_first(), Book.id)
+
+
+def refresh_library_metadata(
+    force: bool = False,
+    max_age_hours: float | None = None,
+    progress: ProgressCallback | None = None,
+) -> RefreshReport:
+    """Re-fetch Google Books metadata for library books whose metadata is stale.
+
+    Only books not refreshed within ``max_age_hours`` (default
+    ``METADATA_REFRESH_MAX_AGE_HOURS``) are fetched unless ``force`` is set,
+    and requests carry the stored volume ETag so unchanged volumes cost a
+    body-less 304. Lookups fan out over ``METADATA_REFRESH_WORKERS`` threads
+    sharing a token bucket of ``METADATA_REFRESH_RATE_PER_SECOND`` requests;
+    results are applied on the calling thread (the only one touching the
+    session) and committed every ``METADATA_REFRESH_BATCH_SIZE`` books, which
+    checkpoints progress. Failed books keep their old timestamp and are
+    retried on the next run; any other error rolls back the open batch and
+    propagates, failing the job. ``progress(done, total)`` is called after each book.
+    """
+    report = RefreshReport()
+    started = time.monotonic()
+    if max_age_hours is None:
+        max_age_hours = env_float('METADATA_REFRESH_MAX_AGE_HOURS', 168)
+    workers = max(1, int(env_float('METADATA_REFRESH_WORKERS', 4)))
+    batch_size = max(1, int(env_float('METADATA_REFRESH_BATCH_SIZE', 50)))
+    bucket = TokenBucket(env_float('METADATA_REFRESH_RATE_PER_SECOND', 5))
     try:
         logger.info('--- Starting Library Metadata Refresh ---')
-        books = Book.query.all()
-        count = 0
-        for book in books:
-            if book.google_books_id:
-                details = get_book_details(book.google_books_id)
-                if details:
-                    book.title = details['title']
-                    book.authors = details['authors']
-                    book.isbn = details.get('isbn')
-                    book.thumbnail = details['thumbnail']
-                    book.description = details['description']
-                    book.page_count = details['page_count']
-                    book.categories = details['categories']
-                    book.published_year = details['published_year']
-                    book.language = details['language']
-                    book.average_rating = details['average_rating']
-                    count += 1
-        if count > 0:
+        books = stale_books_query(max_age_hours, force=force).all()
+        report.total = len(books)
+        report.skipped = Book.query.filter(Book.google_books_id.isnot(None)).count() - report.total
+        pending = 0
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='metadata-refresh') as pool:
+            futures = {
+                pool.submit(_fetch_volume, bucket, book.google_books_id, book.metadata_etag): book
+                for book in books
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                book = futures[future]
+                try:
+                    fetched = future.result()
+                except Exception as e:
+                    logger.warning('Metadata refresh failed for book {}: {}', book.id, e)
+                    fetched = VolumeFetch()
+                if fetched.not_modified:
+                    report.unchanged += 1
+                elif fetched.details:
+                    _apply_details(book, fetched.details)
+                    book.metadata_etag = fetched.etag
+                    report.refreshed += 1
+                else:
+                    report.failed += 1
+                if fetched.not_modified or fetched.details:
+                    book.metadata_refreshed_at = datetime.now(UTC)
+                    pending += 1
+                    if pending >= batch_size:
+                        db.session.commit()
+                        pending = 0
+                if progress:
+                    progress(done, report.total)
+        if pending:
             db.session.commit()
-            logger.info(f'--- Refreshed metadata for {count} books ---')
-        else:
-            logger.info('--- No books needed updating or library is empty ---')
-    except Exception as e:
-        logger.warning(f'Warning: Metadata refresh encountered an error: {e}')
+    except Exception:
+        db.session.rollback()  # committed batches stay; the next run resumes after them
+        raise
+    report.elapsed_seconds = time.monotonic() - started
+    if report.total:
+        logger.info(
+            '--- Refreshed metadata for {} of {} stale books ({} unchanged, {} failed, {} still fresh) '
+            'in {:.1f}s, {:.2f} books/s ---',
+            report.refreshed,
+            report.total,
+            report.unchanged,
+            report.failed,
+            report.skipped,
+            report.elapsed_seconds,
+            report.books_per_second,
+        )
+    else:
+        logger.info('--- No books needed updating or library is empty ---')
+    return report
+
+
+@register_job('refresh_metadata')
+def refresh_metadata_job(params: dict, progress: ProgressCallback) -> dict:
+    report = refresh_library_metadata(
+        force=params.get('force', False),
+        max_age_hours=params.get('max_age_hours'),
+        progress=progress,
+    )
+    return {**asdict(report), 'books_per_second': round(report.books_per_second, 2)}
 
 
 def _refresh_on_startup_enabled() -> bool:
@@ -72,4 +202,6 @@ def run_startup_bootstrap(root: Path) -> None:
     init_database()
     ensure_librarian_user()
     if _refresh_on_startup_enabled():
-        refresh_library_metadata()
+        # Queued rather than run inline so the app serves traffic immediately.
+        job = enqueue_job('refresh_metadata')
+        logger.info('Queued startup metadata refresh as job {}', job.id)
@@ -8,6 +8,19 @@ def configure_app(app, root: Path) -> None:
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'default-key-for-dev')
     app.config['SQLALCHEMY_DATABASE_URI'] = _resolve_database_uri(root)
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['INSTANCE_DIR'] = _resolve_instance_dir(root, app.config['SQLALCHEMY_DATABASE_URI'])
+    app.config['GOOGLE_BOOKS_CACHE_DB'] = _resolve_data_path(
+        root, 'GOOGLE_BOOKS_CACHE_DB', app.config['INSTANCE_DIR'], 'google_books_cache.db'
+    )
+    app.config['GOOGLE_BOOKS_CACHE_MAX_ENTRIES'] = _env_int('GOOGLE_BOOKS_CACHE_MAX_ENTRIES', 1000)
+    app.config['GOOGLE_BOOKS_CACHE_MAX_BYTES'] = _env_int('GOOGLE_BOOKS_CACHE_MAX_BYTES', 8 * 1024 * 1024)
+    app.config['COVER_PROXY_ENABLED'] = _env_flag('COVER_PROXY_ENABLED', True)
+    app.config['COVER_CACHE_DIR'] = _resolve_data_path(root, 'COVER_CACHE_DIR', app.config['INSTANCE_DIR'], 'covers')
+    app.config['COVER_VALIDATION_WORKERS'] = _env_int('COVER_VALIDATION_WORKERS', 8)
+
+    app.config['JOB_RUNNER_ENABLED'] = _env_flag('JOB_RUNNER_ENABLED', True)
+    app.config['JOB_POLL_SECONDS'] = _env_int('JOB_POLL_SECONDS', 5)
+    app.config['JOB_STALE_SECONDS'] = _env_int('JOB_STALE_SECONDS', 900)
 
     app.config['SESSION_COOKIE_HTTPONLY'] = True
     app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
@@ -16,6 +29,30 @@ def configure_app(app, root: Path) -> None:
     app.config['WTF_CSRF_ENABLED'] = True
 
 
+def _env_int(name: str, default: int) -> int:
+    raw = os.getenv(name, '').strip()
+    try:
+        return max(0, int(raw)) if raw else default
+    except ValueError:
+        return default
+
+
+def env_float(name: str, default: float) -> float:
+    """Non-negative number from the environment variable ``name``; ``default`` when unset or malformed."""
+    raw = os.getenv(name, '').strip()
+    try:
+        return max(0.0, float(raw)) if raw else default
+    except ValueError:
+        return default
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    raw = os.getenv(name, '').strip().lower()
+    if not raw:
+        return default
+    return raw in ('1', 'true', 'yes')
+
+
 def _resolve_database_uri(root: Path) -> str:
     db_url = os.getenv('DATABASE_URL')
     if db_url and db_url.startswith('sqlite:///'):
@@ -26,3 +63,20 @@ def _resolve_database_uri(root: Path) -> str:
     if db_url:
         return db_url
     return f"sqlite:///{root / 'instance' / 'alexandria.db'}"
+
+
+def _resolve_instance_dir(root: Path, database_uri: str) -> str:
+    """Directory for local data files: next to the SQLite database, else ``instance/``."""
+    if database_uri.startswith('sqlite:///'):
+        return str(Path(database_uri.replace('sqlite:///', '')).parent)
+    return str(root / 'instance')
+
+
+def _resolve_data_path(root: Path, env_name: str, instance_dir: str, default_name: str) -> str:
+    """Path from ``env_name`` (relative to the project root), else ``default_name`` in the instance dir."""
+    path = os.getenv(env_name, '').strip()
+    if not path:
+        return str(Path(instance_dir) / default_name)
+    if not os.path.isabs(path):
+        path = str(root / path)
+    return path
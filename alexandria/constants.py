@@ -6,3 +6,25 @@ class BookStatus:
     DNF      = 'dnf'
 
     ALL = (READING, FINISHED, TBR, PAUSED, DNF)
+
+
+class JobStatus:
+    QUEUED    = 'queued'
+    RUNNING   = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED    = 'failed'
+
+    ACTIVE = (QUEUED, RUNNING)
+
+
+class StatDimension:
+    """What a ``ReadingStat`` row counts finished books by, within its month."""
+
+    TOTAL      = 'total'
+    CATEGORY   = 'category'
+    LANGUAGE   = 'language'
+    WEEKDAY    = 'weekday'
+    DECADE     = 'decade'
+    AUTHORSHIP = 'authorship'  # key 'solo' or 'multi'
+
+    ALL = (TOTAL, CATEGORY, LANGUAGE, WEEKDAY, DECADE, AUTHORSHIP)
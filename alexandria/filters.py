@@ -1,8 +1,11 @@
 import re
 
+from flask import url_for
+
+from alexandria.services.covers import COVER_WIDTHS, cover_version
 from alexandria.utils.covers import resolve_cover_fallback_url, resolve_cover_url
 from alexandria.utils.languages import LANGUAGE_NAMES
-from alexandria.utils.text import strip_book_description_html
+from alexandria.utils.text import split_names, strip_book_description_html
 
 
 def register_template_filters(app):
@@ -19,9 +22,7 @@ def register_template_filters(app):
 
     @app.template_filter('categories_list')
     def categories_list_filter(value):
-        if not value:
-            return []
-        return [c.strip() for c in str(value).split(',') if c.strip()]
+        return split_names(value)
 
     @app.template_filter('language_display')
     def language_display_filter(code):
@@ -30,16 +31,46 @@ def register_template_filters(app):
         c = str(code).lower().split('-')[0]
         return LANGUAGE_NAMES.get(c, str(code).upper())
 
+    def proxied_cover(book, size=None):
+        """Local ``/covers`` URL for a saved book; ``v`` changes with the upstream URL."""
+        source = book.cover_url
+        if not source or book.id is None or not app.config.get('COVER_PROXY_ENABLED'):
+            return None
+        return url_for('main.cover', book_id=book.id, size=size, v=cover_version(source))
+
     @app.template_filter('cover_for')
-    def cover_for_filter(book):
+    def cover_for_filter(book, size=None):
         if hasattr(book, 'cover_url'):
-            return book.cover_url
+            return proxied_cover(book, size) or book.cover_url
         return resolve_cover_url(
             thumbnail=book.get('thumbnail'),
             google_books_id=book.get('google_books_id'),
             isbn=book.get('isbn'),
         )
 
+    @app.template_filter('cover_srcset')
+    def cover_srcset_filter(book):
+        if not hasattr(book, 'cover_url'):
+            return ''
+        candidates = []
+        for size, width in COVER_WIDTHS.items():
+            url = proxied_cover(book, size)
+            if url is None:
+                return ''
+            candidates.append(f'{url} {width}w')
+        return ', '.join(candidates)
+
+    @app.template_filter('cover_placeholder')
+    def cover_placeholder_filter(book):
+        """Inline CSS painting the precomputed colour and preview until the cover loads."""
+        color = getattr(book, 'cover_color', None)
+        if not color:
+            return ''
+        preview = getattr(book, 'cover_preview', None)
+        if preview:
+            return f"background:{color} url('{preview}') center/cover no-repeat"
+        return f'background:{color}'
+
     @app.template_filter('cover_fallback_for')
     def cover_fallback_for_filter(book):
         if hasattr(book, 'cover_fallback_url'):
@@ -1,17 +1,26 @@
 import os
 import re
-import time
+import threading
 from dataclasses import dataclass
 
 import requests
 from loguru import logger
 
+from alexandria.config import env_float
+from alexandria.integrations.http import CircuitOpenError, get_with_retries, reset_circuit_breaker
+from alexandria.utils.cache import DiskCache, LRUCache
 from alexandria.utils.covers import pick_cover_url
+from alexandria.utils.singleflight import SingleFlight
 
 BASE_URL = 'https://www.googleapis.com/books/v1/volumes'
 
-_search_cache: dict[str, tuple[float, 'SearchOutcome']] = {}
-_volume_cache: dict[str, tuple[float, dict]] = {}
+_search_cache = LRUCache()
+_volume_cache = LRUCache()
+_search_failures = LRUCache(max_entries=500)
+_volume_failures = LRUCache(max_entries=500)
+_disk_cache: DiskCache | None = None
+_search_flight = SingleFlight()
+_volume_flight = SingleFlight()
 
 
 @dataclass
@@ -23,46 +32,93 @@ class SearchOutcome:
 
 
 def _cache_ttl_seconds() -> int:
-    raw = os.getenv('GOOGLE_BOOKS_CACHE_TTL_SECONDS', '3600').strip()
-    try:
-        return max(0, int(raw))
-    except ValueError:
-        return 3600
+    return int(env_float('GOOGLE_BOOKS_CACHE_TTL_SECONDS', 3600))
+
+
+def _search_stale_seconds() -> int:
+    """How long past its TTL a search may still be served while it is refreshed (0 disables)."""
+    return int(env_float('GOOGLE_BOOKS_SEARCH_STALE_SECONDS', 0))
+
+
+def _negative_cache_seconds() -> int:
+    """How long a failed lookup is remembered and answered without calling Google (0 disables)."""
+    return int(env_float('GOOGLE_BOOKS_NEGATIVE_CACHE_SECONDS', 30))
 
 
 def _normalize_query(query: str) -> str:
     return re.sub(r'\s+', ' ', query.strip().lower())
 
 
-def _cache_get(cache: dict, key: str):
-    entry = cache.get(key)
-    if entry is None:
-        return None
-    expires_at, value = entry
-    if time.monotonic() >= expires_at:
-        del cache[key]
-        return None
-    return value
+def configure_memory_cache(max_entries: int, max_bytes: int) -> None:
+    """Bound each per-worker cache (search and volume) by entry count and approximate bytes."""
+    for cache in (_search_cache, _volume_cache):
+        cache.resize(max_entries, max_bytes)
 
 
-def _cache_set(cache: dict, key: str, value) -> None:
-    ttl = _cache_ttl_seconds()
-    if ttl <= 0:
-        return
-    cache[key] = (time.monotonic() + ttl, value)
+def memory_cache_stats() -> dict[str, dict]:
+    """Size, eviction and hit-ratio figures of this worker's caches, keyed by ``search``/``volume``.
+
+    Each entry also reports ``executions``/``coalesced`` counts of outbound
+    requests versus callers that shared an in-flight one, and how many
+    failed lookups are currently negatively cached.
+    """
+    return {
+        'search': {**_search_cache.stats(), **_search_flight.stats(), 'negative_entries': len(_search_failures)},
+        'volume': {**_volume_cache.stats(), **_volume_flight.stats(), 'negative_entries': len(_volume_failures)},
+    }
+
+
+def configure_persistent_cache(path) -> None:
+    """Back the in-memory caches with a SQLite file shared by all workers (``None`` disables)."""
+    global _disk_cache
+    _disk_cache = DiskCache(path) if path else None
 
 
-def clear_google_books_cache() -> None:
-    """Clear in-memory caches (primarily for tests)."""
+def persistent_cache_stats() -> dict[str, dict[str, int]]:
+    """Hit/miss/write counters of the shared cache, keyed by ``search``/``volume``."""
+    return _disk_cache.stats() if _disk_cache is not None else {}
+
+
+def clear_google_books_cache(persistent: bool = True) -> None:
+    """Clear in-memory caches and, unless ``persistent`` is False, the shared one (primarily for tests)."""
     _search_cache.clear()
     _volume_cache.clear()
+    _search_failures.clear()
+    _volume_failures.clear()
+    reset_circuit_breaker()
+    if persistent and _disk_cache is not None:
+        _disk_cache.clear()
+
+
+def _read_shared(cache: LRUCache, namespace: str, key: str):
+    """Look up the shared cache, promoting hits into ``cache`` with their remaining TTL."""
+    if _disk_cache is None or _cache_ttl_seconds() <= 0:
+        return None
+    entry = _disk_cache.lookup(namespace, key)
+    if entry is None:
+        return None
+    value, remaining = entry
+    if namespace == 'search':
+        value = SearchOutcome(value['results'])
+        cache.set(key, value, remaining, stale_ttl=_search_stale_seconds())
+    else:
+        cache.set(key, value, remaining)
+    return value
+
+
+def _persist(namespace: str, items: dict) -> None:
+    if _disk_cache is not None:
+        _disk_cache.set_many(namespace, items, _cache_ttl_seconds())
 
 
 def _seed_volume_cache(results: list) -> None:
+    volumes = {}
     for book in results:
         google_books_id = book.get('google_books_id')
         if google_books_id:
-            _cache_set(_volume_cache, google_books_id, book)
+            _volume_cache.set(google_books_id, book, _cache_ttl_seconds())
+            volumes[google_books_id] = book
+    _persist('volume', volumes)
 
 
 def _optional_api_key_params():
@@ -96,15 +152,19 @@ def _volume_info_to_result(volume_info, google_books_id):
     published = volume_info.get('publishedDate')
     isbn = _extract_isbn(volume_info)
     image_links = volume_info.get('imageLinks') or {}
+    authors = volume_info.get('authors', [])
+    categories = volume_info.get('categories', [])
     return {
         'google_books_id': google_books_id,
         'title': volume_info.get('title'),
-        'authors': ', '.join(volume_info.get('authors', [])),
+        'authors': ', '.join(authors),
+        'author_names': authors,
         'isbn': isbn,
         'thumbnail': pick_cover_url(image_links, google_books_id, isbn),
         'description': volume_info.get('description'),
         'page_count': volume_info.get('pageCount'),
-        'categories': ', '.join(volume_info.get('categories', [])),
+        'categories': ', '.join(categories),
+        'category_names': categories,
         'published_year': published[:4] if published else None,
         'language': volume_info.get('language'),
         'average_rating': volume_info.get('averageRating'),
@@ -112,60 +172,147 @@ def _volume_info_to_result(volume_info, google_books_id):
 
 
 def search_books(query: str) -> SearchOutcome:
-    """Search for books using the Google Books API."""
+    """Search for books using the Google Books API.
+
+    Concurrent misses for the same normalized query share one outbound request.
+    Within ``GOOGLE_BOOKS_SEARCH_STALE_SECONDS`` after expiry the previous
+    result is returned immediately and refreshed in a background thread.
+    A failed search is answered from memory for
+    ``GOOGLE_BOOKS_NEGATIVE_CACHE_SECONDS`` instead of being retried.
+    """
     cache_key = _normalize_query(query)
-    cached = _cache_get(_search_cache, cache_key)
+    entry = _search_cache.get_stale(cache_key)
+    if entry is not None:
+        outcome, fresh = entry
+        if not fresh and _search_failures.get(cache_key) is None:
+            _revalidate_search_in_background(query, cache_key)
+        return outcome
+    error_message = _search_failures.get(cache_key)
+    if error_message is not None:
+        return SearchOutcome([], error_message=error_message)
+    cached = _read_shared(_search_cache, 'search', cache_key)
+    if cached is not None:
+        return cached
+    return _search_flight.do(cache_key, _fetch_search, query, cache_key)
+
+
+def _revalidate_search_in_background(query: str, cache_key: str) -> None:
+    if _search_flight.in_flight(cache_key):
+        return
+    threading.Thread(
+        target=_revalidate_search,
+        args=(query, cache_key),
+        name='google-books-revalidate',
+        daemon=True,
+    ).start()
+
+
+def _revalidate_search(query: str, cache_key: str) -> None:
+    try:
+        _search_flight.do(cache_key, _fetch_search, query, cache_key)
+    except Exception as e:
+        logger.warning('Google Books background revalidation failed for {!r}: {}', cache_key, e)
+
+
+def _fetch_search(query: str, cache_key: str) -> SearchOutcome:
+    # A call that finished just before this one became leader may have refreshed the cache.
+    cached = _search_cache.get(cache_key)
     if cached is not None:
         return cached
 
     params = {'q': query, 'maxResults': 10, **_optional_api_key_params()}
     try:
-        response = requests.get(BASE_URL, params=params, timeout=30)
+        response = get_with_retries(BASE_URL, params=params)
+    except CircuitOpenError:
+        return _search_failed(cache_key, 'Google Books is temporarily unavailable. Please try again shortly.')
     except requests.RequestException as e:
         logger.warning('Google Books search request failed: {}', e)
-        return SearchOutcome([], error_message='Could not reach Google Books. Check your network connection.')
+        return _search_failed(cache_key, 'Could not reach Google Books. Check your network connection.')
 
     if response.status_code != 200:
         msg = _http_error_message(response)
         logger.warning('Google Books search HTTP {}: {}', response.status_code, msg)
-        return SearchOutcome([], error_message=msg)
+        return _search_failed(cache_key, msg)
 
+    _search_failures.delete(cache_key)
     data = response.json()
     results = []
     for item in data.get('items', []):
         volume_info = item.get('volumeInfo', {})
         results.append(_volume_info_to_result(volume_info, item.get('id')))
     outcome = SearchOutcome(results)
-    _cache_set(_search_cache, cache_key, outcome)
+    _search_cache.set(cache_key, outcome, _cache_ttl_seconds(), stale_ttl=_search_stale_seconds())
+    _persist('search', {cache_key: {'results': results}})
     _seed_volume_cache(results)
     return outcome
 
 
-def get_book_details(google_books_id):
-    """Retrieve specific book details by Google Books ID."""
-    cached = _cache_get(_volume_cache, google_books_id)
-    if cached is not None:
-        return cached
+def _search_failed(cache_key: str, error_message: str) -> SearchOutcome:
+    _search_failures.set(cache_key, error_message, _negative_cache_seconds())
+    return SearchOutcome([], error_message=error_message)
+
+
+@dataclass
+class VolumeFetch:
+    """Direct volume request result: details, the volume ETag, or a not-modified marker."""
+
+    details: dict | None = None
+    etag: str | None = None
+    not_modified: bool = False
+
+
+def fetch_volume(google_books_id: str, etag: str | None = None) -> VolumeFetch:
+    """Fetch a volume bypassing the caches (which are refreshed with the result).
+
+    With ``etag`` the request is conditional: an unchanged volume returns
+    ``not_modified=True`` without a body. Failures return an empty ``VolumeFetch``.
+    Concurrent calls for the same volume and ETag share one outbound request.
+    """
+    return _volume_flight.do((google_books_id, etag), _fetch_volume, google_books_id, etag)
 
+
+def _fetch_volume(google_books_id: str, etag: str | None) -> VolumeFetch:
+    headers = {'If-None-Match': etag} if etag else None
     try:
-        response = requests.get(
+        response = get_with_retries(
             f'{BASE_URL}/{google_books_id}',
             params=_optional_api_key_params(),
-            timeout=30,
+            headers=headers,
         )
+    except CircuitOpenError:
+        return _volume_failed(google_books_id, 'circuit open')
     except requests.RequestException as e:
         logger.warning('Google Books volume request failed: {}', e)
-        return None
+        return _volume_failed(google_books_id, str(e))
 
+    if response.status_code == 304:
+        return VolumeFetch(etag=etag, not_modified=True)
     if response.status_code != 200:
-        logger.warning(
-            'Google Books volume HTTP {}: {}',
-            response.status_code,
-            _http_error_message(response),
-        )
-        return None
+        msg = _http_error_message(response)
+        logger.warning('Google Books volume HTTP {}: {}', response.status_code, msg)
+        return _volume_failed(google_books_id, msg)
+    _volume_failures.delete(google_books_id)
     data = response.json()
     volume_info = data.get('volumeInfo', {})
     result = _volume_info_to_result(volume_info, data.get('id'))
-    _cache_set(_volume_cache, google_books_id, result)
-    return result
+    _volume_cache.set(google_books_id, result, _cache_ttl_seconds())
+    _persist('volume', {google_books_id: result})
+    return VolumeFetch(details=result, etag=response.headers.get('ETag') or data.get('etag'))
+
+
+def _volume_failed(google_books_id: str, error_message: str) -> VolumeFetch:
+    _volume_failures.set(google_books_id, error_message, _negative_cache_seconds())
+    return VolumeFetch()
+
+
+def get_book_details(google_books_id):
+    """Retrieve specific book details by Google Books ID (``None`` on failure, negatively cached)."""
+    cached = _volume_cache.get(google_books_id)
+    if cached is not None:
+        return cached
+    if _volume_failures.get(google_books_id) is not None:
+        return None
+    cached = _read_shared(_volume_cache, 'volume', google_books_id)
+    if cached is not None:
+        return cached
+    return fetch_volume(google_books_id).details
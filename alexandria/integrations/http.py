@@ -0,0 +1,145 @@
+import os
+import random
+import threading
+import time
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+
+import requests
+from loguru import logger
+from requests.adapters import HTTPAdapter
+
+from alexandria.config import env_float
+from alexandria.utils.circuit_breaker import CircuitBreaker
+
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+_session: requests.Session | None = None
+_session_pid: int | None = None
+_session_lock = threading.Lock()
+_breaker = CircuitBreaker()
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of calling Google Books while the circuit breaker is open."""
+
+
+def _max_retries() -> int:
+    return int(env_float('GOOGLE_BOOKS_MAX_RETRIES', 2))
+
+
+def _timeouts() -> tuple[float, float]:
+    """``(connect, read)`` timeouts: fail fast on dead hosts, allow slow responses."""
+    return (
+        env_float('GOOGLE_BOOKS_CONNECT_TIMEOUT_SECONDS', 3.05),
+        env_float('GOOGLE_BOOKS_READ_TIMEOUT_SECONDS', 10.0),
+    )
+
+
+def _max_backoff_seconds() -> float:
+    return env_float('GOOGLE_BOOKS_MAX_BACKOFF_SECONDS', 8.0)
+
+
+def _configure_breaker() -> CircuitBreaker:
+    _breaker.failure_threshold = int(env_float('GOOGLE_BOOKS_CIRCUIT_FAILURE_THRESHOLD', 5))
+    _breaker.reset_timeout = env_float('GOOGLE_BOOKS_CIRCUIT_RESET_SECONDS', 30.0)
+    return _breaker
+
+
+def circuit_breaker_stats() -> dict:
+    return _breaker.stats()
+
+
+def reset_circuit_breaker() -> None:
+    _breaker.reset()
+
+
+def get_session() -> requests.Session:
+    """Keep-alive session with a connection pool, shared by all threads of this process."""
+    global _session, _session_pid
+    with _session_lock:
+        if _session is None or _session_pid != os.getpid():
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=10, max_retries=0)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _session, _session_pid = session, os.getpid()
+        return _session
+
+
+def retry_after_seconds(response: requests.Response) -> float | None:
+    """Parse ``Retry-After`` as delta-seconds or an HTTP date; ``None`` when absent or invalid."""
+    value = (response.headers or {}).get('Retry-After')
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=UTC)
+    return max(0.0, (when - datetime.now(UTC)).total_seconds())
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float | None = None) -> float:
+    """Exponential backoff with full jitter: uniform in ``[0, min(cap, base * 2**attempt)]``."""
+    if cap is None:
+        cap = _max_backoff_seconds()
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def get_with_retries(url: str, params: dict | None = None, headers: dict | None = None) -> requests.Response:
+    """GET through the pooled session, retrying connection errors and 429/5xx responses.
+
+    A ``Retry-After`` header takes precedence over the computed backoff; when it
+    asks for a longer wait than ``GOOGLE_BOOKS_MAX_BACKOFF_SECONDS`` the last
+    response is returned as-is rather than holding the request open. Raises
+    ``requests.RequestException`` once connection retries are exhausted.
+
+    Each call reports its final outcome to a circuit breaker: after
+    ``GOOGLE_BOOKS_CIRCUIT_FAILURE_THRESHOLD`` consecutive failed calls it
+    raises ``CircuitOpenError`` immediately for
+    ``GOOGLE_BOOKS_CIRCUIT_RESET_SECONDS``, then lets a single probe through.
+    """
+    breaker = _configure_breaker()
+    if not breaker.allow_request():
+        raise CircuitOpenError('Google Books circuit breaker is open')
+    try:
+        response = _get_with_retries(url, params, headers)
+    except Exception:
+        breaker.record_failure()
+        raise
+    if response.status_code in RETRYABLE_STATUS_CODES:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    return response
+
+
+def _get_with_retries(url: str, params: dict | None, headers: dict | None) -> requests.Response:
+    session = get_session()
+    max_retries = _max_retries()
+    max_backoff = _max_backoff_seconds()
+    attempt = 0
+    while True:
+        try:
+            response = session.get(url, params=params, headers=headers, timeout=_timeouts())
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if attempt >= max_retries:
+                raise
+            delay = backoff_delay(attempt, cap=max_backoff)
+            logger.info('Google Books request failed ({}); retrying in {:.2f}s', e, delay)
+        else:
+            if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= max_retries:
+                return response
+            delay = retry_after_seconds(response)
+            if delay is None:
+                delay = backoff_delay(attempt, cap=max_backoff)
+            elif delay > max_backoff:
+                return response
+            logger.info('Google Books HTTP {}; retrying in {:.2f}s', response.status_code, delay)
+        time.sleep(delay)
+        attempt += 1
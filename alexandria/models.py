@@ -1,11 +1,14 @@
+import json
 from datetime import UTC, datetime
 
 from flask_login import UserMixin
+from sqlalchemy.orm import validates
 from werkzeug.security import check_password_hash, generate_password_hash
 
-from alexandria.constants import BookStatus
+from alexandria.constants import BookStatus, JobStatus
 from alexandria.extensions import db
 from alexandria.utils.covers import resolve_cover_fallback_url, resolve_cover_url
+from alexandria.utils.sorting import nulls_as_oldest
 
 
 class User(UserMixin, db.Model):
@@ -20,13 +23,41 @@ class User(UserMixin, db.Model):
         return check_password_hash(self.password_hash, password)
 
 
+# Many-to-many links for faceting; the reverse (facet → books) lookups use the second index.
+book_author = db.Table(
+    'book_author',
+    db.Column('book_id', db.Integer, db.ForeignKey('book.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('author_id', db.Integer, db.ForeignKey('author.id', ondelete='CASCADE'), primary_key=True),
+    db.Index('ix_book_author_author_id', 'author_id', 'book_id'),
+)
+
+book_category = db.Table(
+    'book_category',
+    db.Column('book_id', db.Integer, db.ForeignKey('book.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('category_id', db.Integer, db.ForeignKey('category.id', ondelete='CASCADE'), primary_key=True),
+    db.Index('ix_book_category_category_id', 'category_id', 'book_id'),
+)
+
+
+class Author(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(200), unique=True, nullable=False)
+    books = db.relationship('Book', secondary=book_author, back_populates='author_list')
+
+
+class Category(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(200), unique=True, nullable=False)
+    books = db.relationship('Book', secondary=book_category, back_populates='category_list')
+
+
 class Book(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     google_books_id = db.Column(db.String(50), unique=True, nullable=True)
     title = db.Column(db.String(200), nullable=False)
     authors = db.Column(db.String(200))
     thumbnail = db.Column(db.String(500))
-    isbn = db.Column(db.String(20), nullable=True)
+    isbn = db.Column(db.String(20), nullable=True, index=True)
     description = db.Column(db.Text)
     page_count = db.Column(db.Integer)
     categories = db.Column(db.String(200))
@@ -34,26 +65,54 @@ class Book(db.Model):
     language = db.Column(db.String(10))
     average_rating = db.Column(db.Float)
     status = db.Column(db.String(20), default=BookStatus.READING)
-    date_added = db.Column(db.DateTime, default=lambda: datetime.now(UTC))
-    date_finished = db.Column(db.DateTime, nullable=True)
+    date_added = db.Column(db.DateTime, default=lambda: datetime.now(UTC), index=True)
+    date_finished = db.Column(db.DateTime, nullable=True, index=True)
     personal_rating = db.Column(db.Float, nullable=True)
     personal_notes = db.Column(db.Text, nullable=True)
+    metadata_refreshed_at = db.Column(db.DateTime, nullable=True)
+    metadata_etag = db.Column(db.String(100), nullable=True)
+    # Resolved from thumbnail/google_books_id/isbn whenever one of them is set.
+    resolved_cover_url = db.Column(db.String(500), nullable=True)
+    resolved_cover_fallback_url = db.Column(db.String(500), nullable=True)
+    # Set by cover validation: the URL that served a real image (None if neither did).
+    verified_cover_url = db.Column(db.String(500), nullable=True)
+    cover_checked_at = db.Column(db.DateTime, nullable=True)
+    # Shown while the cover loads: dominant colour (#rrggbb) and a tiny data: URI preview.
+    cover_color = db.Column(db.String(7), nullable=True)
+    cover_preview = db.Column(db.Text, nullable=True)
+    # Normalized copies of ``authors``/``categories`` (which stay the display strings).
+    author_list = db.relationship('Author', secondary=book_author, back_populates='books', order_by='Author.name')
+    category_list = db.relationship(
+        'Category', secondary=book_category, back_populates='books', order_by='Category.name'
+    )
+
+    @validates('thumbnail', 'google_books_id', 'isbn')
+    def _resolve_cover_urls_on_set(self, key, value):
+        self.resolve_cover_urls(**{key: value})
+        return value
+
+    def resolve_cover_urls(self, **overrides) -> None:
+        """Recompute the stored primary and fallback cover URLs from the cover metadata."""
+        fields = {
+            'thumbnail': self.thumbnail,
+            'google_books_id': self.google_books_id,
+            'isbn': self.isbn,
+            **overrides,
+        }
+        self.resolved_cover_url = resolve_cover_url(**fields)
+        self.resolved_cover_fallback_url = resolve_cover_fallback_url(**fields)
 
     @property
     def cover_url(self):
-        return resolve_cover_url(
-            thumbnail=self.thumbnail,
-            google_books_id=self.google_books_id,
-            isbn=self.isbn,
-        )
+        if self.cover_checked_at is not None:
+            return self.verified_cover_url
+        return self.resolved_cover_url
 
     @property
     def cover_fallback_url(self):
-        return resolve_cover_fallback_url(
-            thumbnail=self.thumbnail,
-            google_books_id=self.google_books_id,
-            isbn=self.isbn,
-        )
+        if self.cover_checked_at is not None:
+            return None
+        return self.resolved_cover_fallback_url
 
     def to_dict(self):
         return {
@@ -73,3 +132,73 @@ class Book(db.Model):
             'personal_rating': self.personal_rating,
             'personal_notes': self.personal_notes,
         }
+
+
+class ReadingStat(db.Model):
+    """Finished books and their pages for one month, counted along one dimension.
+
+    Maintained incrementally by ``alexandria.services.reading_stats`` as books
+    are flushed; ``key`` is the category, language, … (empty for ``total``).
+    """
+
+    dimension = db.Column(db.String(20), primary_key=True)
+    period = db.Column(db.String(7), primary_key=True)  # 'YYYY-MM' of date_finished
+    key = db.Column(db.String(200), primary_key=True, default='')
+    books = db.Column(db.Integer, nullable=False, default=0)
+    pages = db.Column(db.Integer, nullable=False, default=0)
+
+
+class LibraryGeneration(db.Model):
+    """Single row counting flushes that changed a book; caches of derived views key on it."""
+
+    id = db.Column(db.Integer, primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+
+# Composite indexes for the shelf and filter queries in services/books.py: the
+# status is matched by equality and the second column serves the ORDER BY (the
+# rowid tiebreaker is implicit in every SQLite index). The expression indexes
+# must stay identical to the sort keys built there with ``nulls_as_oldest``.
+db.Index('ix_book_status_date_added', Book.status, nulls_as_oldest(Book.date_added))
+db.Index(
+    'ix_book_status_finish_order',
+    Book.status,
+    nulls_as_oldest(db.func.coalesce(Book.date_finished, Book.date_added)),
+)
+db.Index('ix_book_status_date_finished', Book.status, Book.date_finished)
+db.Index('ix_book_status_title', Book.status, Book.title)
+
+
+class Job(db.Model):
+    """A unit of background work, persisted so any worker process can pick it up."""
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default=JobStatus.QUEUED, index=True)
+    params = db.Column(db.Text, nullable=True)
+    progress_current = db.Column(db.Integer, nullable=False, default=0)
+    progress_total = db.Column(db.Integer, nullable=True)
+    message = db.Column(db.String(500), nullable=True)
+    result = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(UTC))
+    started_at = db.Column(db.DateTime, nullable=True)
+    heartbeat_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    @property
+    def params_dict(self) -> dict:
+        return json.loads(self.params) if self.params else {}
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'params': self.params_dict,
+            'progress': {'current': self.progress_current, 'total': self.progress_total},
+            'message': self.message,
+            'result': json.loads(self.result) if self.result else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
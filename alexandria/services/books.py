@@ -1,63 +1,145 @@
 from datetime import UTC, datetime
 
+from sqlalchemy.orm import defer
+
 from alexandria.constants import BookStatus
 from alexandria.extensions import db
-from alexandria.models import Book
+from alexandria.models import Author, Book, Category
+from alexandria.services.pagination import keyset_paginate, nulls_as_oldest, sort_order
+from alexandria.services.search import build_match_query, fts_matches, search_index_available
+from alexandria.utils.text import split_names
+
+
+# Long text columns no list view renders. Deferred, they are neither read from
+# the database nor kept per row; touching one still loads it (one query per book).
+LIST_DEFERRED_COLUMNS = (Book.description, Book.personal_notes)
+
+
+def list_books():
+    """``Book.query`` for list views (shelves, search, calendar, stats) without the long text columns."""
+    return Book.query.options(*(defer(column) for column in LIST_DEFERRED_COLUMNS))
 
 
 def get_reading_and_finished_lists():
-    reading_list = Book.query.filter_by(status=BookStatus.READING).order_by(Book.date_added.desc()).all()
-    finished_list = Book.query.filter_by(status=BookStatus.FINISHED).order_by(Book.date_finished.desc()).all()
+    reading_list = list_books().filter_by(status=BookStatus.READING).order_by(Book.date_added.desc()).all()
+    finished_list = list_books().filter_by(status=BookStatus.FINISHED).order_by(Book.date_finished.desc()).all()
     return reading_list, finished_list
 
 
-def get_collection_lists(page: int = 1, per_page: int = 24) -> dict:
-    """Return all books grouped by status for the index page.
+SORT_OPTIONS = ('relevance', 'date_added_desc', 'title_asc', 'title_desc', 'date_finished_desc')
+
+# Books shown per non-finished shelf on the index; the rest are one click away via ``?status=``.
+SHELF_LIMIT = 24
+
 
-    The ``finished`` key is a Flask-SQLAlchemy Pagination object;
-    all others are plain lists.
+def count_books_by_status() -> dict[str, int]:
+    """Number of books per status (every status present, zero when empty)."""
+    counts = dict.fromkeys(BookStatus.ALL, 0)
+    rows = db.session.query(Book.status, db.func.count(Book.id)).group_by(Book.status).all()
+    for status, count in rows:
+        if status in counts:
+            counts[status] = count
+    return counts
+
+
+def get_collection_lists(
+    page: int | None = None,
+    per_page: int = 24,
+    shelf_limit: int | None = None,
+    cursor: str | None = None,
+) -> dict:
+    """Return the index shelves, each loaded with its own LIMITed query.
+
+    ``finished`` is one page of finished books (newest finish first) and the
+    other statuses hold at most ``shelf_limit`` (default ``SHELF_LIMIT``)
+    most recently added books.
+    ``_counts`` has the full size of every shelf, so templates can link to
+    the rest. ``_finished_page`` is a ``CursorPage`` positioned by ``cursor``,
+    or a page-number ``Pagination`` when ``page`` is given.
     """
-    all_books = Book.query.order_by(Book.date_added.desc()).all()
-    groups: dict[str, list] = {s: [] for s in BookStatus.ALL}
-    for book in all_books:
-        if book.status in groups:
-            groups[book.status].append(book)
-
-    # Sort finished by date_finished descending, then paginate in Python
-    finished_sorted = sorted(
-        groups[BookStatus.FINISHED],
-        key=lambda b: b.date_finished or b.date_added,
-        reverse=True,
-    )
-    total = len(finished_sorted)
-    start = (page - 1) * per_page
-    groups[BookStatus.FINISHED] = finished_sorted[start:start + per_page]
-    groups['_finished_total'] = total
-    groups['_finished_pages'] = max(1, (total + per_page - 1) // per_page)
+    if shelf_limit is None:
+        shelf_limit = SHELF_LIMIT
+    groups: dict = {}
+    for status in BookStatus.ALL:
+        if status != BookStatus.FINISHED:
+            groups[status] = (
+                list_books().filter_by(status=status)
+                .order_by(nulls_as_oldest(Book.date_added).desc(), Book.id.desc())
+                .limit(shelf_limit)
+                .all()
+            )
+
+    finished_query = list_books().filter_by(status=BookStatus.FINISHED)
+    sort_keys = [(nulls_as_oldest(db.func.coalesce(Book.date_finished, Book.date_added)), True), (Book.id, True)]
+    if page is not None:
+        finished = finished_query.order_by(*sort_order(sort_keys)).paginate(
+            page=page, per_page=per_page, error_out=False
+        )
+    else:
+        finished = keyset_paginate(finished_query, sort_keys, 'finished', per_page, cursor)
+    groups[BookStatus.FINISHED] = finished.items
+    groups['_counts'] = count_books_by_status()
+    groups['_finished_total'] = finished.total
+    groups['_finished_page'] = finished
     return groups
 
 
+def _sort_keys(sort: str, rank=None) -> list:
+    """``(expression, descending)`` keys for a ``filter_books`` sort, ending with ``id`` as tiebreaker."""
+    if sort == 'relevance' and rank is not None:
+        return [(rank, False), (Book.id, False)]
+    if sort == 'title_asc':
+        return [(Book.title, False), (Book.id, False)]
+    if sort == 'title_desc':
+        return [(Book.title, True), (Book.id, True)]
+    if sort == 'date_finished_desc':
+        return [(nulls_as_oldest(Book.date_finished), True), (Book.id, True)]
+    return [(nulls_as_oldest(Book.date_added), True), (Book.id, True)]
+
+
 def filter_books(q: str | None = None, status: str | None = None,
-                 sort: str = 'date_added_desc', page: int = 1, per_page: int = 24):
-    """Full-text + status filter with pagination. Returns Flask-SQLAlchemy Pagination."""
-    query = Book.query
-    if q:
+                 sort: str = 'date_added_desc', page: int | None = None, per_page: int = 24,
+                 cursor: str | None = None, author: str | None = None, category: str | None = None):
+    """Full-text + status filter with pagination.
+
+    ``q`` is matched word by word as prefixes against title, authors,
+    description, categories and notes through the FTS5 index, where
+    ``sort='relevance'`` orders by bm25; without FTS5 it falls back to a
+    LIKE on title/authors (and relevance to recently added). ``author`` and
+    ``category`` are exact names matched through the normalized link tables.
+
+    Returns a ``CursorPage`` (keyset pagination; ``cursor`` is a token from a
+    previous page) unless ``page`` is given, in which case it falls back to
+    a Flask-SQLAlchemy ``Pagination`` by page number.
+    """
+    query = list_books()
+    rank = None
+    if q and search_index_available():
+        match = build_match_query(q)
+        if match is None:
+            query = query.filter(db.false())
+        else:
+            matches = fts_matches(match)
+            query = query.join(matches, matches.c.book_id == Book.id)
+            rank = matches.c.rank
+    elif q:
         like = f'%{q}%'
         query = query.filter(
             db.or_(Book.title.ilike(like), Book.authors.ilike(like))
         )
     if status and status in BookStatus.ALL:
-        query = query.filter_by(status=status)
+        query = query.filter(Book.status == status)
+    if author:
+        query = query.filter(Book.author_list.any(Author.name == author))
+    if category:
+        query = query.filter(Book.category_list.any(Category.name == category))
 
-    sort_map = {
-        'date_added_desc': Book.date_added.desc(),
-        'title_asc': Book.title.asc(),
-        'title_desc': Book.title.desc(),
-        'date_finished_desc': Book.date_finished.desc().nulls_last(),
-    }
-    order = sort_map.get(sort, Book.date_added.desc())
-    query = query.order_by(order)
-    return query.paginate(page=page, per_page=per_page, error_out=False)
+    if sort not in SORT_OPTIONS:
+        sort = 'date_added_desc'
+    sort_keys = _sort_keys(sort, rank)
+    if page is not None:
+        return query.order_by(*sort_order(sort_keys)).paginate(page=page, per_page=per_page, error_out=False)
+    return keyset_paginate(query, sort_keys, sort, per_page, cursor)
 
 
 def get_book_or_404(book_id: int):
@@ -77,6 +159,44 @@ def book_by_google_id(google_books_id: str):
     return Book.query.filter_by(google_books_id=google_books_id).first()
 
 
+def _named(model, names: list[str]) -> list:
+    """Rows of ``model`` (``Author``/``Category``) for ``names``, creating the missing ones."""
+    if not names:
+        return []
+    existing = {row.name: row for row in model.query.filter(model.name.in_(names))}
+    for name in names:
+        if name not in existing:
+            existing[name] = model(name=name)
+            db.session.add(existing[name])
+    return [existing[name] for name in names]
+
+
+def _facet_names(details: dict, names_key: str, joined_key: str) -> list[str]:
+    names = details.get(names_key)
+    if names is None:
+        # Details cached before the arrays were added only have the joined string.
+        return split_names(details.get(joined_key))
+    return list(dict.fromkeys(n.strip() for n in names if n and n.strip()))
+
+
+def set_book_facets(book: Book, details: dict) -> None:
+    """Link ``book`` to the authors and categories of API ``details``."""
+    book.author_list = _named(Author, _facet_names(details, 'author_names', 'authors'))
+    book.category_list = _named(Category, _facet_names(details, 'category_names', 'categories'))
+
+
+def backfill_book_facets() -> int:
+    """Link books saved before the author/category tables existed; returns how many were linked."""
+    linked = 0
+    unlinked = Book.query.filter(~Book.author_list.any(), ~Book.category_list.any())
+    for book in unlinked.order_by(Book.id).all():
+        if book.authors or book.categories:
+            set_book_facets(book, {'authors': book.authors, 'categories': book.categories})
+            linked += 1
+    db.session.commit()
+    return linked
+
+
 def add_book_from_api_details(details: dict, status: str = BookStatus.READING) -> Book:
     if status not in BookStatus.ALL:
         status = BookStatus.READING
@@ -93,8 +213,12 @@ def add_book_from_api_details(details: dict, status: str = BookStatus.READING) -
         language=details.get('language'),
         average_rating=details.get('average_rating'),
         status=status,
+        metadata_refreshed_at=datetime.now(UTC),
     )
+    # Added first: looking up the facet rows autoflushes, and the new author
+    # and category rows link to the book through the session.
     db.session.add(new_book)
+    set_book_facets(new_book, details)
     db.session.commit()
     return new_book
 
@@ -2,6 +2,8 @@ import calendar
 from collections import defaultdict
 
 from alexandria.models import Book
+from alexandria.services.books import list_books
+from alexandria.services.snapshot import library_snapshot
 
 
 WEEKDAY_HEADERS = ['Sun', 'Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat']
@@ -13,34 +15,22 @@ def _event_for(book: Book, kind: str) -> dict:
 
 def get_active_months() -> list[tuple[int, int]]:
     """Return all (year, month) tuples that have at least one book event, newest first."""
-    active: set[tuple[int, int]] = set()
-    for book in Book.query.all():
-        if book.date_added:
-            d = book.date_added.date()
-            active.add((d.year, d.month))
-        if book.date_finished:
-            d = book.date_finished.date()
-            active.add((d.year, d.month))
-    return sorted(active, reverse=True)
+    return library_snapshot().active_months()
 
 
 def build_calendar_context(year: int, month: int) -> dict:
-    """Single DB query — builds grid + full navigation context for one month."""
+    """Builds grid + full navigation context for one month, loading only that month's books."""
     cal = calendar.Calendar(firstweekday=6)
     events_by_date = defaultdict(list)
-    active_set: set[tuple[int, int]] = set()
+    snapshot = library_snapshot()
 
-    for book in Book.query.all():
-        if book.date_added:
-            d = book.date_added.date()
-            events_by_date[d].append(_event_for(book, 'started'))
-            active_set.add((d.year, d.month))
-        if book.date_finished:
-            d = book.date_finished.date()
-            events_by_date[d].append(_event_for(book, 'finished'))
-            active_set.add((d.year, d.month))
+    month_books = list_books().filter(Book.id.in_(snapshot.ids_active_in(year, month))).order_by(Book.id)
+    for book in month_books:
+        for kind, value in (('started', book.date_added), ('finished', book.date_finished)):
+            if value and (value.year, value.month) == (year, month):
+                events_by_date[value.date()].append(_event_for(book, kind))
 
-    active_months = sorted(active_set, reverse=True)
+    active_months = snapshot.active_months()
     current_idx = active_months.index((year, month)) if (year, month) in active_months else None
 
     prev_month = (
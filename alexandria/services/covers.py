@@ -0,0 +1,335 @@
+import base64
+import hashlib
+import io
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+
+import requests
+from flask import current_app
+from loguru import logger
+from PIL import Image
+
+from alexandria.extensions import db
+from alexandria.integrations.http import get_session
+from alexandria.models import Book
+from alexandria.services.jobs import ProgressCallback, register_job
+from alexandria.utils.images import image_dimensions, is_placeholder_image, sniff_image_type
+from alexandria.utils.singleflight import SingleFlight
+
+COVER_FETCH_TIMEOUT = (3.05, 10.0)
+MAX_COVER_BYTES = 5 * 1024 * 1024
+# A URL that served no usable image is not retried for this long.
+MISSING_COVER_RETRY_SECONDS = 24 * 3600
+COVER_VALIDATION_BATCH_SIZE = 50
+
+_EXTENSION = 'alexandria.cover_store'
+
+# Fixed thumbnail widths in pixels; the ``srcset`` lets browsers pick per layout and density.
+COVER_WIDTHS = {'card': 200, 'detail': 320, 'retina': 640}
+THUMBNAIL_QUALITY = 82
+# Width of the inline preview; browsers upscale it smoothly into a blur (~200-300 bytes as PNG).
+PREVIEW_WIDTH = 8
+
+
+def cover_version(source_url: str | None) -> str | None:
+    """Short hash of the upstream URL, used to bust browser caches when a cover changes."""
+    if not source_url:
+        return None
+    return hashlib.sha256(source_url.encode()).hexdigest()[:12]
+
+
+@dataclass(frozen=True)
+class StoredCover:
+    """A cover image on disk; ``digest`` is the SHA-256 of its bytes."""
+
+    path: Path
+    digest: str
+    content_type: str
+
+
+class CoverStore:
+    """Content-addressed cover images under ``root``.
+
+    ``blobs/`` holds each distinct image once, named by the SHA-256 of its
+    bytes; ``refs/`` maps the SHA-256 of an upstream URL to the blob it served,
+    or records that it served nothing usable; ``thumbs/`` holds resized JPEG
+    copies of blobs. Files are written to a temp name and renamed, so
+    concurrent workers never see partial images.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self._flight = SingleFlight()
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.root / 'blobs' / digest[:2] / digest
+
+    def _ref_path(self, url: str) -> Path:
+        key = hashlib.sha256(url.encode()).hexdigest()
+        return self.root / 'refs' / key[:2] / key
+
+    def _write_atomic(self, path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def lookup(self, url: str) -> StoredCover | None | bool:
+        """Stored cover for ``url``; ``False`` if it is known to be missing, ``None`` if unknown."""
+        ref = self._ref_path(url)
+        try:
+            content = ref.read_text().strip()
+            modified = ref.stat().st_mtime
+        except OSError:
+            return None
+        if content == '-':
+            return False if time.time() - modified < MISSING_COVER_RETRY_SECONDS else None
+        digest, _, content_type = content.partition(' ')
+        path = self._blob_path(digest)
+        if not path.is_file():
+            return None
+        return StoredCover(path, digest, content_type)
+
+    def store(self, url: str, data: bytes) -> StoredCover:
+        digest = hashlib.sha256(data).hexdigest()
+        content_type = sniff_image_type(data) or 'application/octet-stream'
+        path = self._blob_path(digest)
+        if not path.is_file():
+            self._write_atomic(path, data)
+        self._write_atomic(self._ref_path(url), f'{digest} {content_type}'.encode())
+        return StoredCover(path, digest, content_type)
+
+    def mark_missing(self, url: str) -> None:
+        self._write_atomic(self._ref_path(url), b'-')
+
+    def probe(self, url: str) -> StoredCover | None | bool:
+        """Like ``lookup``, but downloads unknown URLs; ``None`` means the download failed transiently."""
+        cached = self.lookup(url)
+        if cached is None:
+            cached = self._flight.do(url, self._fetch, url)
+        return cached
+
+    def get(self, *urls: str | None) -> StoredCover | None:
+        """First usable cover among ``urls``, downloading and storing it on a miss."""
+        for url in urls:
+            if url:
+                cached = self.probe(url)
+                if cached:
+                    return cached
+        return None
+
+    def resized(self, cover: StoredCover, width: int) -> StoredCover:
+        """``cover`` scaled down to ``width``, generated once and kept under ``thumbs/``.
+
+        Returns ``cover`` itself when it is already narrow enough or cannot be decoded.
+        """
+        digest = f'{cover.digest}-{width}'
+        path = self.root / 'thumbs' / cover.digest[:2] / f'{digest}.jpg'
+        if path.is_file():
+            return StoredCover(path, digest, 'image/jpeg')
+        with open(cover.path, 'rb') as f:
+            dimensions = image_dimensions(f.read(64 * 1024))
+        if dimensions is not None and dimensions[0] <= width:
+            return cover
+        if self._flight.do(path, self._resize, cover, width, path):
+            return StoredCover(path, digest, 'image/jpeg')
+        return cover
+
+    def _resize(self, cover: StoredCover, width: int, path: Path) -> bool:
+        if path.is_file():
+            return True
+        try:
+            with Image.open(cover.path) as image:
+                if image.width <= width:
+                    return False
+                height = round(image.height * width / image.width)
+                thumbnail = image.convert('RGB').resize((width, height), Image.LANCZOS)
+        except (OSError, ValueError, Image.DecompressionBombError) as e:
+            logger.warning('Could not resize cover {}: {}', cover.digest, e)
+            return False
+        buffer = io.BytesIO()
+        thumbnail.save(buffer, 'JPEG', quality=THUMBNAIL_QUALITY, optimize=True, progressive=True)
+        self._write_atomic(path, buffer.getvalue())
+        return True
+
+    def _fetch(self, url: str) -> StoredCover | None | bool:
+        try:
+            response = get_session().get(url, timeout=COVER_FETCH_TIMEOUT)
+        except requests.RequestException as e:
+            # Transient; not remembered so the next request retries.
+            logger.warning('Cover download failed for {}: {}', url, e)
+            return None
+        if response.status_code == 429 or response.status_code >= 500:
+            logger.warning('Cover download failed for {}: HTTP {}', url, response.status_code)
+            return None
+        data = response.content
+        if response.status_code != 200 or len(data) > MAX_COVER_BYTES or is_placeholder_image(data):
+            logger.info('No usable cover at {} (HTTP {}, {} bytes)', url, response.status_code, len(data))
+            self.mark_missing(url)
+            return False
+        return self.store(url, data)
+
+
+def cover_placeholder(cover: StoredCover) -> tuple[str, str] | None:
+    """``(dominant colour as #rrggbb, tiny PNG data URI)`` for ``cover``; ``None`` if it cannot be decoded."""
+    try:
+        with Image.open(cover.path) as image:
+            image = image.convert('RGB')
+            height = max(1, round(image.height * PREVIEW_WIDTH / image.width))
+            preview = image.resize((PREVIEW_WIDTH, height), Image.BOX)
+            palette_image = image.resize((32, 48), Image.BOX).quantize(colors=4)
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        logger.warning('Could not summarise cover {}: {}', cover.digest, e)
+        return None
+    _, index = max(palette_image.getcolors())
+    red, green, blue = palette_image.getpalette()[index * 3:index * 3 + 3]
+    buffer = io.BytesIO()
+    preview.save(buffer, 'PNG', optimize=True)
+    encoded = base64.b64encode(buffer.getvalue()).decode('ascii')
+    return f'#{red:02x}{green:02x}{blue:02x}', f'data:image/png;base64,{encoded}'
+
+
+def apply_cover_placeholder(book: Book, cover: StoredCover | None) -> bool:
+    """Store the placeholder of ``cover`` on ``book`` unless it has one; True when it changed."""
+    if cover is None or book.cover_color is not None:
+        return False
+    placeholder = cover_placeholder(cover)
+    if placeholder is None:
+        return False
+    book.cover_color, book.cover_preview = placeholder
+    return True
+
+
+def backfill_cover_urls(batch_size: int = 500) -> int:
+    """Store resolved cover URLs on books saved before they were persisted; returns how many changed."""
+    changed = 0
+    for book in Book.query.order_by(Book.id).yield_per(batch_size):
+        before = (book.resolved_cover_url, book.resolved_cover_fallback_url)
+        book.resolve_cover_urls()
+        if (book.resolved_cover_url, book.resolved_cover_fallback_url) != before:
+            changed += 1
+    db.session.commit()
+    return changed
+
+
+def get_book_cover(book: Book) -> StoredCover | None:
+    """The cached cover of ``book``; the first time it is available, its placeholder is saved too."""
+    cover = get_cover_store().get(book.cover_url, book.cover_fallback_url)
+    if apply_cover_placeholder(book, cover):
+        db.session.commit()
+    return cover
+
+
+def init_cover_store(app) -> CoverStore:
+    store = CoverStore(app.config['COVER_CACHE_DIR'])
+    app.extensions[_EXTENSION] = store
+    return store
+
+
+def get_cover_store() -> CoverStore:
+    return current_app.extensions[_EXTENSION]
+
+
+@dataclass
+class CoverValidationReport:
+    """Outcome of a cover validation run."""
+
+    total: int = 0
+    primary: int = 0
+    fallback: int = 0
+    missing: int = 0
+    failed: int = 0
+    elapsed_seconds: float = 0.0
+
+
+def _choose_cover(*probes: tuple[str | None, StoredCover | None | bool]) -> tuple[str, str | None]:
+    """Report field and URL for the first working candidate, in preference order.
+
+    A transient failure of a preferred candidate yields ``'failed'`` rather
+    than settling for a lesser one.
+    """
+    for outcome, (url, result) in zip(('primary', 'fallback'), probes):
+        if result:
+            return outcome, url
+        if result is None:
+            return 'failed', None
+    return 'missing', None
+
+
+def validate_library_covers(
+    force: bool = False,
+    workers: int | None = None,
+    progress: ProgressCallback | None = None,
+) -> CoverValidationReport:
+    """Probe each book's primary and fallback cover and store the one that works.
+
+    Only books never checked (or whose cover metadata changed since) are
+    probed unless ``force`` is set. Every distinct URL is downloaded once
+    across ``COVER_VALIDATION_WORKERS`` threads through the cover store, so
+    this also warms the ``/covers`` cache. A book whose candidates only
+    failed transiently stays unchecked and is retried on the next run.
+    """
+    report = CoverValidationReport()
+    started = time.monotonic()
+    store = get_cover_store()
+    if workers is None:
+        workers = current_app.config['COVER_VALIDATION_WORKERS']
+    query = Book.query
+    if not force:
+        query = query.filter(Book.cover_checked_at.is_(None))
+    books = query.order_by(Book.id).all()
+    report.total = len(books)
+    # Candidates as resolved from metadata, ignoring any earlier verification.
+    candidates = {book.id: (book.resolved_cover_url, book.resolved_cover_fallback_url) for book in books}
+    urls = {url for pair in candidates.values() for url in pair if url}
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='cover-validation') as pool:
+        futures = {url: pool.submit(store.probe, url) for url in urls}
+        pending = 0
+        for done, book in enumerate(books, start=1):
+            primary, fallback = candidates[book.id]
+            outcome, verified = _choose_cover(
+                (primary, futures[primary].result() if primary else False),
+                (fallback, futures[fallback].result() if fallback else False),
+            )
+            setattr(report, outcome, getattr(report, outcome) + 1)
+            if outcome != 'failed':
+                if verified != book.verified_cover_url:
+                    book.cover_color = book.cover_preview = None
+                book.verified_cover_url = verified
+                book.cover_checked_at = datetime.now(UTC)
+                if verified:
+                    apply_cover_placeholder(book, futures[verified].result())
+                pending += 1
+                if pending >= COVER_VALIDATION_BATCH_SIZE:
+                    db.session.commit()
+                    pending = 0
+            if progress:
+                progress(done, report.total)
+    db.session.commit()
+    report.elapsed_seconds = time.monotonic() - started
+    logger.info(
+        'Validated covers of {} books: {} primary, {} fallback, {} without a cover, {} failed ({:.1f}s)',
+        report.total,
+        report.primary,
+        report.fallback,
+        report.missing,
+        report.failed,
+        report.elapsed_seconds,
+    )
+    return report
+
+
+@register_job('validate_covers')
+def validate_covers_job(params: dict, progress: ProgressCallback) -> dict:
+    return asdict(validate_library_covers(force=params.get('force', False), progress=progress))
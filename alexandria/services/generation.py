@@ -0,0 +1,94 @@
+from dataclasses import fields, is_dataclass
+
+from sqlalchemy import event
+
+from alexandria.extensions import db
+from alexandria.models import Book, LibraryGeneration
+from alexandria.utils.cache import LRUCache
+
+# Contexts are invalidated by the generation, not by age; the TTL only bounds
+# how long an unused entry can linger.
+CONTEXT_CACHE_TTL_SECONDS = 24 * 3600
+CONTEXT_CACHE_MAX_ENTRIES = 64
+
+_contexts = LRUCache(max_entries=CONTEXT_CACHE_MAX_ENTRIES)
+_BUMP = 'alexandria.bump_generation'
+_UNCOMMITTED = 'alexandria.generation_uncommitted'
+
+
+def current_generation() -> int:
+    """How many flushes have changed a book so far (0 before the first)."""
+    return db.session.query(LibraryGeneration.value).filter_by(id=1).scalar() or 0
+
+
+def generation_committed() -> bool:
+    """False while this session holds a bumped but uncommitted generation, which is not safe to cache under."""
+    return not db.session.info.get(_UNCOMMITTED, False)
+
+
+@event.listens_for(db.session, 'before_flush')
+def _note_book_changes(session, flush_context, instances) -> None:
+    session.info[_BUMP] = any(
+        isinstance(obj, Book) for obj in (*session.new, *session.deleted)
+    ) or any(isinstance(obj, Book) and session.is_modified(obj) for obj in session.dirty)
+
+
+@event.listens_for(db.session, 'after_flush')
+def _bump_generation(session, flush_context) -> None:
+    """Advance the generation in the flush's transaction, so it moves exactly when the change commits."""
+    if session.info.pop(_BUMP, False):
+        bump_generation(session)
+
+
+def bump_generation(session) -> None:
+    """Advance the generation in ``session``'s transaction, for writes the flush hook cannot see."""
+    table = LibraryGeneration.__table__
+    connection = session.connection()
+    bumped = connection.execute(table.update().where(table.c.id == 1).values(value=table.c.value + 1))
+    if bumped.rowcount == 0:
+        connection.execute(table.insert().values(id=1, value=1))
+    session.info[_UNCOMMITTED] = True
+
+
+@event.listens_for(db.session, 'after_commit')
+@event.listens_for(db.session, 'after_rollback')
+def _settle_generation(session) -> None:
+    session.info.pop(_UNCOMMITTED, None)
+
+
+def _detach(value) -> None:
+    """Expunge the books inside a context so later commits in this session cannot expire them."""
+    if isinstance(value, Book):
+        if value in db.session:
+            db.session.expunge(value)
+    elif isinstance(value, dict):
+        for item in value.values():
+            _detach(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _detach(item)
+    elif is_dataclass(value):
+        for f in fields(value):
+            _detach(getattr(value, f.name))
+
+
+def cached_context(name: str, build):
+    """``build()``, reused until the library changes; ``name`` must identify its arguments.
+
+    Books in a cached context are detached: their loaded columns stay
+    readable, but deferred columns and relationships cannot be loaded.
+    """
+    if not generation_committed():
+        return build()
+    key = f'{db.engine.url}|{current_generation()}|{name}'
+    context = _contexts.get(key)
+    if context is None:
+        context = build()
+        _detach(context)
+        _contexts.set(key, context, ttl=CONTEXT_CACHE_TTL_SECONDS)
+    return context
+
+
+def context_cache_stats() -> dict:
+    """Size, eviction and hit-ratio figures of this worker's stats/calendar context cache."""
+    return _contexts.stats()
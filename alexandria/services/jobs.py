@@ -0,0 +1,208 @@
+import json
+import threading
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+
+from loguru import logger
+from sqlalchemy import event
+
+from alexandria.constants import JobStatus
+from alexandria.extensions import db
+from alexandria.models import Job
+
+ProgressCallback = Callable[[int, int], None]
+JobHandler = Callable[[dict, ProgressCallback], dict | None]
+
+_handlers: dict[str, JobHandler] = {}
+_runner: 'JobRunner | None' = None
+
+# Minimum seconds between progress writes, so per-item callbacks stay cheap.
+_PROGRESS_COMMIT_INTERVAL = 1.0
+
+_FLUSHED = 'alexandria.job_flushed_writes'
+
+
+def register_job(kind: str):
+    """Decorator registering ``handler(params, progress) -> result`` for a job kind."""
+    def decorator(handler: JobHandler) -> JobHandler:
+        _handlers[kind] = handler
+        return handler
+    return decorator
+
+
+def enqueue_job(kind: str, params: dict | None = None) -> Job:
+    """Queue a job, or return the queued/running one of the same kind instead of duplicating it."""
+    if kind not in _handlers:
+        raise ValueError(f'Unknown job kind: {kind}')
+    existing = (
+        Job.query.filter(Job.kind == kind, Job.status.in_(JobStatus.ACTIVE))
+        .order_by(Job.id)
+        .first()
+    )
+    if existing:
+        return existing
+    job = Job(kind=kind, status=JobStatus.QUEUED, params=json.dumps(params or {}))
+    db.session.add(job)
+    db.session.commit()
+    if _runner is not None:
+        _runner.wake()
+    return job
+
+
+def get_job(job_id: int) -> Job | None:
+    return db.session.get(Job, job_id)
+
+
+def recent_jobs(limit: int = 20) -> list[Job]:
+    return Job.query.order_by(Job.id.desc()).limit(limit).all()
+
+
+def _requeue_abandoned_jobs(stale_after_seconds: float) -> None:
+    """Put back jobs whose worker stopped sending heartbeats (e.g. the process was killed)."""
+    cutoff = datetime.now(UTC) - timedelta(seconds=stale_after_seconds)
+    abandoned = Job.query.filter(Job.status == JobStatus.RUNNING, Job.heartbeat_at < cutoff).all()
+    for job in abandoned:
+        logger.warning('Requeueing job {} ({}) after missed heartbeats', job.id, job.kind)
+        job.status = JobStatus.QUEUED
+    if abandoned:
+        db.session.commit()
+
+
+def _claim_next_job() -> Job | None:
+    while True:
+        job = Job.query.filter_by(status=JobStatus.QUEUED).order_by(Job.id).first()
+        if job is None:
+            return None
+        now = datetime.now(UTC)
+        claimed = db.session.execute(
+            db.update(Job)
+            .where(Job.id == job.id, Job.status == JobStatus.QUEUED)
+            .values(status=JobStatus.RUNNING, started_at=now, heartbeat_at=now, message=None)
+        ).rowcount
+        db.session.commit()
+        if claimed:
+            db.session.refresh(job)
+            return job
+        # Another worker claimed it first; try the next one.
+
+
+@event.listens_for(db.session, 'after_flush')
+def _note_flushed_writes(session, flush_context) -> None:
+    session.info[_FLUSHED] = True
+
+
+@event.listens_for(db.session, 'after_commit')
+@event.listens_for(db.session, 'after_rollback')
+def _clear_flushed_writes(session) -> None:
+    session.info.pop(_FLUSHED, None)
+
+
+def _write_progress(job_id: int, done: int, total: int) -> None:
+    """Record progress and heartbeat on a connection of its own, outside the handler's unit of work."""
+    with db.engine.begin() as connection:
+        connection.execute(
+            db.update(Job)
+            .where(Job.id == job_id)
+            .values(progress_current=done, progress_total=total, heartbeat_at=datetime.now(UTC))
+        )
+
+
+def run_next_job(stale_after_seconds: float = 900) -> Job | None:
+    """Claim and run the oldest queued job in the current app context; returns it, or ``None``."""
+    _requeue_abandoned_jobs(stale_after_seconds)
+    job = _claim_next_job()
+    if job is None:
+        return None
+    job_id = job.id
+    last_write = 0.0
+    unwritten: tuple[int, int] | None = None
+
+    def progress(done: int, total: int) -> None:
+        # Committing the session here would also commit the handler's pending
+        # changes, defeating its own batching.
+        nonlocal last_write, unwritten
+        unwritten = (done, total)
+        if time.monotonic() - last_write < _PROGRESS_COMMIT_INTERVAL and done < total:
+            return
+        if db.session.info.get(_FLUSHED):
+            # The handler's uncommitted writes hold SQLite's write lock; report after its next commit.
+            return
+        _write_progress(job_id, done, total)
+        last_write = time.monotonic()
+        unwritten = None
+
+    logger.info('Running job {} ({})', job_id, job.kind)
+    try:
+        result = _handlers[job.kind](job.params_dict, progress)
+    except Exception as e:
+        db.session.rollback()
+        logger.exception('Job {} ({}) failed', job_id, job.kind)
+        job = db.session.get(Job, job_id)
+        job.status = JobStatus.FAILED
+        job.message = str(e)[:500]
+    else:
+        job.status = JobStatus.SUCCEEDED
+        job.result = json.dumps(result) if result is not None else None
+    if unwritten is not None:
+        job.progress_current, job.progress_total = unwritten
+    job.finished_at = datetime.now(UTC)
+    db.session.commit()
+    return job
+
+
+def run_pending_jobs() -> int:
+    """Run queued jobs until none are left; returns how many ran (used by tests and the CLI)."""
+    count = 0
+    while run_next_job() is not None:
+        count += 1
+    return count
+
+
+class JobRunner:
+    """Single daemon thread per process that polls the job table and runs jobs one at a time."""
+
+    def __init__(self, app, poll_interval: float = 5.0, stale_after_seconds: float = 900):
+        self.app = app
+        self.poll_interval = poll_interval
+        self.stale_after_seconds = stale_after_seconds
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._loop, name='job-runner', daemon=True)
+            self._thread.start()
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def _loop(self) -> None:
+        while True:
+            ran = None
+            try:
+                with self.app.app_context():
+                    ran = run_next_job(self.stale_after_seconds)
+                    db.session.remove()
+            except Exception:
+                logger.exception('Job runner iteration failed')
+            if ran is None:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+
+def init_job_runner(app) -> JobRunner | None:
+    """Create this process's runner; it starts with the app server, not with CLI commands."""
+    global _runner
+    if not app.config['JOB_RUNNER_ENABLED']:
+        _runner = None
+        return None
+    _runner = JobRunner(
+        app,
+        poll_interval=app.config['JOB_POLL_SECONDS'],
+        stale_after_seconds=app.config['JOB_STALE_SECONDS'],
+    )
+    return _runner
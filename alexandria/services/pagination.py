@@ -0,0 +1,112 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from flask import current_app
+from itsdangerous import BadSignature, URLSafeSerializer
+
+from alexandria.extensions import db
+from alexandria.utils.sorting import nulls_as_oldest  # part of the keyset API: wraps nullable sort columns
+
+_SALT = 'alexandria.cursor'
+
+
+@dataclass
+class CursorPage:
+    """One page of keyset pagination, with opaque tokens for its neighbours.
+
+    ``total`` is counted once on the first page and carried in the tokens,
+    so following pages cost a single indexed range query each.
+    """
+
+    items: list = field(default_factory=list)
+    total: int = 0
+    per_page: int = 24
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self) -> bool:
+        return self.prev_cursor is not None
+
+
+def _serializer() -> URLSafeSerializer:
+    return URLSafeSerializer(current_app.secret_key, salt=_SALT)
+
+
+def _dump(value):
+    return {'dt': value.isoformat()} if isinstance(value, datetime) else value
+
+
+def _load(value):
+    return datetime.fromisoformat(value['dt']) if isinstance(value, dict) else value
+
+
+def _encode(sort: str, direction: str, key: tuple, total: int) -> str:
+    return _serializer().dumps({'s': sort, 'd': direction, 'k': [_dump(v) for v in key], 't': total})
+
+
+def _decode(token: str | None, sort: str, width: int) -> dict | None:
+    """Payload of a valid token for this sort order, else ``None`` (which restarts at page one)."""
+    if not token:
+        return None
+    try:
+        payload = _serializer().loads(token)
+    except BadSignature:
+        return None
+    if payload.get('s') != sort or payload.get('d') not in ('next', 'prev') or len(payload.get('k', ())) != width:
+        return None
+    payload['k'] = [_load(v) for v in payload['k']]
+    return payload
+
+
+def _beyond(sort_keys, values, reverse: bool):
+    """Rows strictly after ``values`` in the sort order (before them when ``reverse``)."""
+    clauses = []
+    for i, (expression, descending) in enumerate(sort_keys):
+        forward = descending != reverse
+        comparison = expression < values[i] if forward else expression > values[i]
+        equal_prefix = [sort_keys[j][0] == values[j] for j in range(i)]
+        clauses.append(db.and_(*equal_prefix, comparison))
+    return db.or_(*clauses)
+
+
+def sort_order(sort_keys, reverse: bool = False):
+    """ORDER BY clauses for ``sort_keys`` (reversed when paging backwards)."""
+    return [expr.desc() if descending != reverse else expr.asc() for expr, descending in sort_keys]
+
+
+def keyset_paginate(query, sort_keys, sort: str, per_page: int, cursor: str | None = None) -> CursorPage:
+    """Paginate ``query`` by the values of ``sort_keys`` instead of an OFFSET.
+
+    ``sort_keys`` is a list of ``(expression, descending)`` pairs that must
+    end with a unique column (the primary key) and must not yield NULLs
+    (wrap nullable columns with ``nulls_as_oldest``). ``sort`` names the
+    order so tokens from another ordering are ignored rather than misapplied.
+    """
+    payload = _decode(cursor, sort, len(sort_keys))
+    total = payload['t'] if payload else query.order_by(None).count()
+    backwards = payload is not None and payload['d'] == 'prev'
+    keyed = query.add_columns(*(expression for expression, _ in sort_keys))
+    if payload:
+        keyed = keyed.filter(_beyond(sort_keys, payload['k'], reverse=backwards))
+    rows = keyed.order_by(*sort_order(sort_keys, reverse=backwards)).limit(per_page + 1).all()
+    more = len(rows) > per_page
+    rows = rows[:per_page]
+    if backwards:
+        rows.reverse()
+        # The page we came back from is still ahead; whatever lies behind is what ``more`` found.
+        has_next, has_prev = True, more
+    else:
+        has_next, has_prev = more, payload is not None
+
+    page = CursorPage(items=[row[0] for row in rows], total=total, per_page=per_page)
+    if rows:
+        if has_next:
+            page.next_cursor = _encode(sort, 'next', tuple(rows[-1][1:]), total)
+        if has_prev:
+            page.prev_cursor = _encode(sort, 'prev', tuple(rows[0][1:]), total)
+    return page
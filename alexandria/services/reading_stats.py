@@ -0,0 +1,175 @@
+from collections import Counter
+
+from sqlalchemy import event, inspect
+
+from alexandria.constants import BookStatus, StatDimension
+from alexandria.extensions import db
+from alexandria.models import Book, Category, ReadingStat, book_author, book_category
+from alexandria.services.generation import bump_generation
+
+# Book columns a ``ReadingStat`` row depends on; edits to anything else skip the bookkeeping.
+TRACKED_COLUMNS = ('status', 'date_finished', 'page_count', 'language', 'published_year')
+# Links counted too: category rows by name, authorship by how many authors a book has.
+TRACKED_LINKS = ('author_list', 'category_list')
+
+_PENDING = 'alexandria.reading_stat_deltas'
+
+
+def book_contributions(values: dict) -> list[tuple[str, str, str, int]]:
+    """``(dimension, period, key, pages)`` rows one book adds to ``reading_stat``.
+
+    ``values`` maps ``TRACKED_COLUMNS`` to the book's values, plus
+    ``author_count`` and ``category_names`` from its links. Only finished
+    books with a finish date count, like everywhere else in the stats.
+    """
+    finished = values['date_finished']
+    if values['status'] != BookStatus.FINISHED or not finished:
+        return []
+    period = finished.strftime('%Y-%m')
+    pages = values['page_count'] or 0
+    rows = [(StatDimension.TOTAL, period, '', pages), (StatDimension.WEEKDAY, period, finished.strftime('%A'), pages)]
+    rows += [(StatDimension.CATEGORY, period, name, pages) for name in values['category_names']]
+    if values['language']:
+        rows.append((StatDimension.LANGUAGE, period, values['language'], pages))
+    year = values['published_year']
+    if year and year.isdigit():
+        rows.append((StatDimension.DECADE, period, f'{year[:3]}0s', pages))
+    if values['author_count']:
+        rows.append((StatDimension.AUTHORSHIP, period, 'multi' if values['author_count'] > 1 else 'solo', pages))
+    return rows
+
+
+def _tally(deltas: dict, values: dict, sign: int) -> None:
+    for dimension, period, key, pages in book_contributions(values):
+        books_delta, pages_delta = deltas.get((dimension, period, key), (0, 0))
+        deltas[(dimension, period, key)] = (books_delta + sign, pages_delta + sign * pages)
+
+
+def _no_links() -> dict:
+    return {'author_count': 0, 'category_names': []}
+
+
+def _link_values(connection, book_ids=None) -> dict[int, dict]:
+    """``author_count`` and ``category_names`` of ``book_ids`` (every book if None), as last flushed."""
+    values: dict[int, dict] = {}
+    authors = db.select(book_author.c.book_id, db.func.count()).group_by(book_author.c.book_id)
+    categories = db.select(book_category.c.book_id, Category.__table__.c.name).join(
+        Category.__table__, Category.__table__.c.id == book_category.c.category_id
+    ).order_by(book_category.c.book_id, Category.__table__.c.name)
+    if book_ids is not None:
+        authors = authors.where(book_author.c.book_id.in_(book_ids))
+        categories = categories.where(book_category.c.book_id.in_(book_ids))
+    for book_id, count in connection.execute(authors):
+        values.setdefault(book_id, _no_links())['author_count'] = count
+    for book_id, name in connection.execute(categories):
+        values.setdefault(book_id, _no_links())['category_names'].append(name)
+    return values
+
+
+def _stored_values(connection, book_ids: list[int]) -> dict[int, dict]:
+    """Tracked columns and links of ``book_ids`` as last flushed, i.e. what ``reading_stat`` currently counts."""
+    if not book_ids:
+        return {}
+    columns = [Book.__table__.c[name] for name in TRACKED_COLUMNS]
+    rows = connection.execute(db.select(Book.__table__.c.id, *columns).where(Book.__table__.c.id.in_(book_ids)))
+    links = _link_values(connection, book_ids)
+    return {row.id: {**dict(zip(TRACKED_COLUMNS, row[1:])), **links.get(row.id, _no_links())} for row in rows}
+
+
+def _current_values(book: Book, stored: dict | None) -> dict:
+    """What ``book`` will count after this flush; unchanged links are taken from ``stored``."""
+    values = {name: getattr(book, name) for name in TRACKED_COLUMNS}
+    attrs = inspect(book).attrs
+    if stored is None or attrs.author_list.history.has_changes():
+        values['author_count'] = len(book.author_list)
+    else:
+        values['author_count'] = stored['author_count']
+    if stored is None or attrs.category_list.history.has_changes():
+        values['category_names'] = [category.name for category in book.category_list]
+    else:
+        values['category_names'] = stored['category_names']
+    return values
+
+
+def _tracked_change(book: Book) -> bool:
+    attrs = inspect(book).attrs
+    return any(attrs[name].history.has_changes() for name in TRACKED_COLUMNS + TRACKED_LINKS)
+
+
+@event.listens_for(db.session, 'before_flush')
+def _collect_reading_stat_deltas(session, flush_context, instances) -> None:
+    """Diff the stats contribution of every book this flush adds, edits or deletes."""
+    changed = [b for b in session.dirty if isinstance(b, Book) and _tracked_change(b)]
+    deleted = [b for b in session.deleted if isinstance(b, Book)]
+    added = [b for b in session.new if isinstance(b, Book)]
+    if not (changed or deleted or added):
+        session.info.pop(_PENDING, None)
+        return
+    stored = _stored_values(session.connection(), [b.id for b in changed + deleted if b.id is not None])
+    deltas: dict = {}
+    for values in stored.values():
+        _tally(deltas, values, -1)
+    for book in changed + added:
+        _tally(deltas, _current_values(book, stored.get(book.id)), 1)
+    session.info[_PENDING] = {k: v for k, v in deltas.items() if v != (0, 0)}
+
+
+@event.listens_for(db.session, 'after_flush')
+def _apply_reading_stat_deltas(session, flush_context) -> None:
+    """Write the collected deltas in the flush's own transaction, so stats commit or roll back with it."""
+    deltas = session.info.pop(_PENDING, None)
+    if deltas:
+        apply_deltas(session.connection(), deltas)
+
+
+def apply_deltas(connection, deltas: dict) -> None:
+    """Add ``{(dimension, period, key): (books, pages)}`` to ``reading_stat``, dropping emptied rows."""
+    table = ReadingStat.__table__
+    for (dimension, period, key), (books, pages) in deltas.items():
+        match = (table.c.dimension == dimension) & (table.c.period == period) & (table.c.key == key)
+        updated = connection.execute(
+            table.update().where(match).values(books=table.c.books + books, pages=table.c.pages + pages)
+        )
+        if updated.rowcount == 0:
+            connection.execute(
+                table.insert().values(dimension=dimension, period=period, key=key, books=books, pages=pages)
+            )
+        elif books < 0:
+            connection.execute(table.delete().where(match & (table.c.books <= 0)))
+
+
+def rebuild_reading_stats() -> int:
+    """Recompute ``reading_stat`` from the books table and bump the generation; returns the rows written."""
+    columns = [getattr(Book, name) for name in TRACKED_COLUMNS]
+    finished = db.session.query(Book.id, *columns).filter(
+        Book.status == BookStatus.FINISHED, Book.date_finished.isnot(None)
+    )
+    links = _link_values(db.session.connection())
+    books: Counter = Counter()
+    pages: Counter = Counter()
+    for row in finished:
+        values = {**dict(zip(TRACKED_COLUMNS, row[1:])), **links.get(row.id, _no_links())}
+        for dimension, period, key, page_count in book_contributions(values):
+            books[(dimension, period, key)] += 1
+            pages[(dimension, period, key)] += page_count
+    db.session.query(ReadingStat).delete()
+    if books:
+        db.session.execute(ReadingStat.__table__.insert(), [
+            {'dimension': d, 'period': p, 'key': k, 'books': n, 'pages': pages[(d, p, k)]}
+            for (d, p, k), n in books.items()
+        ])
+    bump_generation(db.session)  # contexts cached on the old aggregates are stale now
+    db.session.commit()
+    return len(books)
+
+
+def ensure_reading_stats() -> bool:
+    """Rebuild the aggregates when the table is empty but finished books exist; True if it did."""
+    if db.session.query(ReadingStat.query.exists()).scalar():
+        return False
+    if not db.session.query(
+        Book.query.filter(Book.status == BookStatus.FINISHED, Book.date_finished.isnot(None)).exists()
+    ).scalar():
+        return False
+    rebuild_reading_stats()
+    return True
@@ -0,0 +1,124 @@
+import re
+
+from loguru import logger
+from markupsafe import Markup, escape
+from sqlalchemy.exc import OperationalError
+
+from alexandria.extensions import db
+from alexandria.utils.text import strip_book_description_html
+
+FTS_TABLE = 'book_fts'
+FTS_COLUMNS = ('title', 'authors', 'description', 'categories', 'personal_notes')
+# bm25 column weights, in FTS_COLUMNS order: a title hit outranks one buried in a description.
+FTS_WEIGHTS = (10.0, 5.0, 1.0, 2.0, 1.0)
+
+_columns = ', '.join(FTS_COLUMNS)
+_new_values = ', '.join(f'new.{c}' for c in FTS_COLUMNS)
+_old_values = ', '.join(f'old.{c}' for c in FTS_COLUMNS)
+
+# External-content FTS5 index over ``book``, kept in sync by triggers so every
+# writer (ORM, raw SQL, migrations) updates it. Status/date changes do not
+# touch the indexed columns and skip the re-index.
+FTS_SCHEMA = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"{_columns}, content='book', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON book BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, {_columns}) VALUES (new.id, {_new_values}); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON book BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_columns}) VALUES ('delete', old.id, {_old_values}); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF {_columns} ON book BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_columns}) VALUES ('delete', old.id, {_old_values}); "
+    f"INSERT INTO {FTS_TABLE}(rowid, {_columns}) VALUES (new.id, {_new_values}); END",
+)
+
+_TERM = re.compile(r'\w+', re.UNICODE)
+# Snippet markers that cannot occur in text, swapped for <mark> after HTML-escaping.
+_MARK_OPEN, _MARK_CLOSE = '\x02', '\x03'
+
+_fts_ready: dict[str, bool] = {}
+
+
+def _engine_key() -> str:
+    return str(db.engine.url)
+
+
+def ensure_search_index() -> bool:
+    """Create the FTS5 table and triggers if missing; False when SQLite lacks FTS5 (LIKE is used)."""
+    if db.engine.dialect.name != 'sqlite':
+        _fts_ready[_engine_key()] = False
+        return False
+    with db.engine.connect() as connection:
+        existed = connection.execute(
+            db.text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {'name': FTS_TABLE},
+        ).first() is not None
+        try:
+            for statement in FTS_SCHEMA:
+                connection.execute(db.text(statement))
+            if not existed:
+                # A new index over an existing library starts empty; fill it once.
+                connection.execute(db.text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+            connection.commit()
+        except OperationalError as e:
+            logger.warning('SQLite FTS5 unavailable, falling back to LIKE search: {}', e)
+            _fts_ready[_engine_key()] = False
+            return False
+    _fts_ready[_engine_key()] = True
+    return True
+
+
+def search_index_available() -> bool:
+    ready = _fts_ready.get(_engine_key())
+    return ensure_search_index() if ready is None else ready
+
+
+def rebuild_search_index() -> int:
+    """Re-index every book from the ``book`` table; returns the number of indexed rows."""
+    if not ensure_search_index():
+        return 0
+    db.session.execute(db.text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+    db.session.commit()
+    return db.session.execute(db.text(f'SELECT COUNT(*) FROM {FTS_TABLE}')).scalar()
+
+
+def build_match_query(q: str) -> str | None:
+    """FTS5 query where every word must match as a prefix: ``dune herb`` → ``"dune"* AND "herb"*``."""
+    terms = _TERM.findall(q)
+    if not terms:
+        return None
+    return ' AND '.join(f'"{term}"*' for term in terms)
+
+
+def fts_matches(match: str):
+    """Subquery of ``(rowid, rank)`` for books matching ``match``; lower rank is a better match."""
+    weights = ', '.join(str(w) for w in FTS_WEIGHTS)
+    return (
+        db.select(
+            db.literal_column('rowid').label('book_id'),
+            db.literal_column(f'bm25({FTS_TABLE}, {weights})').label('rank'),
+        )
+        .select_from(db.table(FTS_TABLE))
+        .where(db.literal_column(FTS_TABLE).op('MATCH')(match))
+        .subquery()
+    )
+
+
+def search_snippets(book_ids: list[int], q: str, tokens: int = 16) -> dict[int, Markup]:
+    """Highlighted excerpt of the best-matching column per book, safe to render as HTML."""
+    match = build_match_query(q) if q else None
+    if not book_ids or match is None or not search_index_available():
+        return {}
+    rows = db.session.execute(
+        db.text(
+            f"SELECT rowid, snippet({FTS_TABLE}, -1, :open, :close, '…', :tokens) FROM {FTS_TABLE} "
+            f"WHERE {FTS_TABLE} MATCH :match AND rowid IN ({', '.join(str(int(i)) for i in book_ids)})"
+        ),
+        {'open': _MARK_OPEN, 'close': _MARK_CLOSE, 'tokens': tokens, 'match': match},
+    ).all()
+    return {
+        book_id: Markup(
+            str(escape(strip_book_description_html(text))).replace(_MARK_OPEN, '<mark>').replace(_MARK_CLOSE, '</mark>')
+        )
+        for book_id, text in rows
+        if text
+    }
@@ -0,0 +1,171 @@
+import threading
+from array import array
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+
+from alexandria.constants import BookStatus
+from alexandria.extensions import db
+from alexandria.models import Book
+from alexandria.services.generation import current_generation, generation_committed
+
+# Stand-ins for NULL in the integer columns; real page counts and years are never negative.
+NO_DATE = -(2 ** 63)
+NO_VALUE = -1
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+_US_PER_DAY = 86_400 * 1_000_000
+_FINISHED = BookStatus.ALL.index(BookStatus.FINISHED)
+
+_lock = threading.Lock()
+_current: tuple[tuple[str, int], 'LibrarySnapshot'] | None = None
+
+
+def _micros(value: datetime | None) -> int:
+    if value is None:
+        return NO_DATE
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=UTC)
+    return (value - _EPOCH) // timedelta(microseconds=1)
+
+
+def _month_code(value: datetime | None) -> int:
+    """``year * 12 + month - 1`` of the stored (naive) date, as the calendar buckets it."""
+    return value.year * 12 + value.month - 1 if value is not None else NO_VALUE
+
+
+def _year(value: str | None) -> int:
+    return int(value) if value and value.isdecimal() else NO_VALUE
+
+
+@dataclass(frozen=True)
+class FinishedSummary:
+    """Aggregates over the finished books; ``*_id`` name the book shown for a record (lowest id on ties)."""
+
+    count: int
+    first_finish: datetime | None
+    avg_rating: float | None
+    avg_days: float | None
+    min_days: int
+    max_days: int
+    fastest_id: int | None
+    slowest_id: int | None
+    longest_id: int | None
+    shortest_id: int | None
+    oldest_id: int | None
+    num_languages: int
+
+
+@dataclass(frozen=True)
+class LibrarySnapshot:
+    """One ``array`` column per analysed ``Book`` field, rows in id order.
+
+    Statuses are indexes into ``BookStatus.ALL`` and languages indexes into
+    ``languages``; NULLs are ``NO_DATE``/``NO_VALUE``, or NaN for ratings.
+    """
+
+    ids: array
+    status: array
+    added: array
+    finished: array
+    added_month: array
+    finished_month: array
+    pages: array
+    ratings: array
+    language: array
+    year: array
+    languages: tuple[str, ...]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def active_months(self) -> list[tuple[int, int]]:
+        """``(year, month)`` with a book added or finished, newest first."""
+        codes = (set(self.added_month) | set(self.finished_month)) - {NO_VALUE}
+        return [(code // 12, code % 12 + 1) for code in sorted(codes, reverse=True)]
+
+    def ids_active_in(self, year: int, month: int) -> list[int]:
+        """Ids of the books added or finished in ``year``/``month``."""
+        code = year * 12 + month - 1
+        return [
+            book_id for book_id, added, finished in zip(self.ids, self.added_month, self.finished_month)
+            if code in (added, finished)
+        ]
+
+    def finished_summary(self, first_month: int | None = None, end_month: int | None = None) -> FinishedSummary:
+        """Summary of the books finished in months ``first_month <= code < end_month`` (open if None)."""
+        low = NO_VALUE if first_month is None else first_month
+        high = float('inf') if end_month is None else end_month
+        done = [
+            i for i, (status, finished, month) in enumerate(zip(self.status, self.finished, self.finished_month))
+            if status == _FINISHED and finished != NO_DATE and low <= month < high
+        ]
+
+        def pick(pairs, largest=False):
+            # ``min``/``max`` keep the first extreme, i.e. the lowest id.
+            pairs = list(pairs)
+            if not pairs:
+                return None, None
+            return (max if largest else min)(pairs, key=lambda pair: pair[0])
+
+        days = [
+            ((self.finished[i] - self.added[i]) // _US_PER_DAY, self.ids[i])
+            for i in done if self.added[i] != NO_DATE and self.finished[i] >= self.added[i]
+        ]
+        pages = [(self.pages[i], self.ids[i]) for i in done if self.pages[i] != NO_VALUE]
+        years = [(self.year[i], self.ids[i]) for i in done if self.year[i] != NO_VALUE]
+        rated = [self.ratings[i] for i in done if self.ratings[i] == self.ratings[i] and self.ratings[i] != 0]
+        min_days, fastest_id = pick(days)
+        max_days, slowest_id = pick(days, largest=True)
+        return FinishedSummary(
+            count=len(done),
+            first_finish=_EPOCH + timedelta(microseconds=min(self.finished[i] for i in done)) if done else None,
+            avg_rating=sum(rated) / len(rated) if rated else None,
+            avg_days=sum(d for d, _ in days) / len(days) if days else None,
+            min_days=min_days or 0,
+            max_days=max_days or 0,
+            fastest_id=fastest_id,
+            slowest_id=slowest_id,
+            longest_id=pick(pages, largest=True)[1],
+            shortest_id=pick(pages)[1],
+            oldest_id=pick(years)[1],
+            num_languages=len({self.language[i] for i in done} - {NO_VALUE}),
+        )
+
+
+def build_library_snapshot() -> LibrarySnapshot:
+    """Read the analysed columns of every book in one query of plain tuples."""
+    rows = db.session.query(
+        Book.id, Book.status, Book.date_added, Book.date_finished,
+        Book.page_count, Book.average_rating, Book.language, Book.published_year,
+    ).order_by(Book.id).all()
+    statuses = {status: i for i, status in enumerate(BookStatus.ALL)}
+    languages: dict[str, int] = {}
+    return LibrarySnapshot(
+        ids=array('q', [r.id for r in rows]),
+        status=array('b', [statuses.get(r.status, NO_VALUE) for r in rows]),
+        added=array('q', [_micros(r.date_added) for r in rows]),
+        finished=array('q', [_micros(r.date_finished) for r in rows]),
+        added_month=array('i', [_month_code(r.date_added) for r in rows]),
+        finished_month=array('i', [_month_code(r.date_finished) for r in rows]),
+        pages=array('q', [NO_VALUE if r.page_count is None else r.page_count for r in rows]),
+        ratings=array('d', [float('nan') if r.average_rating is None else r.average_rating for r in rows]),
+        language=array('i', [languages.setdefault(r.language, len(languages)) if r.language else NO_VALUE
+                             for r in rows]),
+        year=array('q', [_year(r.published_year) for r in rows]),
+        languages=tuple(languages),
+    )
+
+
+def library_snapshot() -> LibrarySnapshot:
+    """The snapshot of the current library generation, built on first use after each change."""
+    global _current
+    if not generation_committed():
+        return build_library_snapshot()
+    key = (str(db.engine.url), current_generation())
+    current = _current
+    if current is not None and current[0] == key:
+        return current[1]
+    with _lock:
+        if _current is None or _current[0] != key:
+            _current = (key, build_library_snapshot())
+        return _current[1]
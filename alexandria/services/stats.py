@@ -1,9 +1,12 @@
-from dataclasses import dataclass, fields
+from dataclasses import dataclass, field, fields
 from datetime import UTC, datetime
 from typing import Any
 
-from alexandria.constants import BookStatus
-from alexandria.models import Book
+from alexandria.constants import StatDimension
+from alexandria.extensions import db
+from alexandria.models import Book, ReadingStat
+from alexandria.services.books import list_books
+from alexandria.services.snapshot import FinishedSummary, library_snapshot
 
 
 def safe_div(n: float, d: float) -> float:
@@ -64,44 +67,103 @@ class StatsContext:
     def template_kwargs(self) -> dict:
         return {f.name: getattr(self, f.name) for f in fields(self)}
 
-
-def _compute_pages_history(finished_books: list) -> tuple[list, list]:
-    pm_history: dict[str, int] = {}
-    for b in finished_books:
-        if b.page_count:
-            key = b.date_finished.strftime('%Y-%m')
-            pm_history[key] = pm_history.get(key, 0) + b.page_count
-    sorted_keys = sorted(pm_history.keys())
-    labels = [datetime.strptime(k, '%Y-%m').strftime('%b %Y') for k in sorted_keys]
-    data = [pm_history[k] for k in sorted_keys]
+    def chart_data(self) -> dict:
+        """The series drawn by the charts on ``stats.html``, as served by ``/stats.json``."""
+        return {
+            'pages_history': {'labels': self.pages_history_labels, 'data': self.pages_history_data},
+            'seasons': self.seasons,
+            'categories': {'labels': self.cat_labels, 'data': self.cat_data},
+        }
+
+
+@dataclass(frozen=True)
+class StatsRange:
+    """Finish months ``start <= period < end`` (``'YYYY-MM'``); ``None`` leaves that side open."""
+
+    start: str | None = None
+    end: str | None = None
+    label: str = 'All time'
+    args: dict = field(default_factory=dict)
+
+    @property
+    def key(self) -> str:
+        return f'{self.start or ""}..{self.end or ""}'
+
+    def month_codes(self) -> tuple[int | None, int | None]:
+        """``start``/``end`` as the snapshot's ``year * 12 + month - 1`` codes."""
+        return tuple(
+            int(period[:4]) * 12 + int(period[5:]) - 1 if period else None for period in (self.start, self.end)
+        )
+
+    def filter(self, query):
+        """``query`` on ``ReadingStat`` restricted to the range; a range scan of its primary key."""
+        if self.start:
+            query = query.filter(ReadingStat.period >= self.start)
+        if self.end:
+            query = query.filter(ReadingStat.period < self.end)
+        return query
+
+
+ALL_TIME = StatsRange()
+
+
+def stats_range_from_args(args, today: datetime | None = None) -> StatsRange:
+    """``?year=2024`` or ``?range=12m`` (the current and eleven previous months); all time otherwise.
+
+    Raises ``ValueError`` for a malformed year or an unknown range.
+    """
+    if 'year' in args:
+        year = int(args['year'])
+        if not 1 <= year <= 9998:
+            raise ValueError(f'year out of range: {year}')
+        return StatsRange(f'{year:04d}-01', f'{year + 1:04d}-01', str(year), {'year': year})
+    if 'range' in args:
+        if args['range'] != '12m':
+            raise ValueError(f'unknown stats range: {args["range"]!r}')
+        today = today or datetime.now(UTC)
+        start_year, start_month = divmod(today.year * 12 + today.month - 1 - 11, 12)
+        return StatsRange(f'{start_year:04d}-{start_month + 1:02d}', None, 'Last 12 months', {'range': '12m'})
+    return ALL_TIME
+
+
+def stats_years() -> list[str]:
+    """Years with a finished book, newest first, for the range picker."""
+    year = db.func.substr(ReadingStat.period, 1, 4)
+    return [
+        value for (value,) in db.session.query(year).filter(ReadingStat.dimension == StatDimension.TOTAL)
+        .distinct().order_by(year.desc())
+    ]
+
+
+def _stat_totals(dimension: str, stats_range: StatsRange) -> list[tuple[str, int, int]]:
+    """``(key, books, pages)`` of one ``reading_stat`` dimension over the range's months, most books first."""
+    books = db.func.sum(ReadingStat.books).label('books')
+    query = db.session.query(ReadingStat.key, books, db.func.sum(ReadingStat.pages))
+    return [
+        (key, count, pages)
+        for key, count, pages in stats_range.filter(query.filter(ReadingStat.dimension == dimension))
+        .group_by(ReadingStat.key)
+        .order_by(books.desc(), ReadingStat.key)
+    ]
+
+
+def _compute_pages_history(months: list) -> tuple[list, list]:
+    with_pages = [m for m in months if m.pages]
+    labels = [datetime.strptime(m.period, '%Y-%m').strftime('%b %Y') for m in with_pages]
+    data = [m.pages for m in with_pages]
     return labels, data
 
 
-def _compute_velocity(finished_books: list) -> tuple[int, Any, int, Any, int]:
-    valid_intervals = []
-    book_velocities = []
-    for b in finished_books:
-        if b.date_added and b.date_finished:
-            days = (_as_utc(b.date_finished) - _as_utc(b.date_added)).days
-            if days >= 0:
-                valid_intervals.append(days)
-                book_velocities.append((b, days))
-    avg_days = int(safe_div(sum(valid_intervals), len(valid_intervals)))
-    fastest_book = min(book_velocities, key=lambda x: x[1])[0] if book_velocities else None
-    slowest_book = max(book_velocities, key=lambda x: x[1])[0] if book_velocities else None
-    fastest_days = min(valid_intervals) if valid_intervals else 0
-    slowest_days = max(valid_intervals) if valid_intervals else 0
-    return avg_days, fastest_book, fastest_days, slowest_book, slowest_days
-
-
-def _compute_categories(finished_books: list) -> tuple[list, list]:
-    category_counts: dict[str, int] = {}
-    for book in finished_books:
-        if book.categories:
-            for cat in book.categories.split(','):
-                cat = cat.strip()
-                category_counts[cat] = category_counts.get(cat, 0) + 1
-    sorted_cats = sorted(category_counts.items(), key=lambda x: x[1], reverse=True)
+def _books_by_id(*ids) -> dict[int, Book]:
+    """The named books in one query; ``None`` ids are skipped."""
+    wanted = {i for i in ids if i is not None}
+    if not wanted:
+        return {}
+    return {book.id: book for book in list_books().filter(Book.id.in_(wanted))}
+
+
+def _compute_categories(stats_range: StatsRange) -> tuple[list, list]:
+    sorted_cats = _stat_totals(StatDimension.CATEGORY, stats_range)
     if len(sorted_cats) > 5:
         labels = [c[0] for c in sorted_cats[:5]] + ['Others']
         data = [c[1] for c in sorted_cats[:5]] + [sum(c[1] for c in sorted_cats[5:])]
@@ -111,62 +173,56 @@ def _compute_categories(finished_books: list) -> tuple[list, list]:
     return labels, data
 
 
-def _compute_curiosities(finished_books: list, total_pages: int, total_books: int) -> dict:
-    decade_counts: dict[str, int] = {}
-    for b in finished_books:
-        if b.published_year and b.published_year.isdigit():
-            decade = f'{b.published_year[:3]}0s'
-            decade_counts[decade] = decade_counts.get(decade, 0) + 1
-    most_read_decade = max(decade_counts.items(), key=lambda x: x[1])[0] if decade_counts else 'N/A'
+def _compute_curiosities(summary: FinishedSummary, books: dict, stats_range: StatsRange,
+                         total_pages: int, total_books: int) -> dict:
+    decades = _stat_totals(StatDimension.DECADE, stats_range)
+    most_read_decade = decades[0][0] if decades else 'N/A'
 
-    day_counts: dict[str, int] = {}
-    for b in finished_books:
-        day = b.date_finished.strftime('%A')
-        day_counts[day] = day_counts.get(day, 0) + 1
-    favorite_day = max(day_counts.items(), key=lambda x: x[1])[0] if day_counts else 'Unknown'
+    days = _stat_totals(StatDimension.WEEKDAY, stats_range)
+    favorite_day = days[0][0] if days else 'Unknown'
 
-    lang_counts: dict[str, int] = {}
-    for b in finished_books:
-        if b.language:
-            lang_counts[b.language] = lang_counts.get(b.language, 0) + 1
-    num_languages = len(lang_counts)
+    avg_public_rating = round(summary.avg_rating, 1) if summary.avg_rating is not None else 'N/A'
 
-    ratings = [b.average_rating for b in finished_books if b.average_rating]
-    avg_public_rating = round(sum(ratings) / len(ratings), 1) if ratings else 'N/A'
-
-    solo_count = sum(
-        1 for b in finished_books if b.authors and ',' not in b.authors
-    )
-    solo_ratio = int(solo_count / total_books * 100) if total_books else 0
-
-    valid_years = [b for b in finished_books if b.published_year and b.published_year.isdigit()]
-    oldest_book = min(valid_years, key=lambda b: int(b.published_year)) if valid_years else None
+    authorship = {key: count for key, count, _ in _stat_totals(StatDimension.AUTHORSHIP, stats_range)}
+    solo_ratio = int(authorship.get('solo', 0) / total_books * 100) if total_books else 0
 
     return {
         'tower_height': round(total_pages * 0.00005, 2),
         'ink_litres': round(total_pages / 50000, 3),
         'most_read_decade': most_read_decade,
         'favorite_day': favorite_day,
-        'num_languages': num_languages,
+        'num_languages': summary.num_languages,
         'avg_public_rating': avg_public_rating,
         'solo_ratio': solo_ratio,
         'words_million': round(total_pages * 250 / 1_000_000, 2),
-        'oldest_book': oldest_book,
+        'oldest_book': books.get(summary.oldest_id),
         'distance_km': round(total_pages * 3 / 1000, 2),
     }
 
 
-def build_stats_context() -> StatsContext:
-    all_books = Book.query.all()
-    finished_books = [b for b in all_books if b.status == BookStatus.FINISHED and b.date_finished]
+def build_stats_context(stats_range: StatsRange = ALL_TIME) -> StatsContext:
+    """Stats of the books finished within ``stats_range``, from ``reading_stat`` and the library snapshot.
+
+    Besides the snapshot, read once per library generation, no query returns
+    more than summary rows and the five books shown by name.
+    """
+    snapshot = library_snapshot()
+    summary = snapshot.finished_summary(*stats_range.month_codes())
+    books = _books_by_id(summary.longest_id, summary.shortest_id, summary.fastest_id,
+                         summary.slowest_id, summary.oldest_id)
+    months = stats_range.filter(
+        ReadingStat.query.filter_by(dimension=StatDimension.TOTAL)
+    ).order_by(ReadingStat.period).all()
 
-    total_books_read = len(finished_books)
-    total_pages_read = sum(b.page_count for b in finished_books if b.page_count)
+    total_books_read = sum(m.books for m in months)
+    total_pages_read = sum(m.pages for m in months)
     avg_pages_per_book = int(safe_div(total_pages_read, total_books_read))
 
-    if finished_books:
-        first_finish = min(b.date_finished for b in finished_books)
-        days_active = (datetime.now(UTC) - _as_utc(first_finish)).days + 1
+    until = datetime.now(UTC)
+    if stats_range.end:
+        until = min(until, datetime.strptime(stats_range.end, '%Y-%m').replace(tzinfo=UTC))
+    if summary.first_finish is not None:
+        days_active = (until - _as_utc(summary.first_finish)).days + 1
         months_active = max(days_active / 30, 1)
         years_active = max(days_active / 365, 1)
     else:
@@ -176,31 +232,22 @@ def build_stats_context() -> StatsContext:
     avg_pages_per_month = int(total_pages_read / months_active)
     avg_pages_per_year = int(total_pages_read / years_active)
 
-    pages_history_labels, pages_history_data = _compute_pages_history(finished_books)
+    pages_history_labels, pages_history_data = _compute_pages_history(months)
 
-    books_with_pages = [b for b in finished_books if b.page_count is not None]
-    longest_book = max(books_with_pages, key=lambda b: b.page_count) if books_with_pages else None
-    shortest_book = min(books_with_pages, key=lambda b: b.page_count) if books_with_pages else None
-
-    avg_days, fastest_book, fastest_days, slowest_book, slowest_days = _compute_velocity(finished_books)
+    avg_days = int(summary.avg_days) if summary.avg_days is not None else 0
 
     total_reading_hours = int(total_pages_read * 2 / 60)
-    completion_rate = int(safe_div(total_books_read, len(all_books)) * 100)
+    completion_rate = int(safe_div(total_books_read, len(snapshot)) * 100)
 
     seasons = {'Winter': 0, 'Spring': 0, 'Summer': 0, 'Autumn': 0}
-    for b in finished_books:
-        seasons[get_season(b.date_finished)] += 1
-
     books_by_year_month: dict[str, dict[str, int]] = {}
-    for book in finished_books:
-        year = book.date_finished.strftime('%Y')
-        month = book.date_finished.strftime('%B')
-        if year not in books_by_year_month:
-            books_by_year_month[year] = {}
-        books_by_year_month[year][month] = books_by_year_month[year].get(month, 0) + 1
+    for m in months:
+        month_start = datetime.strptime(m.period, '%Y-%m')
+        seasons[get_season(month_start)] += m.books
+        books_by_year_month.setdefault(m.period[:4], {})[month_start.strftime('%B')] = m.books
 
-    cat_labels, cat_data = _compute_categories(finished_books)
-    curiosities = _compute_curiosities(finished_books, total_pages_read, total_books_read)
+    cat_labels, cat_data = _compute_categories(stats_range)
+    curiosities = _compute_curiosities(summary, books, stats_range, total_pages_read, total_books_read)
 
     return StatsContext(
         total_books=total_books_read,
@@ -210,13 +257,13 @@ def build_stats_context() -> StatsContext:
         avg_pages_year=avg_pages_per_year,
         pages_history_labels=pages_history_labels,
         pages_history_data=pages_history_data,
-        longest_book=longest_book,
-        shortest_book=shortest_book,
+        longest_book=books.get(summary.longest_id),
+        shortest_book=books.get(summary.shortest_id),
         avg_days=avg_days,
-        fastest_book=fastest_book,
-        fastest_days=fastest_days,
-        slowest_book=slowest_book,
-        slowest_days=slowest_days,
+        fastest_book=books.get(summary.fastest_id),
+        fastest_days=summary.min_days,
+        slowest_book=books.get(summary.slowest_id),
+        slowest_days=summary.max_days,
         reading_hours=total_reading_hours,
         completion_rate=completion_rate,
         seasons=seasons,
@@ -0,0 +1,296 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import fields, is_dataclass
+from pathlib import Path
+
+from loguru import logger
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entry (
+    namespace  TEXT NOT NULL,
+    key        TEXT NOT NULL,
+    value      TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS ix_cache_entry_expires_at ON cache_entry (expires_at);
+CREATE TABLE IF NOT EXISTS cache_counter (
+    namespace TEXT NOT NULL,
+    name      TEXT NOT NULL,
+    value     INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (namespace, name)
+);
+"""
+
+_PURGE_EVERY_N_WRITES = 100
+
+
+def approx_size(value) -> int:
+    """Rough deep size in bytes of plain data (str/bytes/number/list/dict/dataclass)."""
+    size = sys.getsizeof(value)
+    if isinstance(value, (str, bytes, int, float, bool)) or value is None:
+        return size
+    if isinstance(value, dict):
+        return size + sum(approx_size(k) + approx_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + sum(approx_size(v) for v in value)
+    if is_dataclass(value):
+        return size + sum(approx_size(getattr(value, f.name)) for f in fields(value))
+    return size
+
+
+class LRUCache:
+    """Thread-safe in-process cache bounded by entry count and approximate bytes.
+
+    Least-recently-used entries are evicted once either limit is exceeded;
+    expired entries are dropped when read and by a sweep that runs at most
+    every ``sweep_interval`` seconds, so keys that are never read again do
+    not pile up. An entry may be kept for ``stale_ttl`` seconds past its
+    freshness so ``get_stale`` can serve it while it is being refreshed.
+    """
+
+    def __init__(self, max_entries: int = 1000, max_bytes: int = 8 * 1024 * 1024,
+                 sweep_interval: float = 60.0, sizeof=approx_size):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self._sizeof = sizeof
+        # key -> (fresh_until, stale_until, size, value)
+        self._entries: OrderedDict[str, tuple[float, float, int, object]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._last_sweep = time.monotonic()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str):
+        """Return the value while it is fresh, else ``None``."""
+        entry = self.get_stale(key, allow_stale=False)
+        return entry[0] if entry else None
+
+    def get_stale(self, key: str, allow_stale: bool = True) -> tuple[object, bool] | None:
+        """Return ``(value, is_fresh)``; stale values only within their stale window."""
+        now = time.monotonic()
+        with self._lock:
+            self._maybe_sweep(now)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            fresh_until, stale_until, _, value = entry
+            if now >= stale_until:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            fresh = now < fresh_until
+            if not fresh and not allow_stale:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            if fresh:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+            return value, fresh
+
+    def set(self, key: str, value, ttl: float, stale_ttl: float = 0.0) -> None:
+        if ttl <= 0:
+            return
+        size = self._sizeof(value)
+        now = time.monotonic()
+        with self._lock:
+            self._maybe_sweep(now)
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (now + ttl, now + ttl + max(0.0, stale_ttl), size, value)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.stale_hits = self.misses = self.evictions = self.expirations = 0
+
+    def resize(self, max_entries: int, max_bytes: int) -> None:
+        with self._lock:
+            self.max_entries = max_entries
+            self.max_bytes = max_bytes
+            while self._entries and (len(self._entries) > max_entries or self._bytes > max_bytes):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def sweep(self) -> int:
+        """Drop every expired entry now; returns how many were removed."""
+        with self._lock:
+            return self._sweep(time.monotonic())
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_ratio': round((self.hits + self.stale_hits) / lookups, 3) if lookups else 0.0,
+            }
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry[2]
+
+    def _maybe_sweep(self, now: float) -> None:
+        if now - self._last_sweep >= self.sweep_interval:
+            self._sweep(now)
+
+    def _sweep(self, now: float) -> int:
+        self._last_sweep = now
+        expired = [key for key, entry in self._entries.items() if now >= entry[1]]
+        for key in expired:
+            self._remove(key)
+        self.expirations += len(expired)
+        return len(expired)
+
+
+class DiskCache:
+    """JSON key/value cache stored in a SQLite file shared by every process.
+
+    Entries expire on wall-clock time so that separate workers (and restarts)
+    agree on freshness. Storage errors are logged and treated as misses: the
+    cache must never turn a working lookup into a failure.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._local = threading.local()
+        self._writes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread and per process (never reuse across fork).
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _bump(self, conn: sqlite3.Connection, namespace: str, name: str, amount: int = 1) -> None:
+        conn.execute(
+            'INSERT INTO cache_counter (namespace, name, value) VALUES (?, ?, ?) '
+            'ON CONFLICT (namespace, name) DO UPDATE SET value = value + excluded.value',
+            (namespace, name, amount),
+        )
+
+    def lookup(self, namespace: str, key: str) -> tuple[object, float] | None:
+        """Return ``(value, seconds_remaining)`` for a live entry, else ``None``."""
+        try:
+            conn = self._connect()
+            now = time.time()
+            row = conn.execute(
+                'SELECT value, expires_at FROM cache_entry WHERE namespace = ? AND key = ? AND expires_at > ?',
+                (namespace, key, now),
+            ).fetchone()
+            self._bump(conn, namespace, 'hits' if row else 'misses')
+        except sqlite3.Error as e:
+            logger.warning('Disk cache read failed ({}): {}', self.path, e)
+            return None
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1] - now
+
+    def get(self, namespace: str, key: str):
+        entry = self.lookup(namespace, key)
+        return entry[0] if entry else None
+
+    def set_many(self, namespace: str, items: dict, ttl: float) -> None:
+        if ttl <= 0 or not items:
+            return
+        expires_at = time.time() + ttl
+        rows = [(namespace, key, json.dumps(value), expires_at) for key, value in items.items()]
+        try:
+            conn = self._connect()
+            with conn:
+                conn.execute('BEGIN IMMEDIATE')
+                conn.executemany(
+                    'INSERT OR REPLACE INTO cache_entry (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)',
+                    rows,
+                )
+                self._bump(conn, namespace, 'writes', len(rows))
+        except sqlite3.Error as e:
+            logger.warning('Disk cache write failed ({}): {}', self.path, e)
+            return
+        self._writes += 1
+        if self._writes % _PURGE_EVERY_N_WRITES == 0:
+            self.purge_expired()
+
+    def set(self, namespace: str, key: str, value, ttl: float) -> None:
+        self.set_many(namespace, {key: value}, ttl)
+
+    def purge_expired(self) -> int:
+        try:
+            cursor = self._connect().execute('DELETE FROM cache_entry WHERE expires_at <= ?', (time.time(),))
+        except sqlite3.Error as e:
+            logger.warning('Disk cache purge failed ({}): {}', self.path, e)
+            return 0
+        return cursor.rowcount
+
+    def clear(self) -> None:
+        try:
+            conn = self._connect()
+            with conn:
+                conn.execute('BEGIN IMMEDIATE')
+                conn.execute('DELETE FROM cache_entry')
+                conn.execute('DELETE FROM cache_counter')
+        except sqlite3.Error as e:
+            logger.warning('Disk cache clear failed ({}): {}', self.path, e)
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Per-namespace ``hits``/``misses``/``writes`` counters and live ``entries``."""
+        result: dict[str, dict[str, int]] = {}
+        try:
+            conn = self._connect()
+            for namespace, name, value in conn.execute('SELECT namespace, name, value FROM cache_counter'):
+                result.setdefault(namespace, {})[name] = value
+            for namespace, entries in conn.execute(
+                'SELECT namespace, COUNT(*) FROM cache_entry WHERE expires_at > ? GROUP BY namespace',
+                (time.time(),),
+            ):
+                result.setdefault(namespace, {})['entries'] = entries
+        except sqlite3.Error as e:
+            logger.warning('Disk cache stats failed ({}): {}', self.path, e)
+        for counters in result.values():
+            for name in ('hits', 'misses', 'writes', 'entries'):
+                counters.setdefault(name, 0)
+        return result
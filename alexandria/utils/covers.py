@@ -2,6 +2,9 @@ import re
 
 OPEN_LIBRARY_COVER = 'https://covers.openlibrary.org/b/isbn/{isbn}-L.jpg'
 
+_IMGTK_PARAM = re.compile(r'[&?]imgtk=[^&]*')
+_REPEATED_AMPERSANDS = re.compile(r'&&+')
+
 _GOOGLE_SIZE_ORDER = (
     'extraLarge',
     'large',
@@ -17,8 +20,8 @@ def sanitize_google_cover_url(url: str | None) -> str | None:
     if not url:
         return None
     url = url.replace('http://', 'https://')
-    url = re.sub(r'[&?]imgtk=[^&]*', '', url)
-    url = re.sub(r'&&+', '&', url)
+    url = _IMGTK_PARAM.sub('', url)
+    url = _REPEATED_AMPERSANDS.sub('&', url)
     url = url.replace('?&', '?')
     return url.rstrip('&?') or None
 
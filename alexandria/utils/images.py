@@ -0,0 +1,63 @@
+import struct
+
+# Anything this small is a tracking pixel / "no image" placeholder, not a cover.
+MIN_COVER_BYTES = 1000
+MIN_COVER_DIMENSION = 2
+
+_CONTENT_TYPES = (
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+)
+
+
+def sniff_image_type(data: bytes) -> str | None:
+    """MIME type from the file signature, or ``None`` when it is not a known image."""
+    for signature, content_type in _CONTENT_TYPES:
+        if data.startswith(signature):
+            return content_type
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'image/webp'
+    return None
+
+
+def image_dimensions(data: bytes) -> tuple[int, int] | None:
+    """``(width, height)`` read from a PNG, GIF or JPEG header, without decoding pixels."""
+    content_type = sniff_image_type(data)
+    try:
+        if content_type == 'image/png':
+            return struct.unpack('>II', data[16:24])
+        if content_type == 'image/gif':
+            return struct.unpack('<HH', data[6:10])
+        if content_type == 'image/jpeg':
+            return _jpeg_dimensions(data)
+    except struct.error:
+        return None
+    return None
+
+
+def _jpeg_dimensions(data: bytes) -> tuple[int, int] | None:
+    i = 2
+    while i + 9 < len(data):
+        if data[i] != 0xFF:
+            i += 1
+            continue
+        marker = data[i + 1]
+        if marker in (0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF):
+            height, width = struct.unpack('>HH', data[i + 5:i + 9])
+            return width, height
+        if marker == 0xD8 or 0xD0 <= marker <= 0xD7 or marker == 0x01:
+            i += 2
+            continue
+        (length,) = struct.unpack('>H', data[i + 2:i + 4])
+        i += 2 + length
+    return None
+
+
+def is_placeholder_image(data: bytes) -> bool:
+    """True for missing-cover placeholders: not an image, a tiny file, or 1×1-style pixels."""
+    if sniff_image_type(data) is None or len(data) < MIN_COVER_BYTES:
+        return True
+    dimensions = image_dimensions(data)
+    return dimensions is not None and min(dimensions) < MIN_COVER_DIMENSION
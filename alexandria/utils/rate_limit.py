@@ -0,0 +1,37 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """Thread-safe token bucket: refills at ``rate`` tokens per second, bursts up to ``capacity``.
+
+    ``acquire`` blocks until a token is available, so callers sharing one
+    bucket are collectively held to ``rate`` operations per second. A rate of
+    zero or less disables limiting.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """Take ``tokens`` if available and return 0, else return the seconds to wait."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        while (wait := self.try_acquire(tokens)) > 0:
+            time.sleep(wait)
@@ -0,0 +1,15 @@
+from datetime import datetime
+
+import sqlalchemy as sa
+
+# Stand-in for NULL in sort keys, so every row has a comparable key (NULLs sort as oldest).
+NULL_DATETIME = datetime(1, 1, 1)
+# Inlined as a SQL literal rather than bound, so the book indexes on these
+# expressions (see ``Book``) can serve the ORDER BY; a bound parameter never
+# matches an expression index.
+_NULL_DATETIME_SQL = f"'{NULL_DATETIME.isoformat(sep=' ', timespec='microseconds')}'"
+
+
+def nulls_as_oldest(column):
+    """``column`` with NULLs replaced by ``NULL_DATETIME``, usable as a keyset sort key."""
+    return sa.func.coalesce(column, sa.literal_column(_NULL_DATETIME_SQL, sa.DateTime))
@@ -12,3 +12,10 @@ def strip_book_description_html(raw):
     t = re.sub(r'[ \t]+', ' ', t)
     t = re.sub(r'\n{3,}', '\n\n', t)
     return t.strip()
+
+
+def split_names(value) -> list[str]:
+    """Names from a comma-joined ``authors``/``categories`` string, blanks and duplicates dropped."""
+    if not value:
+        return []
+    return list(dict.fromkeys(n.strip() for n in str(value).split(',') if n.strip()))
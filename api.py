@@ -1,3 +1,9 @@
-from alexandria.integrations.google_books import SearchOutcome, get_book_details, search_books
+from alexandria.integrations.google_books import (
+    SearchOutcome,
+    VolumeFetch,
+    fetch_volume,
+    get_book_details,
+    search_books,
+)
 
-__all__ = ['SearchOutcome', 'get_book_details', 'search_books']
+__all__ = ['SearchOutcome', 'VolumeFetch', 'fetch_volume', 'get_book_details', 'search_books']
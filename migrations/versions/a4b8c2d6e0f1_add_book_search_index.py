@@ -0,0 +1,52 @@
+"""add book_fts full-text search index (SQLite FTS5)
+
+Revision ID: a4b8c2d6e0f1
+Revises: f2d7a9c3e1b8
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.exc import OperationalError
+
+revision = 'a4b8c2d6e0f1'
+down_revision = 'f2d7a9c3e1b8'
+branch_labels = None
+depends_on = None
+
+# Frozen copy of alexandria.services.search.FTS_SCHEMA at this revision.
+COLUMNS = 'title, authors, description, categories, personal_notes'
+NEW = 'new.title, new.authors, new.description, new.categories, new.personal_notes'
+OLD = 'old.title, old.authors, old.description, old.categories, old.personal_notes'
+SCHEMA = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS book_fts USING fts5("
+    f"{COLUMNS}, content='book', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS book_fts_ai AFTER INSERT ON book BEGIN "
+    f"INSERT INTO book_fts(rowid, {COLUMNS}) VALUES (new.id, {NEW}); END",
+    f"CREATE TRIGGER IF NOT EXISTS book_fts_ad AFTER DELETE ON book BEGIN "
+    f"INSERT INTO book_fts(book_fts, rowid, {COLUMNS}) VALUES ('delete', old.id, {OLD}); END",
+    f"CREATE TRIGGER IF NOT EXISTS book_fts_au AFTER UPDATE OF {COLUMNS} ON book BEGIN "
+    f"INSERT INTO book_fts(book_fts, rowid, {COLUMNS}) VALUES ('delete', old.id, {OLD}); "
+    f"INSERT INTO book_fts(rowid, {COLUMNS}) VALUES (new.id, {NEW}); END",
+)
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return
+    try:
+        for statement in SCHEMA:
+            bind.execute(sa.text(statement))
+        bind.execute(sa.text("INSERT INTO book_fts(book_fts) VALUES ('rebuild')"))
+    except OperationalError:
+        # SQLite built without FTS5: the app falls back to LIKE search.
+        pass
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for trigger in ('book_fts_ai', 'book_fts_ad', 'book_fts_au'):
+        op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+    op.execute('DROP TABLE IF EXISTS book_fts')
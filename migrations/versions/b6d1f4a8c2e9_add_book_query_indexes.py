@@ -0,0 +1,38 @@
+"""add indexes for the book status/date/title and isbn queries
+
+Revision ID: b6d1f4a8c2e9
+Revises: a4b8c2d6e0f1
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'b6d1f4a8c2e9'
+down_revision = 'a4b8c2d6e0f1'
+branch_labels = None
+depends_on = None
+
+# Must match alexandria.utils.sorting.nulls_as_oldest at this revision.
+NULL_DATETIME = "'0001-01-01 00:00:00.000000'"
+
+INDEXES = (
+    ('ix_book_isbn', ['isbn']),
+    ('ix_book_date_added', ['date_added']),
+    ('ix_book_date_finished', ['date_finished']),
+    ('ix_book_status_date_added', ['status', sa.text(f'coalesce(date_added, {NULL_DATETIME})')]),
+    ('ix_book_status_finish_order',
+     ['status', sa.text(f'coalesce(coalesce(date_finished, date_added), {NULL_DATETIME})')]),
+    ('ix_book_status_date_finished', ['status', 'date_finished']),
+    ('ix_book_status_title', ['status', 'title']),
+)
+
+
+def upgrade():
+    for name, columns in INDEXES:
+        op.create_index(name, 'book', columns)
+
+
+def downgrade():
+    for name, _ in reversed(INDEXES):
+        op.drop_index(name, table_name='book')
@@ -0,0 +1,26 @@
+"""add metadata_refreshed_at and metadata_etag to book
+
+Revision ID: b7e4c2a9d1f3
+Revises: a1b2c3d4e5f6
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'b7e4c2a9d1f3'
+down_revision = 'a1b2c3d4e5f6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('book') as batch_op:
+        batch_op.add_column(sa.Column('metadata_refreshed_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('metadata_etag', sa.String(length=100), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('book') as batch_op:
+        batch_op.drop_column('metadata_etag')
+        batch_op.drop_column('metadata_refreshed_at')
@@ -0,0 +1,50 @@
+"""add job table for background work
+
+Revision ID: c3f8a1d5e2b4
+Revises: b7e4c2a9d1f3
+Create Date: 2026-10-17 00:01:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'c3f8a1d5e2b4'
+down_revision = 'b7e4c2a9d1f3'
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name):
+    # `flask db upgrade` loads the app, whose bootstrap create_all() may have made the table already.
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def _has_index(table, name):
+    return any(index['name'] == name for index in sa.inspect(op.get_bind()).get_indexes(table))
+
+
+def upgrade():
+    if not _has_table('job'):
+        op.create_table(
+            'job',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('kind', sa.String(length=50), nullable=False),
+            sa.Column('status', sa.String(length=20), nullable=False),
+            sa.Column('params', sa.Text(), nullable=True),
+            sa.Column('progress_current', sa.Integer(), nullable=False),
+            sa.Column('progress_total', sa.Integer(), nullable=True),
+            sa.Column('message', sa.String(length=500), nullable=True),
+            sa.Column('result', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('started_at', sa.DateTime(), nullable=True),
+            sa.Column('heartbeat_at', sa.DateTime(), nullable=True),
+            sa.Column('finished_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+        )
+    if not _has_index('job', 'ix_job_status'):
+        op.create_index('ix_job_status', 'job', ['status'])
+
+
+def downgrade():
+    op.drop_index('ix_job_status', table_name='job')
+    op.drop_table('job')
@@ -0,0 +1,82 @@
+"""add author and category tables linked to book, backfilled from the joined strings
+
+Revision ID: c8e3a5f7b1d4
+Revises: b6d1f4a8c2e9
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'c8e3a5f7b1d4'
+down_revision = 'b6d1f4a8c2e9'
+branch_labels = None
+depends_on = None
+
+# (facet table, link table, link column, joined book column)
+FACETS = (
+    ('author', 'book_author', 'author_id', 'authors'),
+    ('category', 'book_category', 'category_id', 'categories'),
+)
+
+
+def _has_table(name):
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def _has_index(table, name):
+    return any(index['name'] == name for index in sa.inspect(op.get_bind()).get_indexes(table))
+
+
+def _split(value):
+    if not value:
+        return []
+    return list(dict.fromkeys(n.strip() for n in value.split(',') if n.strip()))
+
+
+def upgrade():
+    for facet, links, key, _ in FACETS:
+        if not _has_table(facet):
+            op.create_table(
+                facet,
+                sa.Column('id', sa.Integer(), nullable=False),
+                sa.Column('name', sa.String(length=200), nullable=False),
+                sa.PrimaryKeyConstraint('id'),
+                sa.UniqueConstraint('name'),
+            )
+        if not _has_table(links):
+            op.create_table(
+                links,
+                sa.Column('book_id', sa.Integer(), nullable=False),
+                sa.Column(key, sa.Integer(), nullable=False),
+                sa.ForeignKeyConstraint(['book_id'], ['book.id'], ondelete='CASCADE'),
+                sa.ForeignKeyConstraint([key], [f'{facet}.id'], ondelete='CASCADE'),
+                sa.PrimaryKeyConstraint('book_id', key),
+            )
+        if not _has_index(links, f'ix_{links}_{key}'):
+            op.create_index(f'ix_{links}_{key}', links, [key, 'book_id'])
+
+    bind = op.get_bind()
+    book = sa.table('book', sa.column('id', sa.Integer), *(sa.column(c, sa.String) for *_, c in FACETS))
+    rows = bind.execute(sa.select(book)).all()
+    for facet, links, key, column in FACETS:
+        facet_table = sa.table(facet, sa.column('id', sa.Integer), sa.column('name', sa.String))
+        link_table = sa.table(links, sa.column('book_id', sa.Integer), sa.column(key, sa.Integer))
+        if bind.execute(sa.select(sa.func.count()).select_from(facet_table)).scalar():
+            continue  # filled by the app since create_all(); `flask backfill-facets` links the rest
+        ids = {}  # the table is empty, so ids are assigned here in first-seen order
+        link_rows = []
+        for row in rows:
+            for name in _split(getattr(row, column)):
+                ids.setdefault(name, len(ids) + 1)
+                link_rows.append({'book_id': row.id, key: ids[name]})
+        if ids:
+            bind.execute(facet_table.insert(), [{'id': i, 'name': name} for name, i in ids.items()])
+            bind.execute(link_table.insert(), link_rows)
+
+
+def downgrade():
+    for facet, links, key, _ in reversed(FACETS):
+        op.drop_index(f'ix_{links}_{key}', table_name=links)
+        op.drop_table(links)
+        op.drop_table(facet)
@@ -0,0 +1,37 @@
+"""add reading_stat aggregates table
+
+Revision ID: d1f6b3e8a5c2
+Revises: c8e3a5f7b1d4
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'd1f6b3e8a5c2'
+down_revision = 'c8e3a5f7b1d4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Filled on the next app start (the table is empty while finished books
+    # exist) or by `flask rebuild-stats`.
+    if sa.inspect(op.get_bind()).has_table('reading_stat'):
+        # Made and filled by the app's start before c8e3a5f7b1d4 linked the
+        # authors and categories; emptied, it is rebuilt in full on the next start.
+        op.execute('DELETE FROM reading_stat')
+        return
+    op.create_table(
+        'reading_stat',
+        sa.Column('dimension', sa.String(length=20), nullable=False),
+        sa.Column('period', sa.String(length=7), nullable=False),
+        sa.Column('key', sa.String(length=200), nullable=False),
+        sa.Column('books', sa.Integer(), nullable=False),
+        sa.Column('pages', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('dimension', 'period', 'key'),
+    )
+
+
+def downgrade():
+    op.drop_table('reading_stat')
@@ -0,0 +1,26 @@
+"""add verified_cover_url and cover_checked_at to book
+
+Revision ID: d5a2e8f1c6b7
+Revises: c3f8a1d5e2b4
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'd5a2e8f1c6b7'
+down_revision = 'c3f8a1d5e2b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('book') as batch_op:
+        batch_op.add_column(sa.Column('verified_cover_url', sa.String(length=500), nullable=True))
+        batch_op.add_column(sa.Column('cover_checked_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('book') as batch_op:
+        batch_op.drop_column('cover_checked_at')
+        batch_op.drop_column('verified_cover_url')
@@ -0,0 +1,30 @@
+"""add library_generation counter
+
+Revision ID: e4a7c9b2d6f8
+Revises: d1f6b3e8a5c2
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'e4a7c9b2d6f8'
+down_revision = 'd1f6b3e8a5c2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The single row is created by the first flush that changes a book.
+    if sa.inspect(op.get_bind()).has_table('library_generation'):
+        return  # made by the app's create_all(), which `flask db upgrade` runs first
+    op.create_table(
+        'library_generation',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('value', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def downgrade():
+    op.drop_table('library_generation')
@@ -0,0 +1,26 @@
+"""add cover_color and cover_preview to book
+
+Revision ID: e9c4b1a7d3f2
+Revises: d5a2e8f1c6b7
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'e9c4b1a7d3f2'
+down_revision = 'd5a2e8f1c6b7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('book') as batch_op:
+        batch_op.add_column(sa.Column('cover_color', sa.String(length=7), nullable=True))
+        batch_op.add_column(sa.Column('cover_preview', sa.Text(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('book') as batch_op:
+        batch_op.drop_column('cover_preview')
+        batch_op.drop_column('cover_color')
@@ -0,0 +1,92 @@
+"""add resolved_cover_url and resolved_cover_fallback_url to book
+
+Revision ID: f2d7a9c3e1b8
+Revises: e9c4b1a7d3f2
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'f2d7a9c3e1b8'
+down_revision = 'e9c4b1a7d3f2'
+branch_labels = None
+depends_on = None
+
+# Frozen copy of the cover URL resolution in alexandria.utils.covers at this revision.
+_IMGTK_PARAM = re.compile(r'[&?]imgtk=[^&]*')
+_REPEATED_AMPERSANDS = re.compile(r'&&+')
+
+
+def _sanitize_google(url):
+    url = url.replace('http://', 'https://')
+    url = _IMGTK_PARAM.sub('', url)
+    url = _REPEATED_AMPERSANDS.sub('&', url)
+    url = url.replace('?&', '?')
+    return url.rstrip('&?') or None
+
+
+def _google(google_books_id):
+    return (
+        f'https://books.google.com/books/content?id={google_books_id}'
+        f'&printsec=frontcover&img=1&zoom=1&source=gbs_api'
+    )
+
+
+def _open_library(isbn):
+    return f'https://covers.openlibrary.org/b/isbn/{isbn}-L.jpg'
+
+
+def resolve_cover_url(thumbnail, google_books_id, isbn):
+    if thumbnail:
+        return _sanitize_google(thumbnail) if 'books.google.com' in thumbnail else thumbnail
+    if google_books_id:
+        return _google(google_books_id)
+    if isbn:
+        return _open_library(isbn)
+    return None
+
+
+def resolve_cover_fallback_url(thumbnail, google_books_id, isbn):
+    if thumbnail and 'openlibrary.org' in thumbnail:
+        return _google(google_books_id) if google_books_id else None
+    if isbn:
+        return _open_library(isbn)
+    return None
+
+
+def upgrade():
+    with op.batch_alter_table('book') as batch_op:
+        batch_op.add_column(sa.Column('resolved_cover_url', sa.String(length=500), nullable=True))
+        batch_op.add_column(sa.Column('resolved_cover_fallback_url', sa.String(length=500), nullable=True))
+
+    # Backfill existing rows; `flask backfill-cover-urls` does the same from the app.
+    book = sa.table(
+        'book',
+        sa.column('id', sa.Integer),
+        sa.column('thumbnail', sa.String),
+        sa.column('google_books_id', sa.String),
+        sa.column('isbn', sa.String),
+        sa.column('resolved_cover_url', sa.String),
+        sa.column('resolved_cover_fallback_url', sa.String),
+    )
+    bind = op.get_bind()
+    rows = bind.execute(sa.select(book.c.id, book.c.thumbnail, book.c.google_books_id, book.c.isbn)).all()
+    for row in rows:
+        fields = {'thumbnail': row.thumbnail, 'google_books_id': row.google_books_id, 'isbn': row.isbn}
+        bind.execute(
+            book.update()
+            .where(book.c.id == row.id)
+            .values(
+                resolved_cover_url=resolve_cover_url(**fields),
+                resolved_cover_fallback_url=resolve_cover_fallback_url(**fields),
+            )
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('book') as batch_op:
+        batch_op.drop_column('resolved_cover_fallback_url')
+        batch_op.drop_column('resolved_cover_url')
@@ -1,4 +1,4 @@
 from alexandria.extensions import db
-from alexandria.models import Book, User
+from alexandria.models import Book, Job, User
 
-__all__ = ['db', 'Book', 'User']
+__all__ = ['db', 'Book', 'Job', 'User']
@@ -14,6 +14,7 @@ def app(tmp_path, monkeypatch):
     monkeypatch.setenv('SECRET_KEY', 'test-secret')
     monkeypatch.setenv('LIBRARIAN_USERNAME', 'admin')
     monkeypatch.setenv('LIBRARIAN_PASSWORD', 'testpass')
+    monkeypatch.setenv('JOB_RUNNER_ENABLED', '0')  # tests run jobs synchronously via run_next_job
     application = create_app()
     application.config['WTF_CSRF_ENABLED'] = False
     application.config['RATELIMIT_ENABLED'] = False
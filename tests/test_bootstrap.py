@@ -0,0 +1,137 @@
+"""Tests for the library metadata refresh."""
+from datetime import UTC, datetime, timedelta
+from unittest.mock import patch
+
+from alexandria.bootstrap import refresh_library_metadata
+from alexandria.extensions import db
+from alexandria.integrations.google_books import VolumeFetch
+from alexandria.models import Book
+from alexandria.utils.rate_limit import TokenBucket
+
+
+def _details(google_books_id, title):
+    return VolumeFetch(details={
+        'google_books_id': google_books_id,
+        'title': title,
+        'authors': 'Frank Herbert',
+        'isbn': None,
+        'thumbnail': None,
+        'description': 'Refreshed',
+        'page_count': 412,
+        'categories': 'Fiction',
+        'published_year': '1965',
+        'language': 'en',
+        'average_rating': 4.5,
+    }, etag=f'"etag-{google_books_id}"')
+
+
+def test_refresh_updates_books_and_reports_failures(app, make_book, monkeypatch):
+    monkeypatch.setenv('METADATA_REFRESH_RATE_PER_SECOND', '0')
+    monkeypatch.setenv('METADATA_REFRESH_BATCH_SIZE', '2')
+    ids = [make_book(title=f'Old {i}', google_books_id=f'vol{i}') for i in range(5)]
+    make_book(title='Manual entry')
+
+    def fake_fetch(google_books_id, etag=None):
+        return VolumeFetch() if google_books_id == 'vol3' else _details(google_books_id, f'New {google_books_id}')
+
+    with app.app_context(), patch('alexandria.bootstrap.fetch_volume', side_effect=fake_fetch) as mock_get:
+        report = refresh_library_metadata()
+        assert mock_get.call_count == 5
+        titles = {db.session.get(Book, book_id).title for book_id in ids}
+
+    assert report.total == 5
+    assert report.refreshed == 4
+    assert report.failed == 1
+    assert titles == {'New vol0', 'New vol1', 'New vol2', 'Old 3', 'New vol4'}
+
+
+def test_refresh_survives_exceptions_from_a_single_lookup(app, make_book, monkeypatch):
+    monkeypatch.setenv('METADATA_REFRESH_RATE_PER_SECOND', '0')
+    make_book(title='Boom', google_books_id='boom')
+    make_book(title='Fine', google_books_id='fine')
+
+    def fake_fetch(google_books_id, etag=None):
+        if google_books_id == 'boom':
+            raise RuntimeError('unexpected')
+        return _details(google_books_id, 'Fine, refreshed')
+
+    with app.app_context(), patch('alexandria.bootstrap.fetch_volume', side_effect=fake_fetch):
+        report = refresh_library_metadata()
+        assert Book.query.filter_by(google_books_id='fine').one().title == 'Fine, refreshed'
+
+    assert (report.refreshed, report.failed) == (1, 1)
+
+
+def test_refresh_skips_recently_refreshed_books(app, make_book, monkeypatch):
+    monkeypatch.setenv('METADATA_REFRESH_RATE_PER_SECOND', '0')
+    now = datetime.now(UTC)
+    make_book(title='Fresh', google_books_id='fresh', metadata_refreshed_at=now - timedelta(hours=1))
+    make_book(title='Stale', google_books_id='stale', metadata_refreshed_at=now - timedelta(days=30))
+    make_book(title='Never', google_books_id='never')
+
+    with app.app_context(), patch('alexandria.bootstrap.fetch_volume',
+                                  side_effect=lambda gid, etag=None: _details(gid, gid)) as mock_fetch:
+        report = refresh_library_metadata(max_age_hours=24)
+        fetched = [call.args[0] for call in mock_fetch.call_args_list]
+
+    assert sorted(fetched) == ['never', 'stale']
+    assert (report.total, report.skipped) == (2, 1)
+
+
+def test_refresh_resumes_after_interrupted_run(app, make_book, monkeypatch):
+    """Books committed by an earlier (partial) run are not fetched again."""
+    monkeypatch.setenv('METADATA_REFRESH_RATE_PER_SECOND', '0')
+    for i in range(3):
+        make_book(title=f'Book {i}', google_books_id=f'vol{i}')
+
+    with app.app_context():
+        with patch('alexandria.bootstrap.fetch_volume',
+                   side_effect=lambda gid, etag=None: _details(gid, gid) if gid == 'vol0' else VolumeFetch()):
+            first = refresh_library_metadata()
+        with patch('alexandria.bootstrap.fetch_volume',
+                   side_effect=lambda gid, etag=None: _details(gid, gid)) as mock_fetch:
+            second = refresh_library_metadata()
+            fetched = sorted(call.args[0] for call in mock_fetch.call_args_list)
+
+    assert (first.refreshed, first.failed) == (1, 2)
+    assert fetched == ['vol1', 'vol2']
+    assert second.refreshed == 2
+
+
+def test_refresh_sends_stored_etag_and_counts_unchanged(app, make_book, monkeypatch):
+    monkeypatch.setenv('METADATA_REFRESH_RATE_PER_SECOND', '0')
+    book_id = make_book(title='Kept', google_books_id='kept', metadata_etag='"v1"')
+
+    with app.app_context(), patch('alexandria.bootstrap.fetch_volume',
+                                  return_value=VolumeFetch(etag='"v1"', not_modified=True)) as mock_fetch:
+        report = refresh_library_metadata()
+        book = db.session.get(Book, book_id)
+        assert book.title == 'Kept'
+        assert book.metadata_refreshed_at is not None
+
+    mock_fetch.assert_called_once_with('kept', etag='"v1"')
+    assert (report.unchanged, report.refreshed) == (1, 0)
+
+
+def test_token_bucket_waits_once_burst_is_spent():
+    bucket = TokenBucket(rate=2, capacity=2)
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == 0
+    assert 0 < bucket.try_acquire() <= 0.5
+
+
+def test_token_bucket_zero_rate_is_unlimited():
+    bucket = TokenBucket(rate=0)
+    assert all(bucket.try_acquire() == 0 for _ in range(100))
+
+
+def test_refresh_resets_cover_validation_when_cover_changes(app, make_book, monkeypatch):
+    monkeypatch.setenv('METADATA_REFRESH_RATE_PER_SECOND', '0')
+    checked = datetime.now(UTC)
+    same = make_book(google_books_id='same', cover_checked_at=checked)
+    changed = make_book(google_books_id='changed', thumbnail='https://old.example/c.jpg', cover_checked_at=checked)
+
+    with app.app_context(), patch('alexandria.bootstrap.fetch_volume', side_effect=lambda gid, etag=None: _details(gid, gid)):
+        refresh_library_metadata(force=True)
+        assert db.session.get(Book, same).cover_checked_at is not None
+        assert db.session.get(Book, changed).cover_checked_at is None
@@ -0,0 +1,75 @@
+"""Unit tests for the in-process LRU cache."""
+from unittest.mock import patch
+
+from alexandria.utils.cache import LRUCache
+
+
+def test_evicts_least_recently_used_when_over_entry_limit():
+    cache = LRUCache(max_entries=2)
+    cache.set('a', 1, ttl=60)
+    cache.set('b', 2, ttl=60)
+    cache.get('a')
+    cache.set('c', 3, ttl=60)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1
+
+
+def test_evicts_until_under_byte_limit():
+    cache = LRUCache(max_entries=100, max_bytes=300, sizeof=lambda v: 100)
+    for key in 'abcd':
+        cache.set(key, key, ttl=60)
+
+    stats = cache.stats()
+    assert stats['entries'] == 3
+    assert stats['bytes'] == 300
+    assert cache.get('a') is None
+
+
+def test_value_larger_than_byte_limit_is_not_stored():
+    cache = LRUCache(max_bytes=10, sizeof=lambda v: 50)
+    cache.set('big', 'x', ttl=60)
+    assert len(cache) == 0
+
+
+def test_ttl_zero_is_not_stored():
+    cache = LRUCache()
+    cache.set('a', 1, ttl=0)
+    assert cache.get('a') is None
+
+
+def test_sweep_drops_expired_entries_that_are_never_read():
+    with patch('alexandria.utils.cache.time.monotonic', return_value=1000.0):
+        cache = LRUCache(sweep_interval=10)
+        cache.set('stale', 1, ttl=5)
+        cache.set('fresh', 2, ttl=60)
+    with patch('alexandria.utils.cache.time.monotonic', return_value=1020.0):
+        cache.set('other', 3, ttl=60)  # any access past the interval triggers the sweep
+
+    assert len(cache) == 2
+    assert cache.stats()['expirations'] == 1
+
+
+def test_stats_report_hit_ratio():
+    cache = LRUCache()
+    cache.set('a', 1, ttl=60)
+    cache.get('a')
+    cache.get('a')
+    cache.get('missing')
+
+    stats = cache.stats()
+    assert stats['hits'] == 2
+    assert stats['misses'] == 1
+    assert stats['hit_ratio'] == 0.667
+
+
+def test_resize_evicts_down_to_new_limits():
+    cache = LRUCache(max_entries=10)
+    for i in range(5):
+        cache.set(str(i), i, ttl=60)
+    cache.resize(max_entries=2, max_bytes=cache.max_bytes)
+
+    assert len(cache) == 2
+    assert cache.get('4') == 4
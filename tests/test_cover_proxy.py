@@ -0,0 +1,349 @@
+import io
+import json
+import struct
+from unittest.mock import MagicMock, patch
+
+import pytest
+from PIL import Image
+
+from alexandria.constants import JobStatus
+from alexandria.extensions import db
+from alexandria.filters import register_template_filters
+from alexandria.models import Book
+from alexandria.services.covers import (
+    COVER_WIDTHS,
+    backfill_cover_urls,
+    cover_version,
+    get_cover_store,
+    validate_library_covers,
+)
+from alexandria.services.jobs import enqueue_job, run_next_job
+from alexandria.utils.images import image_dimensions, is_placeholder_image, sniff_image_type
+
+PRIMARY = 'https://books.google.com/books/content?id=abc&zoom=1'
+FALLBACK = 'https://covers.openlibrary.org/b/isbn/9780441013593-L.jpg'
+
+
+def _png(width=128, height=192, padding=2048):
+    header = b'\x89PNG\r\n\x1a\n' + struct.pack('>I', 13) + b'IHDR' + struct.pack('>II', width, height)
+    return header + b'\x08\x02\x00\x00\x00' + b'\x00' * padding
+
+
+# 1×1 transparent GIF, as served by both providers for missing covers.
+PIXEL_GIF = b'GIF89a\x01\x00\x01\x00\x80\x00\x00\xff\xff\xff\x00\x00\x00!\xf9\x04\x01\x00\x00\x00\x00,\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;'
+
+
+def _response(body=b'', status=200):
+    response = MagicMock()
+    response.status_code = status
+    response.content = body
+    return response
+
+
+@pytest.fixture
+def mock_get():
+    with patch('alexandria.integrations.http.requests.Session.get') as mock:
+        yield mock
+
+
+class TestImageHelpers:
+    def test_png_dimensions(self):
+        assert sniff_image_type(_png()) == 'image/png'
+        assert image_dimensions(_png(300, 450)) == (300, 450)
+
+    def test_pixel_gif_is_placeholder(self):
+        assert image_dimensions(PIXEL_GIF) == (1, 1)
+        assert is_placeholder_image(PIXEL_GIF)
+
+    def test_non_image_is_placeholder(self):
+        assert is_placeholder_image(b'<html>not found</html>' * 100)
+
+    def test_real_cover_is_not_placeholder(self):
+        assert not is_placeholder_image(_png())
+
+
+class TestCoverRoute:
+    def test_downloads_once_and_serves_from_disk(self, client, make_book, mock_get):
+        book_id = make_book(thumbnail=PRIMARY)
+        mock_get.return_value = _response(_png())
+
+        first = client.get(f'/covers/{book_id}')
+        second = client.get(f'/covers/{book_id}')
+
+        assert first.status_code == 200
+        assert first.data == _png()
+        assert first.mimetype == 'image/png'
+        assert first.headers['ETag']
+        assert 'max-age=31536000' in first.headers['Cache-Control']
+        assert 'immutable' in first.headers['Cache-Control']
+        assert second.data == first.data
+        assert mock_get.call_count == 1
+
+    def test_if_none_match_returns_304(self, client, make_book, mock_get):
+        book_id = make_book(thumbnail=PRIMARY)
+        mock_get.return_value = _response(_png())
+        etag = client.get(f'/covers/{book_id}').headers['ETag']
+
+        response = client.get(f'/covers/{book_id}', headers={'If-None-Match': etag})
+
+        assert response.status_code == 304
+        assert response.data == b''
+
+    def test_placeholder_falls_back_to_secondary_provider(self, client, make_book, mock_get):
+        book_id = make_book(thumbnail=PRIMARY, isbn='9780441013593')
+        mock_get.side_effect = lambda url, **kw: _response(PIXEL_GIF if url == PRIMARY else _png(200, 300))
+
+        response = client.get(f'/covers/{book_id}')
+
+        assert response.status_code == 200
+        assert image_dimensions(response.data) == (200, 300)
+        # The primary may serve a real cover after its retry window, under the same URL.
+        assert 'max-age=3600' in response.headers['Cache-Control']
+        assert 'immutable' not in response.headers['Cache-Control']
+        # The placeholder is remembered, so a second book with that URL skips it.
+        mock_get.reset_mock()
+        other_id = make_book(thumbnail=PRIMARY, isbn='9780441013593')
+        client.get(f'/covers/{other_id}')
+        assert mock_get.call_count == 0
+
+    def test_identical_images_share_one_blob(self, app, client, make_book, mock_get):
+        first = make_book(thumbnail=PRIMARY)
+        second = make_book(thumbnail=FALLBACK)
+        mock_get.return_value = _response(_png())
+
+        etags = {client.get(f'/covers/{i}').headers['ETag'] for i in (first, second)}
+
+        with app.app_context():
+            blobs = list((get_cover_store().root / 'blobs').rglob('*'))
+        assert len(etags) == 1
+        assert len([p for p in blobs if p.is_file()]) == 1
+
+    def test_no_usable_cover_is_404(self, client, make_book, mock_get):
+        book_id = make_book(thumbnail=PRIMARY)
+        mock_get.return_value = _response(status=404)
+        assert client.get(f'/covers/{book_id}').status_code == 404
+
+    def test_server_error_is_not_remembered(self, client, make_book, mock_get):
+        book_id = make_book(thumbnail=PRIMARY)
+        mock_get.return_value = _response(status=503)
+        assert client.get(f'/covers/{book_id}').status_code == 404
+
+        mock_get.return_value = _response(_png())
+        assert client.get(f'/covers/{book_id}').status_code == 200
+
+    def test_unknown_book_is_404(self, client, mock_get):
+        assert client.get('/covers/999').status_code == 404
+        mock_get.assert_not_called()
+
+
+class TestCoverForProxy:
+    def test_saved_book_points_at_proxy(self, app, make_book):
+        register_template_filters(app)
+        book_id = make_book(thumbnail=PRIMARY)
+        with app.test_request_context():
+            book = db.session.get(Book, book_id)
+            assert app.jinja_env.filters['cover_for'](book) == (
+                f'/covers/{book_id}?v={cover_version(PRIMARY)}'
+            )
+
+    def test_proxy_can_be_disabled(self, app, make_book):
+        app.config['COVER_PROXY_ENABLED'] = False
+        register_template_filters(app)
+        book_id = make_book(thumbnail=PRIMARY)
+        with app.test_request_context():
+            book = db.session.get(Book, book_id)
+            assert app.jinja_env.filters['cover_for'](book) == PRIMARY
+
+    def test_version_changes_with_source(self):
+        assert cover_version(PRIMARY) != cover_version(FALLBACK)
+        assert cover_version(None) is None
+
+
+def _jpeg(width, height):
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, height), (120, 80, 40)).save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+
+class TestThumbnails:
+    def test_card_size_is_resized_once(self, app, client, make_book, mock_get):
+        book_id = make_book(thumbnail=PRIMARY)
+        mock_get.return_value = _response(_jpeg(800, 1200))
+
+        first = client.get(f'/covers/{book_id}/card')
+        second = client.get(f'/covers/{book_id}/card')
+
+        assert first.status_code == 200
+        assert first.mimetype == 'image/jpeg'
+        assert image_dimensions(first.data) == (COVER_WIDTHS['card'], 300)
+        assert second.data == first.data
+        assert first.headers['ETag'] != client.get(f'/covers/{book_id}').headers['ETag']
+        with app.app_context():
+            thumbs = [p for p in (get_cover_store().root / 'thumbs').rglob('*') if p.is_file()]
+        assert len(thumbs) == 1
+
+    def test_small_original_is_not_upscaled(self, client, make_book, mock_get):
+        book_id = make_book(thumbnail=PRIMARY)
+        original = _jpeg(150, 225)
+        mock_get.return_value = _response(original)
+
+        response = client.get(f'/covers/{book_id}/retina')
+
+        assert response.data == original
+
+    def test_unknown_size_is_404(self, client, make_book, mock_get):
+        book_id = make_book(thumbnail=PRIMARY)
+        assert client.get(f'/covers/{book_id}/huge').status_code == 404
+        mock_get.assert_not_called()
+
+    def test_srcset_lists_every_width(self, app, make_book):
+        register_template_filters(app)
+        book_id = make_book(thumbnail=PRIMARY)
+        with app.test_request_context():
+            book = db.session.get(Book, book_id)
+            srcset = app.jinja_env.filters['cover_srcset'](book)
+            card = app.jinja_env.filters['cover_for'](book, 'card')
+        assert card == f'/covers/{book_id}/card?v={cover_version(PRIMARY)}'
+        assert srcset.split(', ')[0] == f'{card} 200w'
+        assert [c.rsplit(' ', 1)[1] for c in srcset.split(', ')] == [f'{w}w' for w in COVER_WIDTHS.values()]
+
+    def test_search_results_have_no_srcset(self, app):
+        register_template_filters(app)
+        with app.test_request_context():
+            assert app.jinja_env.filters['cover_srcset']({'thumbnail': PRIMARY}) == ''
+
+
+class TestCoverValidation:
+    ISBN = '9780441013593'
+
+    def _validate(self, app, **kwargs):
+        with app.app_context():
+            return validate_library_covers(**kwargs)
+
+    def _book(self, app, book_id):
+        with app.app_context():
+            book = db.session.get(Book, book_id)
+            return book.verified_cover_url, book.cover_checked_at, book.cover_url, book.cover_fallback_url
+
+    def test_placeholder_primary_stores_fallback(self, app, make_book, mock_get):
+        book_id = make_book(thumbnail=PRIMARY, isbn=self.ISBN)
+        mock_get.side_effect = lambda url, **kw: _response(PIXEL_GIF if url == PRIMARY else _png())
+
+        report = self._validate(app)
+
+        verified, checked_at, cover_url, fallback_url = self._book(app, book_id)
+        assert (report.total, report.fallback) == (1, 1)
+        assert verified == cover_url == FALLBACK
+        assert checked_at is not None
+        assert fallback_url is None
+
+    def test_probes_each_url_once_and_concurrently(self, app, make_book, mock_get):
+        first = make_book(thumbnail=PRIMARY, isbn=self.ISBN)
+        second = make_book(thumbnail=PRIMARY, isbn=self.ISBN)
+        mock_get.return_value = _response(_png())
+
+        report = self._validate(app, workers=4)
+
+        assert report.primary == 2
+        assert sorted(call.args[0] for call in mock_get.call_args_list) == sorted([PRIMARY, FALLBACK])
+        assert self._book(app, first)[0] == self._book(app, second)[0] == PRIMARY
+
+    def test_book_without_any_cover_renders_none(self, app, make_book, mock_get):
+        book_id = make_book(thumbnail=PRIMARY, isbn=self.ISBN)
+        mock_get.return_value = _response(status=404)
+
+        report = self._validate(app)
+
+        verified, checked_at, cover_url, fallback_url = self._book(app, book_id)
+        assert report.missing == 1
+        assert checked_at is not None
+        assert cover_url is None and fallback_url is None
+
+    def test_transient_failure_is_retried_next_run(self, app, make_book, mock_get):
+        book_id = make_book(thumbnail=PRIMARY, isbn=self.ISBN)
+        mock_get.return_value = _response(status=503)
+
+        assert self._validate(app).failed == 1
+        assert self._book(app, book_id)[1] is None
+
+        mock_get.return_value = _response(_png())
+        assert self._validate(app).primary == 1
+
+    def test_checked_books_are_skipped_unless_forced(self, app, make_book, mock_get):
+        make_book(thumbnail=PRIMARY)
+        mock_get.return_value = _response(_png())
+        self._validate(app)
+
+        assert self._validate(app).total == 0
+        assert self._validate(app, force=True).total == 1
+
+    def test_runs_as_background_job(self, app, make_book, mock_get):
+        make_book(thumbnail=PRIMARY)
+        mock_get.return_value = _response(_png())
+        with app.app_context():
+            enqueue_job('validate_covers')
+            job = run_next_job()
+            assert job.status == JobStatus.SUCCEEDED
+            assert json.loads(job.result)['primary'] == 1
+
+
+def _close_to(hex_color, rgb, tolerance=4):
+    """JPEG encoding shifts flat colours by a few levels."""
+    channels = [int(hex_color[i:i + 2], 16) for i in (1, 3, 5)]
+    return all(abs(a - b) <= tolerance for a, b in zip(channels, rgb))
+
+
+class TestCoverPlaceholder:
+    def test_first_fetch_stores_colour_and_preview(self, app, client, make_book, mock_get):
+        book_id = make_book(thumbnail=PRIMARY)
+        mock_get.return_value = _response(_jpeg(400, 600))
+
+        client.get(f'/covers/{book_id}/card')
+
+        with app.app_context():
+            book = db.session.get(Book, book_id)
+            assert _close_to(book.cover_color, (120, 80, 40))
+            assert book.cover_preview.startswith('data:image/png;base64,')
+            assert len(book.cover_preview) < 1000
+
+    def test_validation_stores_placeholder(self, app, make_book, mock_get):
+        book_id = make_book(thumbnail=PRIMARY)
+        mock_get.return_value = _response(_jpeg(400, 600))
+
+        with app.app_context():
+            validate_library_covers()
+            assert _close_to(db.session.get(Book, book_id).cover_color, (120, 80, 40))
+
+    def test_filter_emits_inline_style(self, app):
+        register_template_filters(app)
+        placeholder = app.jinja_env.filters['cover_placeholder']
+        book = Book(title='Dune', cover_color='#112233', cover_preview='data:image/png;base64,AAAA')
+        assert placeholder(book) == "background:#112233 url('data:image/png;base64,AAAA') center/cover no-repeat"
+        assert placeholder(Book(title='Dune')) == ''
+        assert placeholder({'thumbnail': PRIMARY}) == ''
+
+
+class TestResolvedCoverUrls:
+    def test_resolved_when_cover_fields_are_set(self):
+        book = Book(title='Dune', thumbnail=PRIMARY + '&imgtk=secret', isbn='9780441013593')
+        assert book.resolved_cover_url == PRIMARY
+        assert book.resolved_cover_fallback_url == FALLBACK
+
+        book.isbn = None
+        assert book.cover_fallback_url is None
+
+    def test_properties_do_not_resolve_on_read(self, monkeypatch):
+        book = Book(title='Dune', thumbnail=PRIMARY)
+        monkeypatch.setattr('alexandria.models.resolve_cover_url', MagicMock(side_effect=AssertionError))
+        assert book.cover_url == PRIMARY
+
+    def test_backfill_fills_rows_written_before_the_columns(self, app, make_book):
+        book_id = make_book(thumbnail=PRIMARY, isbn='9780441013593')
+        with app.app_context():
+            db.session.execute(db.update(Book).values(resolved_cover_url=None, resolved_cover_fallback_url=None))
+            db.session.commit()
+
+            assert backfill_cover_urls() == 1
+            assert backfill_cover_urls() == 0
+            book = db.session.get(Book, book_id)
+            assert (book.cover_url, book.cover_fallback_url) == (PRIMARY, FALLBACK)
@@ -0,0 +1,130 @@
+"""Normalized authors and categories: linking, filtering, stats and backfill."""
+import warnings
+from datetime import UTC, datetime
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.exc import SAWarning
+
+from alexandria.bootstrap import refresh_library_metadata
+from alexandria.constants import BookStatus
+from alexandria.extensions import db
+from alexandria.integrations.google_books import VolumeFetch, _volume_info_to_result
+from alexandria.models import Author, Book, Category
+from alexandria.services.books import (
+    add_book_from_api_details,
+    backfill_book_facets,
+    filter_books,
+)
+from alexandria.services.stats import build_stats_context
+
+
+def _details(google_books_id, title, authors, categories):
+    return _volume_info_to_result({'title': title, 'authors': authors, 'categories': categories}, google_books_id)
+
+
+def test_volume_result_keeps_the_api_arrays():
+    result = _details('v1', 'Good Omens', ['Terry Pratchett', 'Neil Gaiman'], ['Fiction'])
+    assert result['authors'] == 'Terry Pratchett, Neil Gaiman'
+    assert result['author_names'] == ['Terry Pratchett', 'Neil Gaiman']
+    assert result['category_names'] == ['Fiction']
+
+
+def test_added_books_share_author_and_category_rows(app):
+    with app.app_context():
+        add_book_from_api_details(_details('v1', 'Good Omens', ['Terry Pratchett', 'Neil Gaiman'], ['Fiction']))
+        add_book_from_api_details(_details('v2', 'Mort', ['Terry Pratchett'], ['Fiction', 'Fantasy']))
+        # Names come from the arrays, so a comma inside one name is kept intact.
+        add_book_from_api_details(_details('v3', 'Essays', ['Smith, John'], ['Essays']))
+
+        assert Author.query.count() == 3
+        assert Category.query.count() == 3
+        mort = Book.query.filter_by(title='Mort').one()
+        assert [c.name for c in mort.category_list] == ['Fantasy', 'Fiction']
+        assert [a.name for a in Book.query.filter_by(title='Essays').one().author_list] == ['Smith, John']
+        assert {a.name: len(a.books) for a in Author.query} == {
+            'Terry Pratchett': 2, 'Neil Gaiman': 1, 'Smith, John': 1,
+        }
+        assert {c.name: len(c.books) for c in Category.query} == {'Fiction': 2, 'Fantasy': 1, 'Essays': 1}
+
+
+def test_adding_links_facets_without_autoflush_warnings(app):
+    with app.app_context(), warnings.catch_warnings():
+        warnings.simplefilter('error', SAWarning)
+        add_book_from_api_details(_details('v1', 'Good Omens', ['Terry Pratchett', 'Neil Gaiman'], ['Fiction']))
+        add_book_from_api_details(_details('v2', 'Mort', ['Terry Pratchett'], ['Fantasy']))
+        assert Author.query.count() == 2
+
+
+def test_details_cached_before_arrays_fall_back_to_joined_strings(app):
+    details = _details('v1', 'Dune', [], [])
+    del details['author_names'], details['category_names']
+    details.update(authors='Frank Herbert', categories='Fiction, Classics')
+    with app.app_context():
+        book = add_book_from_api_details(details)
+        assert [a.name for a in book.author_list] == ['Frank Herbert']
+        assert [c.name for c in book.category_list] == ['Classics', 'Fiction']
+
+
+def test_refresh_relinks_changed_authors(app, make_book, monkeypatch):
+    monkeypatch.setenv('METADATA_REFRESH_RATE_PER_SECOND', '0')
+    book_id = make_book(title='Dune', google_books_id='vol1')
+    refreshed = VolumeFetch(details=_details('vol1', 'Dune', ['Frank Herbert'], ['Science Fiction']), etag='"e"')
+    with app.app_context(), patch('alexandria.bootstrap.fetch_volume', return_value=refreshed):
+        refresh_library_metadata()
+        book = db.session.get(Book, book_id)
+        assert [a.name for a in book.author_list] == ['Frank Herbert']
+        assert [c.name for c in book.category_list] == ['Science Fiction']
+
+
+@pytest.fixture
+def library(app):
+    with app.app_context():
+        for i, (title, authors, categories) in enumerate([
+            ('Mort', ['Terry Pratchett'], ['Fantasy']),
+            ('Good Omens', ['Terry Pratchett', 'Neil Gaiman'], ['Fantasy', 'Humour']),
+            ('Dune', ['Frank Herbert'], ['Science Fiction']),
+            # One author whose name holds a comma.
+            ('Essays', ['Smith, John'], ['Essays']),
+        ]):
+            book = add_book_from_api_details(_details(f'v{i}', title, authors, categories), status=BookStatus.FINISHED)
+            book.date_added = datetime(2025, 1, 1 + i, tzinfo=UTC)
+            book.date_finished = datetime(2025, 2, 1 + i, tzinfo=UTC)
+        db.session.commit()
+    with app.test_request_context():
+        yield
+
+
+def test_filter_books_by_author_and_category(library):
+    assert [b.title for b in filter_books(author='Terry Pratchett').items] == ['Good Omens', 'Mort']
+    assert [b.title for b in filter_books(category='Fantasy', author='Neil Gaiman').items] == ['Good Omens']
+    assert filter_books(category='fantasy').items == []
+
+
+def test_stats_count_categories_and_solo_authors_from_links(library):
+    ctx = build_stats_context()
+    assert dict(zip(ctx.cat_labels, ctx.cat_data)) == {
+        'Fantasy': 2, 'Humour': 1, 'Science Fiction': 1, 'Essays': 1,
+    }
+    assert ctx.solo_ratio == 75
+
+
+def test_index_filters_by_category_and_detail_links_authors(client, library):
+    html = client.get('/?category=Humour').get_data(as_text=True)
+    assert 'Good Omens' in html and 'Mort' not in html
+    assert 'in Humour' in html
+
+    book = Book.query.filter_by(title='Good Omens').one()
+    detail = client.get(f'/book/{book.id}').get_data(as_text=True)
+    assert '/?author=Neil+Gaiman' in detail
+    assert '/?category=Humour' in detail
+
+
+def test_backfill_links_books_without_facets(app, make_book):
+    make_book(title='Legacy', authors='Ursula K. Le Guin, Someone Else', categories='Fiction')
+    make_book(title='Bare', authors=None)
+    with app.app_context():
+        assert backfill_book_facets() == 1
+        assert backfill_book_facets() == 0
+        legacy = Book.query.filter_by(title='Legacy').one()
+        assert [a.name for a in legacy.author_list] == ['Someone Else', 'Ursula K. Le Guin']
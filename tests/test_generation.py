@@ -0,0 +1,121 @@
+"""Library generation counter and the stats/calendar contexts cached on it."""
+from contextlib import contextmanager
+from datetime import UTC, datetime
+
+import sqlalchemy as sa
+from sqlalchemy import event
+
+from alexandria.constants import BookStatus
+from alexandria.extensions import db
+from alexandria.models import Book
+from alexandria.services.books import quick_set_status
+from alexandria.services.generation import cached_context, current_generation
+from alexandria.services.reading_stats import rebuild_reading_stats
+from alexandria.services.stats import ALL_TIME, build_stats_context
+
+
+@contextmanager
+def counted_queries():
+    """Count the SELECTs other than the generation lookup run inside the block."""
+    selects = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and 'library_generation' not in statement:
+            selects.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        yield selects
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+
+def test_book_writes_bump_the_generation(app):
+    with app.app_context():
+        assert current_generation() == 0
+        book = Book(title='Dune', status=BookStatus.TBR)
+        db.session.add(book)
+        db.session.commit()
+        assert current_generation() == 1
+
+        quick_set_status(book, BookStatus.READING)
+        assert current_generation() == 2
+
+        book.title = book.title  # no net change
+        db.session.commit()
+        assert current_generation() == 2
+
+        db.session.delete(book)
+        db.session.commit()
+        assert current_generation() == 3
+
+
+def test_rolled_back_writes_leave_the_generation_alone(app, make_book):
+    book_id = make_book(title='Dune')
+    with app.app_context():
+        db.session.get(Book, book_id).title = 'Dune Messiah'
+        db.session.flush()
+        db.session.rollback()
+        assert current_generation() == 1
+
+
+def test_repeat_views_reuse_the_context_until_an_edit(app, client, make_book):
+    finished = datetime(2025, 3, 3, tzinfo=UTC)
+    book_id = make_book(title='Dune', status=BookStatus.FINISHED, date_added=finished, date_finished=finished)
+    assert 'Dune' in client.get('/stats').get_data(as_text=True)
+    assert 'Dune' in client.get('/calendar?year=2025&month=3').get_data(as_text=True)
+
+    with app.app_context(), counted_queries() as selects:
+        client.get('/stats')
+        client.get('/calendar?year=2025&month=3')
+        assert selects == []
+
+    with app.app_context():
+        db.session.get(Book, book_id).title = 'Children of Dune'
+        db.session.commit()
+    assert 'Children of Dune' in client.get('/stats').get_data(as_text=True)
+    assert 'Children of Dune' in client.get('/calendar?year=2025&month=3').get_data(as_text=True)
+
+
+def test_contexts_built_inside_a_rolled_back_flush_are_not_cached(app, client, make_book):
+    # The flush bumps the generation to 2 before the rollback undoes it; the
+    # next committed change is generation 2 as well and must not reuse it.
+    finished = datetime(2025, 3, 3, tzinfo=UTC)
+    book_id = make_book(title='Dune', status=BookStatus.FINISHED, date_added=finished, date_finished=finished,
+                        page_count=400)
+    with app.app_context():
+        db.session.get(Book, book_id).title = 'Dune Messiah'
+        db.session.flush()
+        assert current_generation() == 2
+        flushed = cached_context(f'stats:{ALL_TIME.key}', build_stats_context)
+        assert flushed.longest_book.title == 'Dune Messiah'
+        db.session.rollback()
+
+        db.session.get(Book, book_id).title = 'Children of Dune'
+        db.session.commit()
+        assert current_generation() == 2
+    assert 'Children of Dune' in client.get('/stats').get_data(as_text=True)
+
+
+def test_cache_stats_report_the_context_cache(client, auth_client, make_book):
+    make_book(title='Dune')
+    client.get('/stats')
+    client.get('/stats')
+    contexts = auth_client.get('/cache-stats').get_json()['contexts']
+    assert contexts['entries'] >= 1
+    assert contexts['hits'] >= 1
+
+
+def test_rebuilding_the_stats_invalidates_cached_contexts(app, client, make_book):
+    finished = datetime(2025, 3, 3, tzinfo=UTC)
+    make_book(title='Dune', status=BookStatus.FINISHED, date_added=finished, date_finished=finished, page_count=412)
+    assert client.get('/stats.json').get_json()['pages_history']['data'] == [412]
+
+    with app.app_context():
+        # A write the flush hooks never see, e.g. a restored backup or a raw migration.
+        db.session.execute(sa.update(Book).values(page_count=500))
+        db.session.commit()
+        assert current_generation() == 1
+        rebuild_reading_stats()
+        assert current_generation() == 2
+    assert client.get('/stats.json').get_json()['pages_history']['data'] == [500]
@@ -1,10 +1,17 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import MagicMock, patch
 
 import pytest
 
 from alexandria.integrations.google_books import (
     clear_google_books_cache,
+    configure_persistent_cache,
+    fetch_volume,
     get_book_details,
+    memory_cache_stats,
+    persistent_cache_stats,
     search_books,
 )
 
@@ -38,23 +45,32 @@ def _mock_response(status_code=200, json_data=None):
     response = MagicMock()
     response.status_code = status_code
     response.reason = 'OK' if status_code == 200 else 'Too Many Requests'
+    response.headers = {}
     response.json.return_value = json_data or {}
     return response
 
 
 @pytest.fixture(autouse=True)
 def clear_cache():
+    configure_persistent_cache(None)
     clear_google_books_cache()
     yield
     clear_google_books_cache()
+    configure_persistent_cache(None)
+
+
+@pytest.fixture
+def persistent_cache(tmp_path):
+    configure_persistent_cache(tmp_path / 'google_books_cache.db')
 
 
 @pytest.fixture(autouse=True)
 def enable_cache(monkeypatch):
     monkeypatch.setenv('GOOGLE_BOOKS_CACHE_TTL_SECONDS', '3600')
+    monkeypatch.setenv('GOOGLE_BOOKS_MAX_RETRIES', '0')
 
 
-@patch('alexandria.integrations.google_books.requests.get')
+@patch('alexandria.integrations.http.requests.Session.get')
 def test_search_books_uses_cache_on_repeat_query(mock_get):
     mock_get.return_value = _mock_response(json_data=SEARCH_RESPONSE)
 
@@ -66,7 +82,7 @@ def test_search_books_uses_cache_on_repeat_query(mock_get):
     assert second.results[0]['title'] == 'Dune'
 
 
-@patch('alexandria.integrations.google_books.requests.get')
+@patch('alexandria.integrations.http.requests.Session.get')
 def test_search_books_normalizes_query_for_cache(mock_get):
     mock_get.return_value = _mock_response(json_data=SEARCH_RESPONSE)
 
@@ -76,7 +92,7 @@ def test_search_books_normalizes_query_for_cache(mock_get):
     assert mock_get.call_count == 1
 
 
-@patch('alexandria.integrations.google_books.requests.get')
+@patch('alexandria.integrations.http.requests.Session.get')
 def test_get_book_details_uses_cache_after_search(mock_get):
     mock_get.return_value = _mock_response(json_data=SEARCH_RESPONSE)
 
@@ -88,31 +104,75 @@ def test_get_book_details_uses_cache_after_search(mock_get):
     assert details['google_books_id'] == 'abc123'
 
 
-@patch('alexandria.integrations.google_books.requests.get')
-def test_search_books_does_not_cache_http_errors(mock_get):
+@patch('alexandria.integrations.http.requests.Session.get')
+def test_search_books_negatively_caches_http_errors(mock_get):
     mock_get.return_value = _mock_response(status_code=429, json_data={'error': {'message': 'Quota exceeded'}})
 
     first = search_books('dune')
     second = search_books('dune')
 
-    assert mock_get.call_count == 2
+    assert mock_get.call_count == 1
     assert first.error_message == 'Quota exceeded'
     assert second.error_message == 'Quota exceeded'
 
 
-@patch('alexandria.integrations.google_books.requests.get')
-def test_get_book_details_does_not_cache_http_errors(mock_get):
+@patch('alexandria.integrations.http.requests.Session.get')
+def test_search_books_retries_errors_when_negative_cache_disabled(mock_get, monkeypatch):
+    monkeypatch.setenv('GOOGLE_BOOKS_NEGATIVE_CACHE_SECONDS', '0')
+    mock_get.return_value = _mock_response(status_code=429, json_data={'error': {'message': 'Quota exceeded'}})
+
+    search_books('dune')
+    search_books('dune')
+
+    assert mock_get.call_count == 2
+
+
+@patch('alexandria.integrations.http.requests.Session.get')
+def test_get_book_details_negatively_caches_http_errors(mock_get):
     mock_get.return_value = _mock_response(status_code=404, json_data={'error': {'message': 'Not found'}})
 
     first = get_book_details('missing')
     second = get_book_details('missing')
 
-    assert mock_get.call_count == 2
+    assert mock_get.call_count == 1
     assert first is None
     assert second is None
 
 
-@patch('alexandria.integrations.google_books.requests.get')
+@patch('alexandria.integrations.http.requests.Session.get')
+def test_circuit_opens_after_consecutive_failures_and_fails_fast(mock_get, monkeypatch):
+    monkeypatch.setenv('GOOGLE_BOOKS_CIRCUIT_FAILURE_THRESHOLD', '3')
+    mock_get.return_value = _mock_response(status_code=503)
+
+    for query in ('a', 'b', 'c'):
+        search_books(query)
+    outcome = search_books('d')
+    details = get_book_details('abc123')
+
+    assert mock_get.call_count == 3
+    assert 'temporarily unavailable' in outcome.error_message
+    assert details is None
+
+
+@patch('alexandria.integrations.http.requests.Session.get')
+def test_circuit_probes_once_after_cool_down(mock_get, monkeypatch):
+    monkeypatch.setenv('GOOGLE_BOOKS_CIRCUIT_FAILURE_THRESHOLD', '1')
+    monkeypatch.setenv('GOOGLE_BOOKS_CIRCUIT_RESET_SECONDS', '30')
+    clock = [1000.0]
+    monkeypatch.setattr('alexandria.utils.circuit_breaker.time.monotonic', lambda: clock[0])
+    mock_get.return_value = _mock_response(status_code=503)
+    search_books('a')
+
+    clock[0] += 31
+    mock_get.return_value = _mock_response(json_data=SEARCH_RESPONSE)
+    outcome = search_books('dune')
+
+    assert mock_get.call_count == 2
+    assert outcome.results[0]['title'] == 'Dune'
+    assert get_book_details('abc123')['title'] == 'Dune'
+
+
+@patch('alexandria.integrations.http.requests.Session.get')
 def test_get_book_details_caches_successful_volume_fetch(mock_get):
     mock_get.return_value = _mock_response(json_data=VOLUME_RESPONSE)
 
@@ -124,7 +184,7 @@ def test_get_book_details_caches_successful_volume_fetch(mock_get):
     assert second['title'] == 'Dune'
 
 
-@patch('alexandria.integrations.google_books.requests.get')
+@patch('alexandria.integrations.http.requests.Session.get')
 def test_search_books_uses_fallback_cover_when_image_links_missing(mock_get):
     mock_get.return_value = _mock_response(json_data=SEARCH_RESPONSE)
 
@@ -132,3 +192,135 @@ def test_search_books_uses_fallback_cover_when_image_links_missing(mock_get):
 
     assert outcome.results[0]['thumbnail'].endswith('zoom=4&source=gbs_api')
     assert outcome.results[0]['isbn'] is None
+
+
+@patch('alexandria.integrations.http.requests.Session.get')
+def test_search_books_reads_through_persistent_cache(mock_get, persistent_cache):
+    mock_get.return_value = _mock_response(json_data=SEARCH_RESPONSE)
+
+    search_books('dune')
+    clear_google_books_cache(persistent=False)  # simulate a restart or another worker
+    outcome = search_books('Dune')
+
+    assert mock_get.call_count == 1
+    assert outcome.results[0]['title'] == 'Dune'
+    assert persistent_cache_stats()['search']['hits'] == 1
+
+
+@patch('alexandria.integrations.http.requests.Session.get')
+def test_get_book_details_reads_volume_seeded_by_search_from_persistent_cache(mock_get, persistent_cache):
+    mock_get.return_value = _mock_response(json_data=SEARCH_RESPONSE)
+
+    search_books('dune')
+    clear_google_books_cache(persistent=False)
+    details = get_book_details('abc123')
+
+    assert mock_get.call_count == 1
+    assert details['google_books_id'] == 'abc123'
+
+
+@patch('alexandria.integrations.http.requests.Session.get')
+def test_persistent_cache_honours_ttl_zero(mock_get, persistent_cache, monkeypatch):
+    monkeypatch.setenv('GOOGLE_BOOKS_CACHE_TTL_SECONDS', '0')
+    mock_get.return_value = _mock_response(json_data=VOLUME_RESPONSE)
+
+    get_book_details('abc123')
+    clear_google_books_cache(persistent=False)
+    get_book_details('abc123')
+
+    assert mock_get.call_count == 2
+    assert persistent_cache_stats() == {}
+
+
+@patch('alexandria.integrations.http.requests.Session.get')
+def test_fetch_volume_sends_if_none_match_and_reports_not_modified(mock_get):
+    mock_get.return_value = _mock_response(status_code=304)
+
+    fetched = fetch_volume('abc123', etag='"v1"')
+
+    assert fetched.not_modified
+    assert fetched.details is None
+    assert mock_get.call_args.kwargs['headers'] == {'If-None-Match': '"v1"'}
+
+
+@patch('alexandria.integrations.http.requests.Session.get')
+def test_fetch_volume_bypasses_cache_and_returns_etag(mock_get):
+    response = _mock_response(json_data=VOLUME_RESPONSE)
+    response.headers = {'ETag': '"v2"'}
+    mock_get.return_value = response
+
+    get_book_details('abc123')
+    fetched = fetch_volume('abc123')
+
+    assert mock_get.call_count == 2
+    assert fetched.etag == '"v2"'
+    assert fetched.details['title'] == 'Dune'
+
+
+def test_cache_stats_endpoint_reports_memory_caches(auth_client):
+    resp = auth_client.get('/cache-stats')
+    assert resp.status_code == 200
+    data = resp.get_json()
+    assert set(data['memory']) == {'search', 'volume'}
+    assert 'hit_ratio' in data['memory']['search']
+
+
+@patch('alexandria.integrations.http.requests.Session.get')
+def test_concurrent_identical_searches_share_one_request(mock_get):
+    release = threading.Event()
+
+    def slow_get(*args, **kwargs):
+        release.wait(timeout=5)
+        return _mock_response(json_data=SEARCH_RESPONSE)
+
+    mock_get.side_effect = slow_get
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        futures = [pool.submit(search_books, q) for q in ('dune', 'Dune', ' dune ', 'DUNE', 'dune')]
+        deadline = time.monotonic() + 5
+        while memory_cache_stats()['search']['coalesced'] < 4 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        release.set()
+        outcomes = [f.result() for f in futures]
+
+    assert mock_get.call_count == 1
+    assert all(o.results[0]['title'] == 'Dune' for o in outcomes)
+
+
+@patch('alexandria.integrations.http.requests.Session.get')
+def test_expired_search_is_served_stale_and_refreshed_in_background(mock_get, monkeypatch):
+    monkeypatch.setenv('GOOGLE_BOOKS_CACHE_TTL_SECONDS', '60')
+    monkeypatch.setenv('GOOGLE_BOOKS_SEARCH_STALE_SECONDS', '600')
+    mock_get.return_value = _mock_response(json_data=SEARCH_RESPONSE)
+    clock = [1000.0]
+    monkeypatch.setattr('alexandria.utils.cache.time.monotonic', lambda: clock[0])
+
+    search_books('dune')
+    clock[0] += 120  # past the TTL, inside the stale window
+    stale = search_books('dune')
+
+    assert stale.results[0]['title'] == 'Dune'
+    for _ in range(500):  # time.monotonic is frozen above; bound the wait by iterations
+        if mock_get.call_count >= 2 and not memory_cache_stats()['search']['in_flight']:
+            break
+        time.sleep(0.01)
+    assert mock_get.call_count == 2
+    assert memory_cache_stats()['search']['stale_hits'] == 1
+
+    search_books('dune')  # refreshed entry is fresh again
+    assert mock_get.call_count == 2
+
+
+@patch('alexandria.integrations.http.requests.Session.get')
+def test_search_past_hard_expiry_is_fetched_inline(mock_get, monkeypatch):
+    monkeypatch.setenv('GOOGLE_BOOKS_CACHE_TTL_SECONDS', '60')
+    monkeypatch.setenv('GOOGLE_BOOKS_SEARCH_STALE_SECONDS', '600')
+    mock_get.return_value = _mock_response(json_data=SEARCH_RESPONSE)
+    clock = [1000.0]
+    monkeypatch.setattr('alexandria.utils.cache.time.monotonic', lambda: clock[0])
+
+    search_books('dune')
+    clock[0] += 1000  # past TTL + stale window
+    search_books('dune')
+
+    assert mock_get.call_count == 2
+    assert memory_cache_stats()['search']['stale_hits'] == 0
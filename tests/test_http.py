@@ -0,0 +1,104 @@
+"""Tests for the pooled Google Books HTTP client and its retry policy."""
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from alexandria.integrations.http import (
+    get_session,
+    get_with_retries,
+    reset_circuit_breaker,
+    retry_after_seconds,
+)
+
+
+def _response(status_code, headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    return response
+
+
+@pytest.fixture(autouse=True)
+def retry_env(monkeypatch):
+    monkeypatch.setenv('GOOGLE_BOOKS_MAX_RETRIES', '2')
+    monkeypatch.setenv('GOOGLE_BOOKS_MAX_BACKOFF_SECONDS', '8')
+    reset_circuit_breaker()
+    yield
+    reset_circuit_breaker()
+
+
+@pytest.fixture
+def sleep():
+    with patch('alexandria.integrations.http.time.sleep') as mock_sleep:
+        yield mock_sleep
+
+
+def test_session_is_reused_between_calls():
+    assert get_session() is get_session()
+
+
+@patch('alexandria.integrations.http.requests.Session.get')
+def test_retries_429_honouring_retry_after(mock_get, sleep):
+    mock_get.side_effect = [_response(429, {'Retry-After': '3'}), _response(200)]
+
+    response = get_with_retries('https://example.test')
+
+    assert response.status_code == 200
+    assert mock_get.call_count == 2
+    sleep.assert_called_once_with(3.0)
+
+
+@patch('alexandria.integrations.http.requests.Session.get')
+def test_gives_up_when_retry_after_exceeds_max_backoff(mock_get, sleep):
+    mock_get.return_value = _response(429, {'Retry-After': '120'})
+
+    response = get_with_retries('https://example.test')
+
+    assert response.status_code == 429
+    assert mock_get.call_count == 1
+    sleep.assert_not_called()
+
+
+@patch('alexandria.integrations.http.requests.Session.get')
+def test_returns_last_response_after_exhausting_retries(mock_get, sleep):
+    mock_get.return_value = _response(503)
+
+    response = get_with_retries('https://example.test')
+
+    assert response.status_code == 503
+    assert mock_get.call_count == 3
+    assert all(0 <= call.args[0] <= 8 for call in sleep.call_args_list)
+
+
+@patch('alexandria.integrations.http.requests.Session.get')
+def test_does_not_retry_client_errors(mock_get, sleep):
+    mock_get.return_value = _response(404)
+
+    assert get_with_retries('https://example.test').status_code == 404
+    assert mock_get.call_count == 1
+
+
+@patch('alexandria.integrations.http.requests.Session.get')
+def test_connection_errors_are_retried_then_raised(mock_get, sleep):
+    mock_get.side_effect = requests.ConnectionError('down')
+
+    with pytest.raises(requests.ConnectionError):
+        get_with_retries('https://example.test')
+    assert mock_get.call_count == 3
+
+
+@patch('alexandria.integrations.http.requests.Session.get')
+def test_uses_separate_connect_and_read_timeouts(mock_get, monkeypatch):
+    monkeypatch.setenv('GOOGLE_BOOKS_CONNECT_TIMEOUT_SECONDS', '2')
+    monkeypatch.setenv('GOOGLE_BOOKS_READ_TIMEOUT_SECONDS', '7')
+    mock_get.return_value = _response(200)
+
+    get_with_retries('https://example.test')
+
+    assert mock_get.call_args.kwargs['timeout'] == (2.0, 7.0)
+
+
+def test_retry_after_accepts_http_date():
+    response = _response(429, {'Retry-After': 'Wed, 21 Oct 2015 07:28:00 GMT'})
+    assert retry_after_seconds(response) == 0.0
@@ -0,0 +1,144 @@
+"""Tests for the persistent background job queue."""
+from datetime import UTC, datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from alexandria import create_app
+from alexandria.constants import JobStatus
+from alexandria.extensions import db
+from alexandria.integrations.google_books import VolumeFetch
+from alexandria.models import Book, Job
+from alexandria.services.jobs import enqueue_job, register_job, run_next_job
+
+
+@register_job('test_echo')
+def _echo_job(params, progress):
+    for i in range(1, 4):
+        progress(i, 3)
+    if params.get('fail'):
+        raise RuntimeError('boom')
+    return {'echo': params.get('value')}
+
+
+def _committed(sql: str, **params):
+    """Read through a connection of its own, i.e. only what has been committed."""
+    with db.engine.connect() as connection:
+        return connection.execute(db.text(sql), params).one()
+
+
+@register_job('test_batched')
+def _batched_job(params, progress):
+    book = db.session.get(Book, params['book_id'])
+    progress(0, 2)
+    params['seen'].append(_committed('SELECT progress_current, progress_total FROM job'))
+    book.title = 'Changed'
+    db.session.flush()
+    progress(1, 2)
+    params['seen'].append(_committed('SELECT title FROM book WHERE id = :id', id=book.id))
+    db.session.commit()
+    progress(2, 2)
+    return None
+
+
+def test_enqueue_returns_existing_active_job(app):
+    with app.app_context():
+        first = enqueue_job('test_echo', {'value': 1})
+        second = enqueue_job('test_echo', {'value': 2})
+        assert first.id == second.id
+        assert Job.query.count() == 1
+
+
+def test_enqueue_unknown_kind_raises(app):
+    with app.app_context(), pytest.raises(ValueError):
+        enqueue_job('nope')
+
+
+def test_run_next_job_records_progress_and_result(app):
+    with app.app_context():
+        job_id = enqueue_job('test_echo', {'value': 'hi'}).id
+        assert run_next_job().id == job_id
+        job = db.session.get(Job, job_id)
+        assert job.status == JobStatus.SUCCEEDED
+        assert (job.progress_current, job.progress_total) == (3, 3)
+        assert job.to_dict()['result'] == {'echo': 'hi'}
+        assert run_next_job() is None
+
+
+def test_failed_job_is_marked_with_message(app):
+    with app.app_context():
+        job_id = enqueue_job('test_echo', {'fail': True}).id
+        run_next_job()
+        job = db.session.get(Job, job_id)
+        assert job.status == JobStatus.FAILED
+        assert job.message == 'boom'
+
+
+def test_abandoned_running_job_is_requeued(app):
+    with app.app_context():
+        job = Job(kind='test_echo', status=JobStatus.RUNNING,
+                  heartbeat_at=datetime.now(UTC) - timedelta(hours=2))
+        db.session.add(job)
+        db.session.commit()
+        assert run_next_job(stale_after_seconds=60).id == job.id
+        assert db.session.get(Job, job.id).status == JobStatus.SUCCEEDED
+
+
+def test_job_status_endpoint(app, auth_client):
+    with app.app_context():
+        job_id = enqueue_job('test_echo', {'value': 1}).id
+    resp = auth_client.get(f'/jobs/{job_id}')
+    assert resp.status_code == 200
+    assert resp.get_json()['status'] == JobStatus.QUEUED
+    assert auth_client.get('/jobs').get_json()['jobs'][0]['id'] == job_id
+    assert auth_client.get('/jobs/99999').status_code == 404
+
+
+def test_job_status_requires_login(client):
+    assert client.get('/jobs').status_code == 302
+
+
+def test_startup_refresh_is_queued_not_run(tmp_path, monkeypatch):
+    monkeypatch.setenv('DATABASE_URL', f'sqlite:///{tmp_path}/startup.db')
+    monkeypatch.setenv('JOB_RUNNER_ENABLED', '0')
+    monkeypatch.setenv('REFRESH_LIBRARY_METADATA_ON_STARTUP', 'true')
+    with patch('alexandria.bootstrap.fetch_volume') as mock_fetch:
+        application = create_app()
+        mock_fetch.assert_not_called()
+    with application.app_context():
+        job = Job.query.one()
+        assert (job.kind, job.status) == ('refresh_metadata', JobStatus.QUEUED)
+
+
+def test_refresh_metadata_job_reports_progress(app, make_book, monkeypatch):
+    monkeypatch.setenv('METADATA_REFRESH_RATE_PER_SECOND', '0')
+    make_book(title='Old', google_books_id='vol1')
+    with app.app_context(), patch('alexandria.bootstrap.fetch_volume', return_value=VolumeFetch()):
+        job_id = enqueue_job('refresh_metadata').id
+        run_next_job()
+        job = db.session.get(Job, job_id)
+        assert job.status == JobStatus.SUCCEEDED
+        assert job.progress_total == 1
+        assert job.to_dict()['result']['failed'] == 1
+
+
+def test_crashed_refresh_metadata_job_is_marked_failed(app, make_book):
+    make_book(title='Old', google_books_id='vol1')
+    with app.app_context(), patch('alexandria.bootstrap.stale_books_query', side_effect=RuntimeError('db gone')):
+        job_id = enqueue_job('refresh_metadata').id
+        run_next_job()
+        job = db.session.get(Job, job_id)
+        assert (job.status, job.message) == (JobStatus.FAILED, 'db gone')
+
+
+def test_progress_does_not_commit_the_handlers_pending_changes(app, make_book, monkeypatch):
+    monkeypatch.setattr('alexandria.services.jobs._PROGRESS_COMMIT_INTERVAL', 0)
+    book_id = make_book(title='Original')
+    seen = []
+    with app.app_context():
+        job = enqueue_job('test_batched')
+        with patch.object(Job, 'params_dict', {'book_id': book_id, 'seen': seen}):
+            run_next_job()
+        job = db.session.get(Job, job.id)
+        assert (job.status, job.progress_current, job.progress_total) == (JobStatus.SUCCEEDED, 2, 2)
+    assert [tuple(row) for row in seen] == [(0, 2), ('Original',)]
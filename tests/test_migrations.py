@@ -0,0 +1,64 @@
+"""The migration chain against a database created before this release."""
+import sqlite3
+from pathlib import Path
+
+import sqlalchemy as sa
+from alembic.script import ScriptDirectory
+from flask import Flask
+from flask_migrate import upgrade
+
+from alexandria import create_app
+from alexandria.extensions import db, migrate
+
+MIGRATIONS = str(Path(__file__).resolve().parent.parent / 'migrations')
+# Head of the migration chain in the last release.
+RELEASED_HEAD = 'a1b2c3d4e5f6'
+
+
+def _released_database(path: Path) -> None:
+    """A database migrated to ``RELEASED_HEAD`` holding one finished book."""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    db.init_app(app)
+    migrate.init_app(app, db, directory=MIGRATIONS)
+    with app.app_context():
+        upgrade(revision=RELEASED_HEAD)
+    with sqlite3.connect(path) as connection:
+        connection.execute(
+            "INSERT INTO book (title, authors, categories, status, page_count, date_added, date_finished) "
+            "VALUES ('Good Omens', 'Terry Pratchett, Neil Gaiman', 'Fiction', 'finished', 400, "
+            "'2025-01-02 00:00:00.000000', '2025-02-03 00:00:00.000000')"
+        )
+
+
+def test_upgrade_from_the_released_head_after_the_app_bootstrapped(tmp_path, monkeypatch):
+    # `flask db upgrade` (docker-entrypoint.sh) loads create_app(), whose
+    # bootstrap runs create_all() before Alembic gets to the new tables.
+    path = tmp_path / 'library.db'
+    _released_database(path)
+    monkeypatch.setenv('DATABASE_URL', f'sqlite:///{path}')
+    monkeypatch.setenv('SECRET_KEY', 'test-secret')
+    monkeypatch.setenv('JOB_RUNNER_ENABLED', '0')
+    app = create_app()
+
+    with app.app_context():
+        upgrade(directory=MIGRATIONS)
+        tables = set(sa.inspect(db.engine).get_table_names())
+        indexes = set(db.session.execute(sa.text("SELECT name FROM sqlite_master WHERE type = 'index'")).scalars())
+        version = db.session.execute(sa.text('SELECT version_num FROM alembic_version')).scalar()
+        authors = db.session.execute(sa.text('SELECT name FROM author ORDER BY name')).scalars().all()
+        db.session.remove()
+
+    assert [version] == ScriptDirectory(MIGRATIONS).get_heads()
+    assert {'job', 'author', 'book_author', 'reading_stat', 'library_generation'} <= tables
+    assert {'ix_job_status', 'ix_book_author_author_id', 'ix_book_status_title'} <= indexes
+    assert authors == ['Neil Gaiman', 'Terry Pratchett']
+
+    # The server's start after the upgrade rebuilds the stats from the links the upgrade filled.
+    with create_app().app_context():
+        stats = db.session.execute(sa.text(
+            "SELECT dimension, key FROM reading_stat WHERE dimension IN ('category', 'authorship')"
+        )).all()
+        db.session.remove()
+    assert sorted(stats) == [('authorship', 'multi'), ('category', 'Fiction')]
+
@@ -0,0 +1,77 @@
+"""Keyset pagination of filter_books."""
+from datetime import UTC, datetime
+
+import pytest
+
+from alexandria.constants import BookStatus
+from alexandria.extensions import db
+from alexandria.models import Book
+from alexandria.services.books import filter_books
+from alexandria.services.pagination import CursorPage
+
+
+@pytest.fixture
+def library(app):
+    titles = ['Emma', 'Dune', 'Beloved', 'Carrie', 'Atonement', 'Dune', 'Frankenstein']
+    with app.app_context():
+        for i, title in enumerate(titles):
+            db.session.add(Book(
+                title=title,
+                status=BookStatus.FINISHED if i % 2 else BookStatus.READING,
+                date_added=datetime(2025, 1, 1 + i % 3, tzinfo=UTC),  # duplicates exercise the id tiebreaker
+                date_finished=datetime(2025, 3, 1 + i, tzinfo=UTC) if i % 2 else None,
+            ))
+        db.session.commit()
+    with app.test_request_context():
+        yield
+
+
+def _walk(sort, per_page=2, **filters):
+    """Titles of every page followed by next tokens, then back again by prev tokens."""
+    pages = [filter_books(sort=sort, per_page=per_page, **filters)]
+    while pages[-1].has_next:
+        pages.append(filter_books(sort=sort, per_page=per_page, cursor=pages[-1].next_cursor, **filters))
+    backwards = [pages[-1]]
+    while backwards[-1].has_prev:
+        backwards.append(filter_books(sort=sort, per_page=per_page, cursor=backwards[-1].prev_cursor, **filters))
+    return [[b.id for b in p.items] for p in pages], [[b.id for b in p.items] for p in reversed(backwards)]
+
+
+@pytest.mark.parametrize('sort', ['date_added_desc', 'title_asc', 'title_desc', 'date_finished_desc'])
+def test_cursor_pages_match_offset_pages(library, sort):
+    forward, backward = _walk(sort)
+    offset_pages = [
+        [b.id for b in filter_books(sort=sort, per_page=2, page=n).items] for n in range(1, 5)
+    ]
+    assert forward == offset_pages
+    assert backward == forward
+
+
+def test_filters_apply_to_every_page(library):
+    forward, _ = _walk('title_asc', status=BookStatus.FINISHED)
+    titles = [db.session.get(Book, i).title for page in forward for i in page]
+    assert titles == ['Carrie', 'Dune', 'Dune']
+
+
+def test_total_is_carried_in_the_token(library):
+    first = filter_books(per_page=3)
+    second = filter_books(per_page=3, cursor=first.next_cursor)
+    assert isinstance(first, CursorPage)
+    assert first.total == second.total == 7
+
+
+def test_tampered_or_foreign_tokens_restart_at_first_page(library):
+    first = filter_books(sort='title_asc', per_page=2)
+    assert filter_books(sort='title_asc', per_page=2, cursor='garbage').items == first.items
+    # A token minted for another sort order is not applied to this one.
+    other = filter_books(sort='date_added_desc', per_page=2)
+    assert filter_books(sort='title_asc', per_page=2, cursor=other.next_cursor).items == first.items
+
+
+def test_index_serves_cursor_links(app, client, library):
+    response = client.get('/?status=finished&sort=title_asc')
+    assert response.status_code == 200
+    assert b'cursor=' not in response.data  # three finished books fit on one page
+
+    response = client.get('/?status=finished&page=1')
+    assert response.status_code == 200
@@ -0,0 +1,101 @@
+"""The book list queries are served by the indexes declared on ``Book``."""
+from contextlib import contextmanager
+from datetime import UTC, datetime
+
+import pytest
+from sqlalchemy import event
+
+from alexandria.constants import BookStatus
+from alexandria.extensions import db
+from alexandria.models import Book
+from alexandria.services.books import count_books_by_status, filter_books, get_collection_lists
+
+
+@pytest.fixture
+def library(app):
+    with app.app_context():
+        for i in range(30):
+            db.session.add(Book(
+                title=f'Book {i}',
+                isbn=f'978{i:010d}',
+                status=BookStatus.ALL[i % len(BookStatus.ALL)],
+                date_added=datetime(2025, 1, 1 + i % 28, tzinfo=UTC),
+                date_finished=datetime(2025, 2, 1 + i % 28, tzinfo=UTC) if i % 2 else None,
+            ))
+        db.session.commit()
+        db.session.execute(db.text('ANALYZE'))
+    with app.test_request_context():
+        yield
+
+
+@contextmanager
+def captured_book_queries():
+    """Collect ``(statement, parameters)`` of every SELECT on ``book`` run inside the block."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and 'FROM book' in statement:
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+
+def _plans(statements) -> list[str]:
+    with db.engine.connect() as connection:
+        return [
+            ' | '.join(row[-1] for row in connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {sql}', params))
+            for sql, params in statements
+        ]
+
+
+def _assert_uses(plan: str, index: str):
+    assert index in plan, plan
+    assert 'TEMP B-TREE' not in plan, plan
+
+
+def test_shelves_use_status_indexes(library):
+    with captured_book_queries() as statements:
+        first = get_collection_lists(per_page=5)
+        get_collection_lists(per_page=5, cursor=first['_finished_page'].next_cursor)
+    plans = _plans(statements)
+    shelf_plans = [p for p, (sql, _) in zip(plans, statements) if 'LIMIT' in sql]
+    finished = [p for p in shelf_plans if 'ix_book_status_finish_order' in p]
+    others = [p for p in shelf_plans if 'ix_book_status_date_added' in p]
+    assert len(finished) == 2  # first page and the keyset page after it
+    assert len(others) == 2 * (len(BookStatus.ALL) - 1)
+    for plan in finished + others:
+        _assert_uses(plan, 'USING INDEX')
+
+
+@pytest.mark.parametrize('sort, index', [
+    ('date_added_desc', 'ix_book_status_date_added'),
+    ('title_asc', 'ix_book_status_title'),
+    ('title_desc', 'ix_book_status_title'),
+])
+def test_status_filter_uses_index_for_sort(library, sort, index):
+    with captured_book_queries() as statements:
+        page = filter_books(status=BookStatus.TBR, sort=sort, per_page=2)
+        filter_books(status=BookStatus.TBR, sort=sort, per_page=2, cursor=page.next_cursor)
+    for plan in _plans(s for s in statements if 'LIMIT' in s[0]):
+        _assert_uses(plan, index)
+
+
+def test_lookups_and_counts_use_indexes(library):
+    with captured_book_queries() as statements:
+        Book.query.filter_by(isbn='9780000000007').first()
+        count_books_by_status()
+        Book.query.filter(
+            Book.status == BookStatus.FINISHED,
+            Book.date_finished >= datetime(2025, 2, 1),
+            Book.date_finished < datetime(2025, 3, 1),
+        ).all()
+        Book.query.filter(Book.date_added >= datetime(2025, 1, 1), Book.date_added < datetime(2025, 2, 1)).all()
+    isbn, counts, finished_range, added_range = _plans(statements)
+    assert 'ix_book_isbn' in isbn
+    assert 'COVERING INDEX' in counts
+    assert 'ix_book_status_date_finished (status=? AND date_finished>? AND date_finished<?)' in finished_range
+    assert 'ix_book_date_added (date_added>? AND date_added<?)' in added_range
@@ -0,0 +1,120 @@
+"""Incrementally maintained reading_stat aggregates."""
+from datetime import UTC, datetime
+
+import pytest
+
+from alexandria.bootstrap import init_database
+from alexandria.constants import BookStatus, StatDimension
+from alexandria.extensions import db
+from alexandria.models import Book, ReadingStat
+from alexandria.services.books import quick_set_status, set_book_facets
+from alexandria.services.reading_stats import ensure_reading_stats, rebuild_reading_stats
+from alexandria.services.stats import build_stats_context
+
+
+def _snapshot() -> dict:
+    return {(r.dimension, r.period, r.key): (r.books, r.pages) for r in ReadingStat.query.all()}
+
+
+def _finished(title, day, **fields):
+    """A finished book in the session, linked to the authors and categories of its joined strings."""
+    defaults = {
+        'status': BookStatus.FINISHED,
+        'date_added': datetime(2025, 1, 1, tzinfo=UTC),
+        'date_finished': datetime(2025, 3, day, tzinfo=UTC),
+        'page_count': 100,
+        'authors': 'Solo Author',
+        'categories': 'Fiction',
+        'language': 'en',
+        'published_year': '1965',
+    }
+    defaults.update(fields)
+    book = Book(title=title, **defaults)
+    db.session.add(book)
+    set_book_facets(book, {'authors': book.authors, 'categories': book.categories})
+    return book
+
+
+def test_writes_keep_aggregates_equal_to_a_rebuild(app):
+    with app.app_context():
+        a = _finished('A', 3)  # a Monday
+        b = _finished('B', 4, page_count=None, authors='X, Y', categories='Fiction, History', language='fr')
+        tbr = Book(title='C', status=BookStatus.TBR, page_count=50)
+        db.session.add_all([a, b, tbr])
+        db.session.commit()
+
+        assert _snapshot()[(StatDimension.TOTAL, '2025-03', '')] == (2, 100)
+        assert _snapshot()[(StatDimension.CATEGORY, '2025-03', 'History')] == (1, 0)
+        assert _snapshot()[(StatDimension.WEEKDAY, '2025-03', 'Monday')] == (1, 100)
+
+        a.page_count = 250
+        a.date_finished = datetime(2025, 4, 10, tzinfo=UTC)
+        quick_set_status(tbr, BookStatus.FINISHED)
+        db.session.commit()
+        db.session.delete(b)
+        db.session.commit()
+
+        incremental = _snapshot()
+        assert incremental[(StatDimension.TOTAL, '2025-04', '')] == (1, 250)
+        assert (StatDimension.LANGUAGE, '2025-03', 'fr') not in incremental
+        rebuild_reading_stats()
+        assert _snapshot() == incremental
+
+
+def test_untracked_edits_and_rollbacks_leave_aggregates_alone(app):
+    with app.app_context():
+        book = _finished('A', 3)
+        db.session.add(book)
+        db.session.commit()
+        before = _snapshot()
+
+        book.personal_notes = 'Lovely.'
+        db.session.commit()
+        book.page_count = 999
+        db.session.flush()
+        db.session.rollback()
+
+        assert _snapshot() == before
+
+
+def test_ensure_rebuilds_only_an_empty_table(app):
+    with app.app_context():
+        db.session.add(_finished('A', 3))
+        db.session.commit()
+        db.session.query(ReadingStat).delete()
+        db.session.commit()
+
+        assert ensure_reading_stats() is True
+        assert ReadingStat.query.count() > 0
+        assert ensure_reading_stats() is False
+
+
+def test_stats_context_reads_the_aggregates(app):
+    with app.app_context():
+        db.session.add_all([
+            _finished('A', 3),
+            _finished('B', 4, authors='X, Y', published_year='1990', language='fr'),
+            _finished('C', 5, published_year='1995'),
+            Book(title='Unread', status=BookStatus.TBR),
+        ])
+        db.session.commit()
+        ctx = build_stats_context()
+
+    assert (ctx.total_books, ctx.total_pages) == (3, 300)
+    assert ctx.pages_history_labels == ['Mar 2025'] and ctx.pages_history_data == [300]
+    assert ctx.books_by_year_month == {'2025': {'March': 3}}
+    assert ctx.seasons['Spring'] == 3
+    assert ctx.completion_rate == 75
+    assert (ctx.most_read_decade, ctx.num_languages, ctx.solo_ratio) == ('1990s', 2, 66)
+
+
+@pytest.mark.parametrize('count', [0, 1])
+def test_startup_builds_missing_aggregates(app, count):
+    with app.app_context():
+        for i in range(count):
+            db.session.add(_finished(f'Book {i}', 3))
+        db.session.commit()
+        db.session.query(ReadingStat).delete()
+        db.session.commit()
+        init_database()
+        assert (ReadingStat.query.count() > 0) == bool(count)
@@ -0,0 +1,130 @@
+"""FTS5 search index, ranking, snippets and the LIKE fallback."""
+from datetime import UTC, datetime
+
+import pytest
+
+from alexandria.constants import BookStatus
+from alexandria.extensions import db
+from alexandria.models import Book
+from alexandria.services import search
+from alexandria.services.books import filter_books
+from alexandria.services.search import (
+    build_match_query,
+    rebuild_search_index,
+    search_index_available,
+    search_snippets,
+)
+
+
+@pytest.fixture
+def library(app):
+    books = [
+        {'title': 'Dune', 'authors': 'Frank Herbert', 'description': 'Spice and sandworms on Arrakis.'},
+        {'title': 'Children of Dune', 'authors': 'Frank Herbert', 'description': 'Paul’s heirs.'},
+        {'title': 'The Left Hand of Darkness', 'authors': 'Ursula K. Le Guin',
+         'description': 'An envoy on a winter planet; mentions dunes once.'},
+        {'title': 'Beloved', 'authors': 'Toni Morrison', 'categories': 'Fiction',
+         'personal_notes': 'Reread with the book club & <i>friends</i> in spring.'},
+        {'title': 'Cien años de soledad', 'authors': 'Gabriel García Márquez'},
+    ]
+    with app.app_context():
+        for i, fields in enumerate(books):
+            db.session.add(Book(status=BookStatus.READING, date_added=datetime(2025, 1, 1 + i, tzinfo=UTC), **fields))
+        db.session.commit()
+    with app.test_request_context():
+        if not search_index_available():
+            pytest.skip('SQLite built without FTS5')
+        yield
+
+
+def _titles(**kwargs):
+    return [b.title for b in filter_books(**kwargs).items]
+
+
+def test_build_match_query_prefixes_every_word():
+    assert build_match_query('dune  herb') == '"dune"* AND "herb"*'
+    assert build_match_query('"; DROP') == '"DROP"*'
+    assert build_match_query('  ***  ') is None
+
+
+def test_prefix_match_and_diacritics(library):
+    assert _titles(q='belov') == ['Beloved']
+    assert _titles(q='garcia marq') == ['Cien años de soledad']
+    assert _titles(q='!!!') == []
+
+
+def test_matches_description_categories_and_notes(library):
+    assert _titles(q='sandworms') == ['Dune']
+    assert _titles(q='book club') == ['Beloved']
+    assert _titles(q='fiction') == ['Beloved']
+
+
+def test_relevance_ranks_title_hits_first(library):
+    titles = _titles(q='dune', sort='relevance')
+    assert titles[:2] == ['Dune', 'Children of Dune']
+    assert titles[-1] == 'The Left Hand of Darkness'
+
+
+def test_relevance_pages_with_cursor(library):
+    first = filter_books(q='dune', sort='relevance', per_page=2)
+    second = filter_books(q='dune', sort='relevance', per_page=2, cursor=first.next_cursor)
+    assert [b.title for b in first.items + second.items] == _titles(q='dune', sort='relevance')
+    assert not second.has_next
+
+
+def test_triggers_keep_index_in_sync(library):
+    book = Book.query.filter_by(title='Beloved').one()
+    book.title = 'Jazz'
+    db.session.commit()
+    assert _titles(q='beloved') == []
+    assert _titles(q='jazz') == ['Jazz']
+
+    # Status changes skip the re-index but the row still matches.
+    book.status = BookStatus.FINISHED
+    db.session.commit()
+    assert _titles(q='jazz', status=BookStatus.FINISHED) == ['Jazz']
+
+    db.session.delete(book)
+    db.session.commit()
+    assert _titles(q='jazz') == []
+
+
+def test_snippets_are_escaped_and_highlighted(library):
+    book = Book.query.filter_by(title='Beloved').one()
+    snippet = search_snippets([book.id], 'club')[book.id]
+    assert '<mark>club</mark>' in snippet
+    assert '&amp;' in snippet
+    assert '<i>' not in snippet
+    assert search_snippets([book.id], '') == {}
+
+
+def test_rebuild_restores_a_cleared_index(library):
+    db.session.execute(db.text("INSERT INTO book_fts(book_fts) VALUES ('delete-all')"))
+    db.session.commit()
+    assert _titles(q='dune') == []
+    assert rebuild_search_index() == 5
+    assert 'Dune' in _titles(q='dune')
+
+
+def test_like_fallback_without_fts(library, monkeypatch):
+    monkeypatch.setattr('alexandria.services.books.search_index_available', lambda: False)
+    assert _titles(q='Herbert', sort='relevance') == ['Children of Dune', 'Dune']
+    assert _titles(q='sandworms') == []
+
+
+def test_search_page_renders_snippets(app, client, library):
+    response = client.get('/?q=sandworms')
+    html = response.get_data(as_text=True)
+    assert response.status_code == 200
+    assert '<mark>sandworms</mark>' in html
+    assert 'value="relevance"' in html
+
+
+def test_ensure_search_index_reports_missing_fts5(app, monkeypatch):
+    with app.app_context():
+        monkeypatch.setattr(search, 'FTS_SCHEMA', ('CREATE VIRTUAL TABLE nope USING no_such_module(x)',))
+        monkeypatch.setattr(search, '_fts_ready', {})
+        db.session.execute(db.text('DROP TABLE IF EXISTS book_fts'))
+        db.session.commit()
+        assert search.ensure_search_index() is False
+        assert search.search_index_available() is False
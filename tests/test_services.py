@@ -1,4 +1,4 @@
-"""Unit tests for service layer: stats and calendar."""
+"""Unit tests for service layer: collection shelves, stats and calendar."""
 from datetime import UTC, datetime
 
 import pytest
@@ -6,10 +6,63 @@ import pytest
 from alexandria.constants import BookStatus
 from alexandria.extensions import db
 from alexandria.models import Book
+from alexandria.services.books import filter_books, get_collection_lists
 from alexandria.services.calendar import build_calendar_context, get_active_months
 from alexandria.services.stats import build_stats_context
 
 
+class TestGetCollectionLists:
+    def _add(self, title, status, day, finished_day=None):
+        db.session.add(Book(
+            title=title,
+            status=status,
+            date_added=datetime(2025, 1, day, tzinfo=UTC),
+            date_finished=datetime(2025, 2, finished_day, tzinfo=UTC) if finished_day else None,
+        ))
+
+    def test_shelves_are_capped_but_counted(self, app):
+        with app.app_context():
+            for day in range(1, 6):
+                self._add(f'TBR {day}', BookStatus.TBR, day)
+            self._add('Reading', BookStatus.READING, 1)
+            db.session.commit()
+
+            groups = get_collection_lists(shelf_limit=3)
+
+            assert [b.title for b in groups['tbr']] == ['TBR 5', 'TBR 4', 'TBR 3']
+            assert groups['_counts'] == {'reading': 1, 'finished': 0, 'tbr': 5, 'paused': 0, 'dnf': 0}
+
+    def test_finished_paginated_by_finish_date(self, app):
+        with app.app_context():
+            self._add('Early', BookStatus.FINISHED, 1, finished_day=1)
+            self._add('Late', BookStatus.FINISHED, 2, finished_day=20)
+            self._add('Undated', BookStatus.FINISHED, 25)  # falls back to date_added (January)
+            db.session.commit()
+
+            first = get_collection_lists(page=1, per_page=2)
+            second = get_collection_lists(page=2, per_page=2)
+
+            assert [b.title for b in first['finished']] == ['Late', 'Early']
+            assert [b.title for b in second['finished']] == ['Undated']
+            assert (first['_finished_total'], first['_finished_page'].pages) == (3, 2)
+
+    def test_finished_keyset_pages_follow_cursors(self, app):
+        with app.app_context(), app.test_request_context():
+            for day in range(1, 6):
+                self._add(f'Book {day}', BookStatus.FINISHED, day, finished_day=day)
+            db.session.commit()
+
+            first = get_collection_lists(per_page=2)['_finished_page']
+            second = get_collection_lists(per_page=2, cursor=first.next_cursor)['_finished_page']
+            back = get_collection_lists(per_page=2, cursor=second.prev_cursor)['_finished_page']
+
+            assert [b.title for b in first.items] == ['Book 5', 'Book 4']
+            assert [b.title for b in second.items] == ['Book 3', 'Book 2']
+            assert [b.title for b in back.items] == ['Book 5', 'Book 4']
+            assert first.total == second.total == 5
+            assert not first.has_prev and not back.has_prev
+
+
 class TestBuildStatsContext:
     def test_empty_collection_does_not_raise(self, app):
         with app.app_context():
@@ -83,3 +136,32 @@ class TestBuildCalendarContext:
             db.session.commit()
             ctx = build_calendar_context(2026, 1)
             assert ctx['next_month'] is None
+
+
+class TestListViewsSkipLongText:
+    def test_list_services_defer_description_and_notes(self, app):
+        with app.app_context():
+            db.session.add(Book(
+                title='Wordy',
+                status=BookStatus.FINISHED,
+                description='x' * 10_000,
+                personal_notes='y' * 10_000,
+                date_added=datetime(2025, 1, 1, tzinfo=UTC),
+                date_finished=datetime(2025, 2, 1, tzinfo=UTC),
+            ))
+            db.session.commit()
+            db.session.expunge_all()
+
+            with app.test_request_context():
+                loaded = [
+                    *get_collection_lists()['finished'],
+                    *filter_books(status=BookStatus.FINISHED).items,
+                    *(e['book'] for week in build_calendar_context(2025, 2)['weeks']
+                      for day in week for e in day['events']),
+                ]
+            assert loaded
+            for book in loaded:
+                assert 'description' not in book.__dict__
+                assert 'personal_notes' not in book.__dict__
+            # Still reachable on demand.
+            assert len(loaded[0].description) == 10_000
@@ -9,6 +9,20 @@ def test_index_ok(client):
     assert response.status_code == 200
 
 
+def test_index_links_to_full_shelf(app, client, monkeypatch):
+    monkeypatch.setattr('alexandria.services.books.SHELF_LIMIT', 2)
+    with app.app_context():
+        for i in range(3):
+            db.session.add(Book(title=f'Wish {i}', status='tbr', date_added=datetime(2026, 1, i + 1)))
+        db.session.commit()
+
+    response = client.get('/')
+    assert b'Wish 2' in response.data
+    assert b'Wish 0' not in response.data
+    assert b'All 3 on the wish list' in response.data
+    assert b'/?status=tbr' in response.data
+
+
 def test_stats_ok(client):
     response = client.get('/stats')
     assert response.status_code == 200
@@ -0,0 +1,79 @@
+"""Columnar library snapshot behind the stats and calendar views."""
+from datetime import UTC, datetime
+
+from alexandria.constants import BookStatus
+from alexandria.extensions import db
+from alexandria.models import Book
+from alexandria.services import snapshot as snapshot_module
+from alexandria.services.calendar import build_calendar_context, get_active_months
+from alexandria.services.snapshot import NO_VALUE, build_library_snapshot, library_snapshot
+
+
+def _book(title, added, finished=None, **fields):
+    return Book(
+        title=title,
+        status=BookStatus.FINISHED if finished else BookStatus.READING,
+        date_added=added,
+        date_finished=finished,
+        **fields,
+    )
+
+
+def test_snapshot_columns_and_summary(app):
+    with app.app_context():
+        db.session.add_all([
+            _book('Long', datetime(2025, 1, 1), datetime(2025, 1, 31, 12), page_count=900,
+                  published_year='1851', language='en', average_rating=4.0),
+            _book('Quick', datetime(2025, 2, 1, 8), datetime(2025, 2, 1, 20), page_count=90,
+                  published_year='n.d.', language='fr', average_rating=0),
+            _book('Unread', datetime(2025, 3, 1), page_count=2000, published_year='1600'),
+        ])
+        db.session.commit()
+        snap = build_library_snapshot()
+        summary = snap.finished_summary()
+        ids = {b.title: b.id for b in Book.query}
+
+    assert len(snap) == 3
+    assert list(snap.year) == [1851, NO_VALUE, 1600]
+    assert snap.languages == ('en', 'fr')
+    assert summary.count == 2
+    assert summary.first_finish == datetime(2025, 1, 31, 12, tzinfo=UTC)
+    assert (summary.longest_id, summary.shortest_id, summary.oldest_id) == (ids['Long'], ids['Quick'], ids['Long'])
+    assert (summary.fastest_id, summary.min_days, summary.slowest_id, summary.max_days) == (
+        ids['Quick'], 0, ids['Long'], 30)
+    assert (summary.avg_days, summary.avg_rating, summary.num_languages) == (15, 4.0, 2)
+
+
+def test_snapshot_is_rebuilt_only_after_a_change(app, monkeypatch):
+    builds = []
+    build = snapshot_module.build_library_snapshot
+    monkeypatch.setattr(snapshot_module, 'build_library_snapshot', lambda: builds.append(1) or build())
+    with app.app_context():
+        db.session.add(_book('A', datetime(2025, 1, 1)))
+        db.session.commit()
+        first = library_snapshot()
+        assert library_snapshot() is first
+        db.session.add(_book('B', datetime(2025, 2, 1)))
+        db.session.flush()
+        assert len(library_snapshot()) == 2  # uncommitted generations are never cached
+        db.session.commit()
+        assert len(library_snapshot()) == 2
+        assert library_snapshot() is not first
+    assert len(builds) == 3
+
+
+def test_calendar_loads_only_the_books_of_its_month(app):
+    with app.app_context():
+        db.session.add_all([_book(f'Old {i}', datetime(2024, 5, 1 + i)) for i in range(20)])
+        db.session.add(_book('Current', datetime(2025, 2, 27, 23, 30), datetime(2025, 3, 2)))
+        db.session.commit()
+        db.session.expunge_all()
+
+        assert get_active_months() == [(2025, 3), (2025, 2), (2024, 5)]
+        ctx = build_calendar_context(2025, 3)
+        assert len(db.session.identity_map) == 1
+
+    events = [(event['book'].title, event['kind'], cell['day']) for week in ctx['weeks'] for cell in week
+              for event in cell['events']]
+    assert events == [('Current', 'finished', 2)]
+    assert (ctx['prev_month'], ctx['next_month']) == ((2025, 2), None)
@@ -0,0 +1,102 @@
+"""Date-range stats and the /stats.json chart endpoint."""
+import random
+from datetime import UTC, datetime
+
+import pytest
+
+from alexandria.constants import BookStatus
+from alexandria.extensions import db
+from alexandria.models import Book, ReadingStat
+from alexandria.services.books import set_book_facets
+from alexandria.services.stats import ALL_TIME, build_stats_context, stats_range_from_args
+
+
+@pytest.mark.parametrize('args, expected', [
+    ({}, (None, None, 'All time')),
+    ({'year': '2024'}, ('2024-01', '2025-01', '2024')),
+    ({'range': '12m'}, ('2024-04', None, 'Last 12 months')),
+])
+def test_range_from_args(args, expected):
+    stats_range = stats_range_from_args(args, today=datetime(2025, 3, 15, tzinfo=UTC))
+    assert (stats_range.start, stats_range.end, stats_range.label) == expected
+
+
+@pytest.mark.parametrize('args', [{'year': 'soon'}, {'year': '0'}, {'range': 'forever'}])
+def test_malformed_ranges_are_rejected(args):
+    with pytest.raises(ValueError):
+        stats_range_from_args(args)
+
+
+def _random_finished_book(rng: random.Random, i: int) -> Book:
+    finished = datetime(2019 + rng.randrange(5), 1 + rng.randrange(12), 1 + rng.randrange(28), tzinfo=UTC)
+    return Book(
+        title=f'Book {i}',
+        status=rng.choice([BookStatus.FINISHED, BookStatus.FINISHED, BookStatus.TBR]),
+        date_added=finished.replace(day=1),
+        date_finished=finished,
+        page_count=rng.choice([None, *range(80, 1200, 37)]),
+    )
+
+
+def test_year_stats_cover_only_books_finished_that_year(app):
+    rng = random.Random(7)
+    with app.app_context():
+        db.session.add_all(_random_finished_book(rng, i) for i in range(300))
+        db.session.commit()
+        db.session.expunge_all()
+        in_year = [
+            b for b in Book.query.order_by(Book.id)
+            if b.status == BookStatus.FINISHED and b.date_finished and b.date_finished.year == 2021
+        ]
+        ctx = build_stats_context(stats_range_from_args({'year': '2021'}))
+        everything = build_stats_context(ALL_TIME)
+
+    with_pages = [b for b in in_year if b.page_count is not None]
+    assert in_year and ctx.total_books == len(in_year) < everything.total_books
+    assert ctx.total_pages == sum(b.page_count or 0 for b in in_year)
+    assert ctx.longest_book.id == max(with_pages, key=lambda b: b.page_count).id
+    assert ctx.shortest_book.id == min(with_pages, key=lambda b: b.page_count).id
+    assert list(ctx.books_by_year_month) == ['2021']
+    assert all(label.endswith('2021') for label in ctx.pages_history_labels)
+    assert sum(ctx.seasons.values()) == len(in_year)
+
+
+def test_range_reads_the_aggregates_by_primary_key_range(app):
+    stats_range = stats_range_from_args({'year': '2024'})
+    with app.app_context():
+        query = stats_range.filter(ReadingStat.query.filter_by(dimension='total'))
+        sql = str(query.statement.compile(dialect=db.engine.dialect, compile_kwargs={'literal_binds': True}))
+        plan = ' | '.join(row[-1] for row in db.session.execute(db.text(f'EXPLAIN QUERY PLAN {sql}')))
+    assert 'USING INDEX sqlite_autoindex_reading_stat_1 (dimension=? AND period>? AND period<?)' in plan
+
+
+def test_stats_json_serves_the_range_chart_series(app, client, make_book):
+    for year, pages in ((2023, 100), (2024, 250)):
+        finished = datetime(year, 7, 1, tzinfo=UTC)
+        book_id = make_book(title=f'Book {year}', status=BookStatus.FINISHED, date_added=finished,
+                            date_finished=finished, page_count=pages)
+        with app.app_context():
+            set_book_facets(db.session.get(Book, book_id), {'categories': 'Fiction'})
+            db.session.commit()
+
+    data = client.get('/stats.json?year=2024').get_json()
+    assert data == {
+        'range': '2024',
+        'pages_history': {'labels': ['Jul 2024'], 'data': [250]},
+        'seasons': {'Winter': 0, 'Spring': 0, 'Summer': 1, 'Autumn': 0},
+        'categories': {'labels': ['Fiction'], 'data': [1]},
+    }
+    assert client.get('/stats.json').get_json()['pages_history']['data'] == [100, 250]
+    assert client.get('/stats.json?range=week').status_code == 400
+
+
+def test_stats_page_links_the_years_and_fetches_its_charts(client, make_book):
+    finished = datetime(2023, 7, 1, tzinfo=UTC)
+    make_book(title='Dune', status=BookStatus.FINISHED, date_added=finished, date_finished=finished)
+
+    html = client.get('/stats?year=2023').get_data(as_text=True)
+    assert '"/stats.json?year=2023"' in html
+    assert 'response.ok' in html and 'Charts unavailable' in html
+    assert '<option value="/stats?year=2023" selected>2023</option>' in html
+    assert 'Dune' in html
+    assert client.get('/stats?year=later').status_code == 302
@@ -0,0 +1,219 @@
+"""build_stats_context (SQL aggregates) against the original per-book Python implementation."""
+import random
+from collections import Counter
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from alexandria.constants import BookStatus
+from alexandria.extensions import db
+from alexandria.models import Book
+from alexandria.services.books import set_book_facets
+from alexandria.services.stats import StatsContext, _as_utc, build_stats_context, get_season, safe_div
+
+
+# ─── Reference: build_stats_context as it was, iterating every Book in Python ───
+
+def _ref_pages_history(finished_books):
+    pm_history = {}
+    for b in finished_books:
+        if b.page_count:
+            key = b.date_finished.strftime('%Y-%m')
+            pm_history[key] = pm_history.get(key, 0) + b.page_count
+    sorted_keys = sorted(pm_history.keys())
+    labels = [datetime.strptime(k, '%Y-%m').strftime('%b %Y') for k in sorted_keys]
+    return labels, [pm_history[k] for k in sorted_keys]
+
+
+def _ref_velocity(finished_books):
+    valid_intervals = []
+    book_velocities = []
+    for b in finished_books:
+        if b.date_added and b.date_finished:
+            days = (_as_utc(b.date_finished) - _as_utc(b.date_added)).days
+            if days >= 0:
+                valid_intervals.append(days)
+                book_velocities.append((b, days))
+    avg_days = int(safe_div(sum(valid_intervals), len(valid_intervals)))
+    fastest_book = min(book_velocities, key=lambda x: x[1])[0] if book_velocities else None
+    slowest_book = max(book_velocities, key=lambda x: x[1])[0] if book_velocities else None
+    fastest_days = min(valid_intervals) if valid_intervals else 0
+    slowest_days = max(valid_intervals) if valid_intervals else 0
+    return avg_days, fastest_book, fastest_days, slowest_book, slowest_days
+
+
+def _ref_categories(finished_books):
+    category_counts = {}
+    for book in finished_books:
+        if book.categories:
+            for cat in book.categories.split(','):
+                cat = cat.strip()
+                category_counts[cat] = category_counts.get(cat, 0) + 1
+    sorted_cats = sorted(category_counts.items(), key=lambda x: x[1], reverse=True)
+    if len(sorted_cats) > 5:
+        labels = [c[0] for c in sorted_cats[:5]] + ['Others']
+        data = [c[1] for c in sorted_cats[:5]] + [sum(c[1] for c in sorted_cats[5:])]
+    else:
+        labels = [c[0] for c in sorted_cats]
+        data = [c[1] for c in sorted_cats]
+    return labels, data
+
+
+def _ref_curiosities(finished_books, total_pages, total_books):
+    decade_counts = {}
+    for b in finished_books:
+        if b.published_year and b.published_year.isdigit():
+            decade = f'{b.published_year[:3]}0s'
+            decade_counts[decade] = decade_counts.get(decade, 0) + 1
+    day_counts = {}
+    for b in finished_books:
+        day = b.date_finished.strftime('%A')
+        day_counts[day] = day_counts.get(day, 0) + 1
+    languages = {b.language for b in finished_books if b.language}
+    ratings = [b.average_rating for b in finished_books if b.average_rating]
+    solo_count = sum(1 for b in finished_books if b.authors and ',' not in b.authors)
+    valid_years = [b for b in finished_books if b.published_year and b.published_year.isdigit()]
+    return {
+        'tower_height': round(total_pages * 0.00005, 2),
+        'ink_litres': round(total_pages / 50000, 3),
+        'most_read_decade': max(decade_counts.items(), key=lambda x: x[1])[0] if decade_counts else 'N/A',
+        'favorite_day': max(day_counts.items(), key=lambda x: x[1])[0] if day_counts else 'Unknown',
+        'num_languages': len(languages),
+        'avg_public_rating': round(sum(ratings) / len(ratings), 1) if ratings else 'N/A',
+        'solo_ratio': int(solo_count / total_books * 100) if total_books else 0,
+        'words_million': round(total_pages * 250 / 1_000_000, 2),
+        'oldest_book': min(valid_years, key=lambda b: int(b.published_year)) if valid_years else None,
+        'distance_km': round(total_pages * 3 / 1000, 2),
+    }
+
+
+def reference_stats_context() -> StatsContext:
+    all_books = Book.query.order_by(Book.id).all()
+    finished_books = [b for b in all_books if b.status == BookStatus.FINISHED and b.date_finished]
+    total_books_read = len(finished_books)
+    total_pages_read = sum(b.page_count for b in finished_books if b.page_count)
+    if finished_books:
+        first_finish = min(b.date_finished for b in finished_books)
+        days_active = (datetime.now(UTC) - _as_utc(first_finish)).days + 1
+        months_active, years_active = max(days_active / 30, 1), max(days_active / 365, 1)
+    else:
+        months_active = years_active = 1
+    books_with_pages = [b for b in finished_books if b.page_count is not None]
+    seasons = {'Winter': 0, 'Spring': 0, 'Summer': 0, 'Autumn': 0}
+    books_by_year_month = {}
+    for b in finished_books:
+        seasons[get_season(b.date_finished)] += 1
+        months = books_by_year_month.setdefault(b.date_finished.strftime('%Y'), {})
+        months[b.date_finished.strftime('%B')] = months.get(b.date_finished.strftime('%B'), 0) + 1
+    history_labels, history_data = _ref_pages_history(finished_books)
+    avg_days, fastest_book, fastest_days, slowest_book, slowest_days = _ref_velocity(finished_books)
+    cat_labels, cat_data = _ref_categories(finished_books)
+    return StatsContext(
+        total_books=total_books_read,
+        total_pages=total_pages_read,
+        avg_pages=int(safe_div(total_pages_read, total_books_read)),
+        avg_pages_month=int(total_pages_read / months_active),
+        avg_pages_year=int(total_pages_read / years_active),
+        pages_history_labels=history_labels,
+        pages_history_data=history_data,
+        longest_book=max(books_with_pages, key=lambda b: b.page_count) if books_with_pages else None,
+        shortest_book=min(books_with_pages, key=lambda b: b.page_count) if books_with_pages else None,
+        avg_days=avg_days,
+        fastest_book=fastest_book,
+        fastest_days=fastest_days,
+        slowest_book=slowest_book,
+        slowest_days=slowest_days,
+        reading_hours=int(total_pages_read * 2 / 60),
+        completion_rate=int(safe_div(total_books_read, len(all_books)) * 100),
+        seasons=seasons,
+        books_by_year_month=books_by_year_month,
+        cat_labels=cat_labels,
+        cat_data=cat_data,
+        **_ref_curiosities(finished_books, total_pages_read, total_books_read),
+    )
+
+
+# ─── Comparison ───
+
+CATEGORY_WEIGHTS = {'Fiction': 40, 'History': 25, 'Poetry': 15, 'Science': 10, 'Travel': 6, 'Art': 3, 'Law': 1}
+
+
+def _random_book(rng: random.Random, i: int) -> Book:
+    added = datetime(2018, 1, 1) + timedelta(days=rng.randrange(2500), seconds=rng.randrange(86400),
+                                             microseconds=rng.randrange(1_000_000))
+    finished = added + timedelta(days=rng.choice([0, 0, 1, 3, 14, 60, 200]), seconds=rng.randrange(-3600, 86400))
+    if rng.random() < 0.5:
+        added, finished = added.replace(tzinfo=UTC), finished.replace(tzinfo=UTC)
+    status = rng.choice([BookStatus.FINISHED] * 6 + list(BookStatus.ALL))
+    categories = rng.sample(list(CATEGORY_WEIGHTS), k=rng.randrange(3), counts=list(CATEGORY_WEIGHTS.values()))
+    return Book(
+        title=f'Book {i}',
+        authors=rng.choice([None, '', 'Solo', 'Solo Two', 'A, B', 'A, B, C']),
+        status=status,
+        date_added=rng.choice([added] * 20 + [None]),
+        date_finished=rng.choice([finished] * 20 + [None]) if status == BookStatus.FINISHED else None,
+        page_count=rng.choice([None, 0, *range(80, 1200, 37)]),
+        categories=', '.join(dict.fromkeys(categories)) or rng.choice([None, '']),
+        language=rng.choice([None, '', 'en', 'en', 'en', 'fr', 'de', 'es']),
+        published_year=rng.choice([None, '', 'n.d.', *(str(y) for y in range(1850, 2025, 7))]),
+        average_rating=rng.choice([None, 0, 3.5, 4.0, 4.25, 4.5]),
+    )
+
+
+def _add_linked(books) -> None:
+    """Add ``books`` linked to the authors and categories of their joined strings (no commas in names)."""
+    for book in books:
+        db.session.add(book)
+        set_book_facets(book, {'authors': book.authors, 'categories': book.categories})
+    db.session.commit()
+
+
+def _comparable(ctx: StatsContext) -> dict:
+    """Fields of ``ctx`` with books replaced by their ids and ties made order-independent.
+
+    The reference breaks ties between equally common categories, decades or
+    weekdays by which book came first; the aggregates break them by name.
+    Either pick is right, so tied category labels are only counted and the
+    top decade/weekday compares as the set of equally common ones.
+    """
+    fields = {
+        name: value.id if isinstance(value, Book) else value
+        for name, value in ctx.template_kwargs().items()
+    }
+    ranked = [(label, count) for label, count in zip(fields['cat_labels'], fields['cat_data']) if label != 'Others']
+    if ranked:
+        # Which of several equally common categories makes the top five is a tie too.
+        cutoff = ranked[-1][1]
+        fields['cat_labels'] = ({label for label, count in ranked if count > cutoff},
+                                sum(count == cutoff for _, count in ranked))
+    finished = Book.query.filter(Book.status == BookStatus.FINISHED, Book.date_finished.isnot(None)).all()
+    decades = Counter(f'{b.published_year[:3]}0s' for b in finished if b.published_year and b.published_year.isdigit())
+    days = Counter(b.date_finished.strftime('%A') for b in finished)
+    for name, counts in (('most_read_decade', decades), ('favorite_day', days)):
+        if counts and fields[name] in counts:
+            fields[name] = {k for k, n in counts.items() if n == counts[fields[name]]}
+    return fields
+
+
+@pytest.mark.parametrize('seed, size', [(1, 0), (2, 1), (3, 40), (4, 400)])
+def test_sql_stats_match_reference_implementation(app, seed, size):
+    rng = random.Random(seed)
+    with app.app_context():
+        _add_linked(_random_book(rng, i) for i in range(size))
+        db.session.expunge_all()
+
+        expected = _comparable(reference_stats_context())
+        db.session.expunge_all()
+        actual = _comparable(build_stats_context())
+
+    assert actual == expected
+
+
+def test_stats_load_only_the_named_books(app):
+    rng = random.Random(5)
+    with app.app_context():
+        _add_linked(_random_book(rng, i) for i in range(200))
+        db.session.expunge_all()
+
+        build_stats_context()
+        assert len(db.session.identity_map) <= 5  # longest, shortest, fastest, slowest, oldest